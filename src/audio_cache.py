@@ -0,0 +1,116 @@
+# src/audio_cache.py
+
+import hashlib
+import logging
+import os
+import subprocess
+from instrumentation import stage
+from video_encoder import DEFAULT_AUDIO_BITRATE
+
+# Zielformat der Musikspur (AAC im MP4-Container, wie im Video)
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_CHANNELS = 2
+
+# Ausblenden der Musik am Videoende in Sekunden (0 = hart abschneiden)
+AUDIO_FADE_OUT = 1.5
+
+# Version der Aufbereitung; bei Änderungen an den FFmpeg-Argumenten erhöhen, damit neu kodiert wird
+AUDIO_CACHE_VERSION = "1"
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 über den Inhalt einer Datei (blockweise gelesen)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AudioCache:
+    """
+    Cache für aufbereitete Hintergrundmusik auf der Festplatte.
+    Jede Musikdatei wird einmal in das Zielformat (AAC, Bitrate, Abtastrate, Kanäle)
+    kodiert; für jede Videolänge entsteht einmal eine auf die Länge gekürzte und
+    am Ende ausgeblendete Variante. Schlüssel ist ein Hash aus Dateiinhalt,
+    Kodiereinstellungen und Länge/Ausblendung, eine geänderte Musikdatei oder
+    andere Einstellungen ergeben daher neue Einträge. Beim Muxen wird die Spur nur
+    noch kopiert (`-c:a copy`, siehe video_encoder.mux_audio).
+    """
+
+    def __init__(self, cache_dir: str, bitrate: str = DEFAULT_AUDIO_BITRATE, sample_rate: int = AUDIO_SAMPLE_RATE,
+                 channels: int = AUDIO_CHANNELS, ffmpeg_binary: str = "ffmpeg"):
+        self.cache_dir = cache_dir
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.ffmpeg_binary = ffmpeg_binary
+        self._hashes = {} # (Pfad, Größe, Änderungszeit) -> Inhalts-Hash
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def settings(self) -> dict:
+        """Kodiereinstellungen, die in jeden Schlüssel eingehen (auch für Pipeline-Parameter)."""
+        return {"codec": "aac", "bitrate": self.bitrate, "sample_rate": self.sample_rate,
+                "channels": self.channels, "version": AUDIO_CACHE_VERSION}
+
+    def _source_hash(self, source_path: str) -> str:
+        stat = os.stat(source_path)
+        signature = (os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns)
+        if signature not in self._hashes:
+            self._hashes[signature] = file_hash(source_path)
+        return self._hashes[signature]
+
+    def make_key(self, source_path: str, duration: float = None, fade_out: float = 0) -> str:
+        digest = hashlib.sha256()
+        digest.update(self._source_hash(source_path).encode())
+        digest.update(repr(sorted(self.settings.items())).encode())
+        digest.update(repr((None if duration is None else round(float(duration), 3), round(float(fade_out), 3))).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.m4a")
+
+    def transcoded(self, source_path: str) -> str:
+        """Die komplette Musikdatei im Zielformat (einmal kodiert)."""
+        return self._get_or_create(self.make_key(source_path), [
+            '-i', source_path, '-vn',
+            '-c:a', 'aac', '-b:a', self.bitrate, '-ar', str(self.sample_rate), '-ac', str(self.channels),
+        ], f"Musik '{os.path.basename(source_path)}' in AAC kodiert")
+
+    def variant(self, source_path: str, duration: float, fade_out: float = AUDIO_FADE_OUT) -> str:
+        """
+        Musikspur mit genau `duration` Sekunden, die letzten `fade_out` Sekunden ausgeblendet.
+        Ohne Ausblendung wird die kodierte Gesamtspur nur gekürzt (Stream-Kopie),
+        sonst einmal pro Länge aus der Quelle kodiert.
+        """
+        fade_out = max(0.0, min(float(fade_out), float(duration)))
+        if not fade_out:
+            return self._get_or_create(self.make_key(source_path, duration), [
+                '-i', self.transcoded(source_path), '-t', f"{duration:.3f}", '-c:a', 'copy',
+            ], f"Musik auf {duration:.2f} s gekürzt")
+        return self._get_or_create(self.make_key(source_path, duration, fade_out), [
+            '-i', source_path, '-vn', '-t', f"{duration:.3f}",
+            '-af', f"afade=t=out:st={duration - fade_out:.3f}:d={fade_out:.3f}",
+            '-c:a', 'aac', '-b:a', self.bitrate, '-ar', str(self.sample_rate), '-ac', str(self.channels),
+        ], f"Musik auf {duration:.2f} s gekürzt und ausgeblendet")
+
+    def _get_or_create(self, key: str, ffmpeg_args: list, description: str) -> str:
+        """Liefert den Eintrag oder erzeugt ihn mit FFmpeg (atomar: temporäre Datei, dann umbenennen)."""
+        path = self.path(key)
+        if os.path.exists(path):
+            os.utime(path, None)
+            return path
+
+        tmp_path = f"{path}.{os.getpid()}.tmp.m4a"
+        command = [self.ffmpeg_binary, '-hide_banner', '-loglevel', 'error', *ffmpeg_args, '-y', tmp_path]
+        logging.info(f"Starte FFmpeg (Audio-Cache): {' '.join(command)}")
+        with stage("audio_cache"):
+            result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise subprocess.CalledProcessError(result.returncode, command, stderr=result.stderr)
+        os.replace(tmp_path, path)
+        logging.info(f"Audio-Cache: {description} -> {path}")
+        return path
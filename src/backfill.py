@@ -0,0 +1,215 @@
+# src/backfill.py
+"""
+Nachträgliches Erstellen der Videos für einen ganzen Zeitraum (z.B. nach einer Stiländerung):
+
+    python src/backfill.py 2025-09-01 2025-09-30
+    python src/backfill.py 2025-09-01 2025-09-30 --indices DAX MDAX --workers 8 --encoders 2 --overwrite
+
+Die Kurshistorie wird einmal für den gesamten Zeitraum geladen; die Mover jedes
+Handelstags werden per Zeilenausschnitt aus derselben Kursmatrix berechnet.
+Rendern und Kodieren laufen pro Tag in Worker-Prozessen, die Anzahl gleichzeitig
+laufender FFmpeg-Encoder ist begrenzt.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import pandas as pd
+
+from dax_movers import fetch_close_prices, history_start, select_index_movers
+from price_matrix import HORIZONS, PriceMatrix
+from chart_generator import create_charts_parallel
+from video_maker import create_tiktok_video
+from price_store import PriceStore
+from universe import default_universe
+from trading_calendar import next_trading_day
+from audio_cache import AudioCache
+from settings import (AUDIO_CACHE_DIR, BACKGROUND_MUSIC_FILE, CHART_ANIMATION, CHART_CACHE_DIR, CHART_DAYS, CHARTS_DIR,
+                      MOVER_HORIZON, MOVER_INDICES, NUM_MOVERS, PRICE_STORE_FILE, VIDEO_DURATION_PER_CHART,
+                      VIDEO_OVERLAYS, configure_logging, get_video_profiles)
+from main import _ordered_movers, video_output_path
+
+# Gleichzeitig laufende FFmpeg-Encoder (Rendern ist davon nicht betroffen)
+MAX_CONCURRENT_ENCODERS = 2
+
+# Vom Hauptprozess geteiltes Semaphor, das die Encoder in allen Worker-Prozessen begrenzt
+_encoder_slots = None
+
+
+def trading_day_movers(close_data: pd.DataFrame, start_date: datetime, end_date: datetime, index_members: dict,
+                       num_movers: int = NUM_MOVERS, chart_days: int = CHART_DAYS, horizon: str = MOVER_HORIZON) -> dict:
+    """
+    Berechnet die Mover jedes Handelstags in [start_date, end_date] aus einer gemeinsamen Kursmatrix.
+    Handelstage sind die Zeilen der Matrix im Zeitraum (Wochenenden und Feiertage fehlen dort).
+    Pro Tag wird nur eine Sicht auf die Zeilen bis zu diesem Tag ausgewertet (Chartfenster und
+    Horizont), so wie sie der tägliche Lauf an diesem Tag gesehen hätte.
+    Gibt {Handelstag: {index: (top_gainers, top_losers, historical_data_for_charts)}} zurück.
+    """
+    matrix = PriceMatrix.from_frame(close_data)
+    dates = close_data.index
+    first_row = dates.searchsorted(pd.Timestamp(start_date.date()), side="left")
+    last_row = dates.searchsorted(pd.Timestamp(end_date.date()), side="right")
+    window_rows = max(chart_days, (HORIZONS[horizon] or 0) + 1)
+    results = {}
+    for row in range(max(first_row, 1), last_row):
+        # "ytd" braucht alle Zeilen ab dem Vorjahresende, die Sicht beginnt dann am Anfang der Matrix
+        window = matrix.window(0 if HORIZONS[horizon] is None else max(0, row + 1 - window_rows), row + 1)
+        results[dates[row].to_pydatetime()] = select_index_movers(window, index_members, num_movers, chart_days,
+                                                                  horizon)
+    return results
+
+
+def _init_worker(encoder_slots):
+    global _encoder_slots
+    _encoder_slots = encoder_slots
+
+
+def _render_day(job):
+    """
+    Rendert und kodiert die Videos eines Index für einen Handelstag (im Worker-Prozess),
+    ein Video pro Ausgabeformat. Die Charts des Tages werden im Worker seriell gerendert,
+    parallel laufen die Tage.
+    Gibt (Handelstag, Index, Liste der Ausgabepfade, Fehlermeldung oder None) zurück.
+    """
+    trading_day, index, top_gainers, top_losers, historical_chart_data, output_videos = job
+    tmp_paths = []
+    try:
+        chart_jobs = [(ticker, historical_chart_data[ticker], change)
+                      for ticker, change, _ in _ordered_movers(top_gainers, top_losers)
+                      if ticker in historical_chart_data]
+        if not chart_jobs:
+            raise RuntimeError(f"Keine {index} Mover gefunden.")
+
+        changes = {ticker: float(change) for ticker, _, change in chart_jobs}
+        profiles = [profile for profile, _ in output_videos]
+        chart_frames = {(profile.width, profile.height): [] for profile in profiles}
+        chart_overlays = {size: [] for size in chart_frames}
+        for result in create_charts_parallel(chart_jobs, CHARTS_DIR, max_workers=1, as_frames=True,
+                                             cache_dir=CHART_CACHE_DIR, animate=CHART_ANIMATION,
+                                             frame_sizes=list(chart_frames)):
+            if result.error is not None:
+                logging.error(f"Fehler beim Erstellen des Charts für {result.ticker} ({trading_day:%Y-%m-%d}): {result.error}")
+                continue
+            chart_frames[result.size].append(result.animation if CHART_ANIMATION else result.frame)
+            chart_overlays[result.size].append((result.ticker, changes[result.ticker]))
+
+        music = BACKGROUND_MUSIC_FILE if os.path.exists(BACKGROUND_MUSIC_FILE) else None
+        # Musik pro Videolänge nur einmal aufbereiten (alle Worker teilen sich den Cache auf der Festplatte)
+        audio_cache = AudioCache(AUDIO_CACHE_DIR) if music else None
+        created = []
+        for profile, output_video in output_videos:
+            size = (profile.width, profile.height)
+            frames = chart_frames[size]
+            if not frames:
+                raise RuntimeError(f"Keine Charts für {profile.name} generiert.")
+            # Datei erst nach erfolgreicher Kodierung unter dem Zielnamen ablegen
+            root, ext = os.path.splitext(output_video)
+            tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+            tmp_paths.append(tmp_path)
+            with _encoder_slots if _encoder_slots is not None else nullcontext():
+                create_tiktok_video(None, tmp_path, music, VIDEO_DURATION_PER_CHART, {},
+                                    video_date=_run_date(trading_day), index_name=index, chart_frames=frames,
+                                    frame_size=size, chart_overlays=chart_overlays[size] if VIDEO_OVERLAYS else None,
+                                    audio_cache=audio_cache)
+            os.replace(tmp_path, output_video)
+            created.append(output_video)
+        return trading_day, index, created, None
+    except Exception as e:
+        logging.error(f"Backfill für {index} am {trading_day:%Y-%m-%d} fehlgeschlagen: {e}", exc_info=True)
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return trading_day, index, None, f"{type(e).__name__}: {e}"
+
+
+def _run_date(trading_day: datetime) -> datetime:
+    """Datum des täglichen Laufs, der diesen Handelstag auswertet (nächster XETRA-Handelstag)."""
+    return next_trading_day(trading_day)
+
+
+def run_backfill(start_date: datetime, end_date: datetime, indices=MOVER_INDICES, provider=None, price_store=None,
+                 max_workers: int = None, max_encoders: int = MAX_CONCURRENT_ENCODERS, overwrite: bool = False):
+    """
+    Erstellt die Videos aller Handelstage in [start_date, end_date] (beide inklusive) in einem Lauf.
+    Pro Tag und Index entsteht ein Video je Ausgabeformat (settings.ini, [video] profiles);
+    die Videos tragen dieselben Namen wie beim täglichen Lauf am jeweils folgenden Werktag.
+    Vorhandene Videos werden ohne `overwrite` übersprungen.
+    Ein fehlgeschlagener Tag bricht die übrigen nicht ab.
+    Gibt (created, failed) zurück: {(Handelstag, Index): [Ausgabepfade]} bzw. {(Handelstag, Index): Fehlermeldung}.
+    """
+    logging.info(f"--- Backfill {start_date:%Y-%m-%d} bis {end_date:%Y-%m-%d} ({', '.join(indices)}) ---")
+    universe = default_universe()
+    index_members = {index: universe.members(index) for index in indices}
+    tickers = universe.tickers(list(indices))
+    if price_store is None and provider is None:
+        price_store = PriceStore(PRICE_STORE_FILE)
+
+    # Ein Download für den gesamten Zeitraum plus Chartfenster bzw. Horizont vor dem ersten Tag
+    fetch_start = history_start(start_date, CHART_DAYS, MOVER_HORIZON)
+    close_data = fetch_close_prices(tickers, fetch_start, end_date + timedelta(days=1), price_store, provider).close_data
+    if len(close_data) < 2:
+        raise RuntimeError("Nicht genügend Kursdaten für den Backfill.")
+
+    profiles = get_video_profiles()
+    jobs = []
+    for trading_day, movers in trading_day_movers(close_data, start_date, end_date, index_members).items():
+        for index, (top_gainers, top_losers, historical_chart_data) in movers.items():
+            output_videos = [(profile, video_output_path(index, _run_date(trading_day), profile))
+                             for profile in profiles]
+            if not overwrite:
+                existing = [path for _, path in output_videos if os.path.exists(path)]
+                for path in existing:
+                    logging.info(f"Video existiert bereits, übersprungen: {path}")
+                output_videos = [(profile, path) for profile, path in output_videos if path not in existing]
+            if output_videos:
+                jobs.append((trading_day, index, top_gainers, top_losers, historical_chart_data, output_videos))
+    logging.info(f"Backfill: {sum(len(job[-1]) for job in jobs)} Videos zu erstellen.")
+    if not jobs:
+        return {}, {}
+
+    os.makedirs(os.path.dirname(jobs[0][-1][0][1]), exist_ok=True)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(jobs))
+    encoder_slots = multiprocessing.BoundedSemaphore(max(1, max_encoders))
+
+    created, failed = {}, {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(encoder_slots,)) as executor:
+        futures = [executor.submit(_render_day, job) for job in jobs]
+        for future in as_completed(futures):
+            trading_day, index, output_videos, error = future.result()
+            if error is None:
+                created[(trading_day, index)] = output_videos
+                logging.info(f"Backfill-Videos erstellt: {', '.join(output_videos)}")
+            else:
+                failed[(trading_day, index)] = error
+
+    logging.info(f"--- Backfill beendet: {sum(map(len, created.values()))} Videos erstellt, "
+                 f"{len(failed)} Tage fehlgeschlagen ---")
+    return created, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Videos für einen Zeitraum von Handelstagen nachträglich erstellen.")
+    parser.add_argument("start", type=lambda s: datetime.strptime(s, "%Y-%m-%d"), help="Erster Handelstag (YYYY-MM-DD).")
+    parser.add_argument("end", type=lambda s: datetime.strptime(s, "%Y-%m-%d"), help="Letzter Handelstag (YYYY-MM-DD).")
+    parser.add_argument("--indices", nargs="+", default=list(MOVER_INDICES), help="Indizes aus der Universe-Registry.")
+    parser.add_argument("--workers", type=int, help="Worker-Prozesse (Standard: Anzahl CPU-Kerne).")
+    parser.add_argument("--encoders", type=int, default=MAX_CONCURRENT_ENCODERS,
+                        help="Höchstens so viele FFmpeg-Encoder gleichzeitig.")
+    parser.add_argument("--overwrite", action="store_true", help="Vorhandene Videos neu erstellen.")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    _, failed = run_backfill(args.start, args.end, tuple(args.indices), max_workers=args.workers,
+                             max_encoders=args.encoders, overwrite=args.overwrite)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,321 @@
+# src/benchmark.py
+"""
+Benchmark-Suite für die Stufen des täglichen Ablaufs, komplett offline auf
+synthetischen Kursdaten:
+
+    python src/benchmark.py                       # alle Benchmarks, JSON nach benchmarks/
+    python src/benchmark.py --only movers charts  # nur ausgewählte Gruppen
+    python src/benchmark.py --compare alt.json neu.json
+
+Jeder Benchmark meldet Laufzeiten (Wall-Clock, mehrere Wiederholungen) und den
+Spitzenverbrauch an Python/NumPy-Speicher (tracemalloc). Die Ergebnisse werden
+als JSON gespeichert und lassen sich zwischen Commits vergleichen.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+from data_provider import MarketDataProvider, synthetic_ohlc
+from universe import Universe
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.join(PROJECT_ROOT, "benchmarks")
+
+MOVER_TICKER_COUNTS = (40, 500, 5000)
+CHART_ENGINES = ("matplotlib", "fast")
+VIDEO_CHART_COUNT = 10
+DEFAULT_REPEATS = 5
+BENCHMARK_AS_OF = datetime(2025, 10, 1)
+BENCHMARK_GROUPS = ("movers", "charts", "video", "profiles", "startup")
+PROFILE_SETS = (("tiktok",), ("tiktok", "instagram-square", "instagram-portrait"))
+
+
+class _FrameProvider(MarketDataProvider):
+    """Liefert Ausschnitte eines vorab erzeugten DataFrames (ohne Netzwerk und Festplatte)."""
+
+    name = "benchmark"
+
+    def __init__(self, data: pd.DataFrame):
+        # copy() fasst die Blöcke aus pd.concat zusammen, wie bei einem echten Download
+        self.data = data.copy()
+
+    def download(self, tickers, start_date, end_date):
+        window = self.data[(self.data.index >= pd.Timestamp(start_date.date())) &
+                           (self.data.index < pd.Timestamp(end_date.date()))]
+        return window.loc[:, window.columns.get_level_values(1).isin(tickers)]
+
+
+def measure(name: str, func, repeats: int = DEFAULT_REPEATS, warmup: int = 1, **params) -> dict:
+    """
+    Führt `func` nach `warmup` Aufwärmläufen `repeats`-mal aus und misst Wall-Clock
+    sowie den Speicher-Spitzenwert eines zusätzlichen Laufs unter tracemalloc
+    (getrennt, damit tracemalloc die Zeiten nicht verfälscht).
+    """
+    for _ in range(warmup):
+        func()
+
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        "name": name,
+        "params": params,
+        "repeats": repeats,
+        "times_s": times,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "peak_traced_bytes": peak,
+    }
+    print(f"{name:<40} {_format_params(params):<32} median {result['median_s'] * 1000:9.2f} ms  "
+          f"min {result['min_s'] * 1000:9.2f} ms  peak {peak / 1024 / 1024:8.1f} MB")
+    return result
+
+
+def _format_params(params: dict) -> str:
+    return ", ".join(f"{key}={value}" for key, value in params.items())
+
+
+def _synthetic_universe(num_tickers: int):
+    """Universe mit einem synthetischen Index `BENCH` aus `num_tickers` Tickern."""
+    tickers = [f"T{i:05d}.DE" for i in range(num_tickers)]
+    universe = Universe()
+    universe.register_index("BENCH", [(ticker, f"Synthetic {i}") for i, ticker in enumerate(tickers)])
+    return universe, tickers
+
+
+def _synthetic_history(num_days: int = 30, seed: int = 7) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=BENCHMARK_AS_OF - timedelta(days=1), periods=num_days)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, num_days))), index=dates)
+
+
+def bench_movers(repeats: int) -> list:
+    """Mover-Berechnung (compute_index_movers) und kompletter get_index_movers-Lauf je Universumsgröße."""
+    from dax_movers import compute_index_movers, get_index_movers
+
+    results = []
+    for num_tickers in MOVER_TICKER_COUNTS:
+        universe, tickers = _synthetic_universe(num_tickers)
+        data = synthetic_ohlc(tickers, BENCHMARK_AS_OF - timedelta(days=60), BENCHMARK_AS_OF)
+        close = data["Close"]
+        members = {"BENCH": tickers}
+        provider = _FrameProvider(data)
+
+        results.append(measure("compute_index_movers", lambda: compute_index_movers(close, members, 5),
+                               repeats, tickers=num_tickers))
+        results.append(measure("get_index_movers", lambda: get_index_movers(
+            ("BENCH",), 5, 30, provider=provider, as_of=BENCHMARK_AS_OF, universe=universe),
+            repeats, tickers=num_tickers))
+    return results
+
+
+def bench_charts(repeats: int) -> list:
+    """Renderzeit pro Chart: PNG-Pfad (create_30_day_chart), Frame und Animations-Hintergrund je Engine."""
+    from chart_generator import create_30_day_chart, render_chart_animation, render_chart_frame
+
+    history = _synthetic_history()
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        results.append(measure("create_30_day_chart", lambda: create_30_day_chart("BAS.DE", history, 2.5, output_dir),
+                               repeats, engine="matplotlib"))
+    for engine in CHART_ENGINES:
+        results.append(measure("render_chart_frame", lambda: render_chart_frame("BAS.DE", history, 2.5, engine=engine),
+                               repeats, engine=engine))
+        results.append(measure("render_chart_animation",
+                               lambda: render_chart_animation("BAS.DE", history, 2.5, engine=engine),
+                               repeats, engine=engine))
+    return results
+
+
+def bench_video(repeats: int, num_charts: int = VIDEO_CHART_COUNT) -> list:
+    """
+    Komplette Videokodierung (create_tiktok_video) mit `num_charts` Charts, statisch und animiert,
+    jeweils ohne und mit Text-Overlays, sowie die Kosten eines zusammengesetzten Frames.
+    """
+    from chart_generator import render_chart_animation, render_chart_frame
+    from overlay import Compositor
+    from video_maker import _overlay_layers, create_tiktok_video
+
+    history = _synthetic_history()
+    frames = [render_chart_frame(f"T{i}.DE", history, 1.0, engine="fast") for i in range(num_charts)]
+    animations = [render_chart_animation(f"T{i}.DE", history, 1.0, engine="fast") for i in range(num_charts)]
+    overlays = [(f"T{i}.DE", 1.0) for i in range(num_charts)]
+
+    results = []
+    height, width = frames[0].shape[:2]
+    compositor = Compositor(width, height)
+    layers = _overlay_layers("BAS.DE", 2.5, width, height)
+    results.append(measure("compose_overlay_frame", lambda: compositor.compose(frames[0], layers), repeats))
+    results.append(measure("crossfade_frame", lambda: compositor.crossfade(frames[0], frames[1], 128), repeats))
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_path = os.path.join(output_dir, "benchmark.mp4")
+        for mode, sources in (("static", frames), ("animated", animations)):
+            for chart_overlays in (None, overlays):
+                results.append(measure("create_tiktok_video", lambda: create_tiktok_video(
+                    None, output_path, None, 2, {}, BENCHMARK_AS_OF, chart_frames=sources,
+                    chart_overlays=chart_overlays), repeats, warmup=0, charts=num_charts, mode=mode,
+                    overlays=chart_overlays is not None))
+    return results
+
+
+def bench_profiles(repeats: int, num_charts: int = VIDEO_CHART_COUNT) -> list:
+    """
+    Charts und Videos für ein bzw. mehrere Ausgabeformate in einem Lauf
+    (ein gemeinsamer Chart-Pool, parallele Kodierung), ohne Chart-Cache.
+    """
+    from chart_cache import ChartCache
+    from chart_generator import create_charts_parallel
+    from render_profiles import get_profile
+    from video_maker import VideoJob, create_videos_parallel
+
+    history = _synthetic_history()
+    chart_jobs = [(f"T{i}.DE", history, 1.0) for i in range(num_charts)]
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        def run(profiles):
+            sizes = [(profile.width, profile.height) for profile in profiles]
+            store = ChartCache(output_dir)
+            files = {size: [] for size in sizes}
+            for position, result in enumerate(create_charts_parallel(chart_jobs, animate=True, frame_sizes=sizes)):
+                key = f"{position:03d}"
+                store.put_animation(key, result.animation)
+                files[result.size].append(store.path(key, animation=True))
+            create_videos_parallel([VideoJob(os.path.join(output_dir, f"{profile.name}.mp4"),
+                                             files[(profile.width, profile.height)], (profile.width, profile.height),
+                                             2, BENCHMARK_AS_OF, "DAX", None) for profile in profiles])
+
+        for names in PROFILE_SETS:
+            profiles = [get_profile(name) for name in names]
+            results.append(measure("render_profiles", lambda: run(profiles), repeats, warmup=0,
+                                   charts=num_charts, profiles=len(profiles)))
+    return results
+
+
+def bench_startup(repeats: int) -> list:
+    """Kaltstart der CLI-Unterbefehle (neuer Interpreter bis zum Ende der Importe), siehe cli.measure_cold_start."""
+    from cli import measure_cold_start
+
+    results = []
+    for command, seconds in measure_cold_start(repeats=repeats).items():
+        results.append({"name": "cold_start", "params": {"command": command}, "repeats": repeats,
+                        "times_s": [seconds], "min_s": seconds, "median_s": seconds, "mean_s": seconds,
+                        "peak_traced_bytes": None})
+        print(f"{'cold_start':<40} {'command=' + command:<32} median {seconds * 1000:9.2f} ms")
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(groups=BENCHMARK_GROUPS, repeats: int = DEFAULT_REPEATS, video_repeats: int = 2) -> dict:
+    """Führt die ausgewählten Benchmark-Gruppen aus und gibt den Bericht als Dictionary zurück."""
+    started = time.perf_counter()
+    results = []
+    if "movers" in groups:
+        results += bench_movers(repeats)
+    if "charts" in groups:
+        results += bench_charts(repeats)
+    if "video" in groups:
+        results += bench_video(video_repeats)
+    if "profiles" in groups:
+        results += bench_profiles(video_repeats)
+    if "startup" in groups:
+        results += bench_startup(repeats)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "total_s": time.perf_counter() - started,
+        # ru_maxrss: Kilobyte unter Linux, Byte unter macOS
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+        "results": results,
+    }
+
+
+def _result_key(result: dict) -> tuple:
+    return result["name"], tuple(sorted(result["params"].items()))
+
+
+def compare(old_path: str, new_path: str):
+    """Vergleicht zwei Benchmark-Berichte (Median) und gibt die Veränderung pro Benchmark aus."""
+    with open(old_path, encoding="utf-8") as f:
+        old = {_result_key(r): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    for result in new:
+        before = old.get(_result_key(result))
+        label = f"{result['name']} ({_format_params(result['params'])})"
+        if before is None:
+            print(f"{label:<72} neu: {result['median_s'] * 1000:9.2f} ms")
+            continue
+        ratio = result["median_s"] / before["median_s"] if before["median_s"] else float("inf")
+        print(f"{label:<72} {before['median_s'] * 1000:9.2f} -> {result['median_s'] * 1000:9.2f} ms  ({ratio:5.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks der TopMover-Pipeline auf synthetischen Daten.")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARK_GROUPS, default=list(BENCHMARK_GROUPS),
+                        help="Nur diese Benchmark-Gruppen ausführen.")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Wiederholungen pro Benchmark.")
+    parser.add_argument("--video-repeats", type=int, default=2, help="Wiederholungen der Videokodierung.")
+    parser.add_argument("--output", help="Ziel-JSON (Standard: benchmarks/<Datum>-<Commit>.json).")
+    parser.add_argument("--compare", nargs=2, metavar=("ALT", "NEU"), help="Zwei Berichte vergleichen und beenden.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Fortschrittsmeldungen der Pipeline (u.a. fehlende Musik) würden die Ausgabe überdecken
+    logging.disable(logging.ERROR)
+    report = run_benchmarks(args.only, args.repeats, args.video_repeats)
+    output = args.output
+    if output is None:
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        output = os.path.join(BENCHMARK_DIR, f"{datetime.now().strftime('%Y-%m-%d_%H%M%S')}-{report['commit'] or 'nogit'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark-Ergebnisse gespeichert unter: {output}")
+
+
+if __name__ == "__main__":
+    main()
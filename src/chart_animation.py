@@ -0,0 +1,103 @@
+# src/chart_animation.py
+
+from collections import namedtuple
+import cv2
+import numpy as np
+
+# Kurslinie eines Charts: Punkte in Pixelkoordinaten (N x 2, float32), Farbe (BGR) und Stärke für cv2
+ChartLine = namedtuple("ChartLine", ["points", "color", "thickness"])
+
+# Subpixel-Genauigkeit für cv2-Zeichenfunktionen (4 Bit Nachkommastellen)
+SUBPIXEL_SHIFT = 4
+
+# cv2.LINE_AA zeichnet etwa so viele Pixel breiter als die angegebene Linienstärke
+AA_EXTRA_WIDTH_PX = 1.4
+
+
+def line_thickness(width_px: float) -> int:
+    """cv2-Linienstärke, die antialiasiert etwa `width_px` Pixel breit aussieht."""
+    return max(1, round(width_px - AA_EXTRA_WIDTH_PX))
+
+
+def draw_polyline(canvas: np.ndarray, points: np.ndarray, color, thickness: int):
+    """Zeichnet einen antialiasierten Linienzug mit Subpixel-Koordinaten in das Bild."""
+    if len(points) < 2:
+        return
+    fixed = np.round(np.asarray(points) * (1 << SUBPIXEL_SHIFT)).astype(np.int32)
+    cv2.polylines(canvas, [fixed], False, color, thickness=thickness, lineType=cv2.LINE_AA, shift=SUBPIXEL_SHIFT)
+
+
+class LineDrawAnimation:
+    """
+    Animation "Linie zeichnet sich selbst": Der statische Chart (Achsen, Grid, Texte)
+    wird einmal ohne Kurslinie gerendert. Jeder Frame entsteht aus dem vorherigen,
+    indem nur das neu hinzugekommene Stück der Linie in einen wiederverwendeten
+    Puffer gezeichnet wird. Die Kosten pro Frame hängen damit von der Länge des
+    neuen Linienstücks ab, nicht von der Größe des Charts.
+    Der Puffer entsteht erst beim ersten `frames()` und wird nicht mit gepickelt:
+    Aus den Worker-Prozessen kommen nur Hintergrund und Linie zurück.
+    """
+
+    def __init__(self, background: np.ndarray, line: ChartLine):
+        self.background = background
+        self.line = line
+        self.buffer = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["buffer"] = None
+        return state
+
+    def frames(self, num_frames: int):
+        """
+        Generator über `num_frames` Frames, in denen die Linie von links nach rechts
+        (gleichmäßig in der Zeit) gezeichnet wird. Liefert jedes Mal denselben Puffer;
+        er muss verarbeitet sein, bevor der nächste Frame angefordert wird.
+        Der letzte Frame entsteht wie `final_frame` in einem Zug aus dem Hintergrund,
+        damit das folgende Standbild pixelgleich anschließt (die stückweise gezeichneten
+        Linienstücke überlappen an den Stoßstellen anders als ein durchgehender Linienzug).
+        """
+        if self.buffer is None:
+            self.buffer = np.empty_like(self.background)
+        np.copyto(self.buffer, self.background)
+        points = self.line.points
+        if num_frames <= 0:
+            return
+        if len(points) < 2:
+            draw_polyline(self.buffer, points, self.line.color, self.line.thickness)
+            for _ in range(num_frames):
+                yield self.buffer
+            return
+
+        x_start, x_end = float(points[0, 0]), float(points[-1, 0])
+        next_index = 1         # Nächster noch nicht erreichter Stützpunkt
+        current = points[0]    # Bisheriges Ende der gezeichneten Linie
+        for frame_number in range(1, num_frames):
+            target_x = x_start + (x_end - x_start) * frame_number / num_frames
+            chain = [current]
+            while next_index < len(points) and points[next_index, 0] <= target_x:
+                chain.append(points[next_index])
+                next_index += 1
+            if next_index < len(points):
+                # Angefangenes Teilstück bis zur aktuellen Position interpolieren
+                p0, p1 = points[next_index - 1], points[next_index]
+                span = float(p1[0] - p0[0])
+                fraction = (target_x - float(p0[0])) / span if span > 0 else 1.0
+                chain.append(p0 + (p1 - p0) * np.float32(fraction))
+            draw_polyline(self.buffer, np.array(chain), self.line.color, self.line.thickness)
+            current = chain[-1]
+            yield self.buffer
+
+        self._draw_complete(self.buffer)
+        yield self.buffer
+
+    def final_frame(self) -> np.ndarray:
+        """Der fertige Chart mit vollständiger Linie als eigenes Bild (unabhängig vom Puffer)."""
+        frame = np.empty_like(self.background)
+        self._draw_complete(frame)
+        return frame
+
+    def _draw_complete(self, canvas: np.ndarray):
+        """Hintergrund mit vollständiger Linie in `canvas` (letzter Animations-Frame und Standbild)."""
+        np.copyto(canvas, self.background)
+        draw_polyline(canvas, self.line.points, self.line.color, self.line.thickness)
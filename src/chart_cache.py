@@ -0,0 +1,132 @@
+# src/chart_cache.py
+
+import hashlib
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+from chart_animation import ChartLine, LineDrawAnimation
+
+# Standardgrenzen für den Cache auf der Festplatte
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024 # 500 MB
+DEFAULT_MAX_AGE_DAYS = 14
+
+
+class ChartCache:
+    """
+    Inhaltsadressierter Cache für gerenderte Chart-Frames auf der Festplatte.
+    Der Schlüssel ist ein Hash aus Ticker, Kursreihe (Datum + Wert), prozentualer
+    Veränderung und Stil/Vorlagen-Version, identische Charts werden daher nur
+    einmal gerendert. Einträge werden nach Alter und Gesamtgröße verdrängt
+    (älteste Zugriffe zuerst).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(ticker: str, historical_data: pd.Series, percentage_change: float, style: str) -> str:
+        """SHA-256 über alle Eingaben, die das Aussehen des Charts bestimmen."""
+        digest = hashlib.sha256()
+        digest.update(ticker.encode())
+        digest.update(pd.to_datetime(historical_data.index).asi8.tobytes())
+        digest.update(np.ascontiguousarray(historical_data.to_numpy(dtype=np.float64)).tobytes())
+        digest.update(repr(float(percentage_change)).encode())
+        digest.update(style.encode())
+        return digest.hexdigest()
+
+    def path(self, key: str, animation: bool = False) -> str:
+        """Dateipfad eines Eintrags (.npy für Frames, .npz für Animationen)."""
+        return os.path.join(self.cache_dir, f"{key}{'.npz' if animation else '.npy'}")
+
+    def get(self, key: str):
+        """Liefert den gespeicherten Frame oder None. Ein Treffer aktualisiert die Zugriffszeit."""
+        path = self.path(key)
+        try:
+            frame = np.load(path)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+        os.utime(path, None)
+        self.hits += 1
+        return frame
+
+    def put(self, key: str, frame: np.ndarray):
+        """Speichert einen Frame atomar (erst temporäre Datei, dann umbenennen)."""
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, frame)
+        os.replace(tmp_path, path)
+
+    def get_animation(self, key: str):
+        """Liefert eine gespeicherte LineDrawAnimation (Hintergrund + Linie) oder None."""
+        path = self.path(key, animation=True)
+        try:
+            with np.load(path) as data:
+                line = ChartLine(data["points"], tuple(int(c) for c in data["color"]), int(data["thickness"]))
+                animation = LineDrawAnimation(data["background"], line)
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            self.misses += 1
+            return None
+        os.utime(path, None)
+        self.hits += 1
+        return animation
+
+    def put_animation(self, key: str, animation):
+        """Speichert Hintergrund und Linie einer LineDrawAnimation atomar."""
+        path = self.path(key, animation=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, background=animation.background, points=animation.line.points,
+                     color=np.array(animation.line.color), thickness=np.array(animation.line.thickness))
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """
+        Entfernt Einträge, die älter als max_age_days sind, und danach die am
+        längsten nicht genutzten, bis die Gesamtgröße unter max_bytes liegt.
+        Gibt die Anzahl gelöschter Einträge zurück.
+        """
+        now = time.time()
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith((".npy", ".npz")):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort() # Älteste zuerst
+        total_bytes = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age_seconds and total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+            removed += 1
+
+        if removed:
+            logging.info(f"Chart-Cache: {removed} Einträge verdrängt, belegt noch {total_bytes / 1024 / 1024:.1f} MB.")
+        return removed
+
+
+def load_chart_file(path: str):
+    """Lädt einen gespeicherten Chart (.npy: BGR-Frame, .npz: LineDrawAnimation) oder None."""
+    key, ext = os.path.splitext(os.path.basename(path))
+    cache = ChartCache(os.path.dirname(path))
+    return cache.get_animation(key) if ext == ".npz" else cache.get(key)
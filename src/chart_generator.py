@@ -1,30 +1,173 @@
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
 import pandas as pd
 import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from PIL import Image
+from universe import default_universe
+from chart_cache import ChartCache
+from fast_chart import FastChartRenderer
+from chart_animation import ChartLine, LineDrawAnimation, line_thickness
+from settings import get_chart_engine
+from instrumentation import Measurement, active_recorder
+import logging
 
-# Zuordnung Ticker → Unternehmensname (DAX 40)
-ticker_to_name = {
-    "ADS.DE": "Adidas", "AIR.DE": "Airbus", "ALV.DE": "Allianz", "BAS.DE": "BASF",
-    "BAYN.DE": "Bayer", "BEI.DE": "Beiersdorf", "BMW.DE": "BMW", "BNR.DE": "Brenntag",
-    "CON.DE": "Continental", "1COV.DE": "Covestro", "DB1.DE": "Deutsche Börse",
-    "DBK.DE": "Deutsche Bank", "DTG.DE": "Delivery Hero", "DTE.DE": "Deutsche Telekom",
-    "DPW.DE": "Deutsche Post", "EOAN.DE": "E.ON", "ENR.DE": "Siemens Energy",
-    "FRE.DE": "Fresenius", "FME.DE": "Fresenius Medical Care", "HEI.DE": "Heidelberg Materials",
-    "HEN3.DE": "Henkel", "IFX.DE": "Infineon", "JEN.DE": "Jenoptik", "LIN.DE": "Linde",
-    "LHA.DE": "Lufthansa", "MBG.DE": "Mercedes-Benz", "MRK.DE": "Merck", "MTX.DE": "MTU Aero Engines",
-    "MUV2.DE": "Munich Re", "P911.DE": "Porsche AG", "PAH3.DE": "Porsche SE", "PUM.DE": "Puma",
-    "QIA.DE": "Qiagen", "RHM.DE": "Rheinmetall", "RWE.DE": "RWE", "SAP.DE": "SAP",
-    "SIE.DE": "Siemens", "SRT3.DE": "Sartorius", "SY1.DE": "Symrise", "VOW3.DE": "Volkswagen",
-    "VNA.DE": "Vonovia", "ZAL.DE": "Zalando"
-}
+# Ergebnis eines Chart-Auftrags: Dateipfad bzw. Frame bei Erfolg, sonst Fehlermeldung
+# (bzw. die Linien-Animation, wenn animiert gerendert wurde)
+# sowie die Messwerte des Auftrags aus dem Worker-Prozess (siehe instrumentation.Measurement)
+# und die Frame-Größe (Breite, Höhe), für die gerendert wurde
+ChartResult = namedtuple("ChartResult", ["ticker", "path", "error", "frame", "cached", "animation", "metrics", "size"],
+                         defaults=(None, False, None, None, None))
 
-def create_30_day_chart(ticker: str, historical_data: pd.Series, percentage_change: float, output_dir: str = "charts"):
-    os.makedirs(output_dir, exist_ok=True)
-    df = historical_data.copy()
-    df.index = pd.to_datetime(df.index)
+# Version von Stil und Vorlage; bei jeder optischen Änderung erhöhen, damit der Chart-Cache neu rendert
+CHART_TEMPLATE_VERSION = "1"
+
+# Videoauflösung der Chart-Frames und Rand um den Chart (bezogen auf 1080x1920)
+FRAME_WIDTH = 1080
+FRAME_HEIGHT = 1920
+CHART_BORDER = 100
+
+class ChartTemplate:
+    """
+    Wiederverwendbare Chart-Vorlage: Figure, Achsen, Rahmen, Ticks, Grid und Schriften
+    werden einmalig auf einer Agg-Canvas (ohne pyplot-Zustand) aufgebaut.
+    Pro Ticker werden nur Liniendaten, Titel, Farbe und Achsengrenzen aktualisiert.
+    Jede Instanz darf nur von einem Thread gleichzeitig benutzt werden
+    (siehe get_chart_template).
+    """
+
+    def __init__(self, width: int = 1080, height: int = 1920, dpi: int = 100):
+        self.width = width
+        self.height = height
+        self.figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.figure.patch.set_facecolor('black')
+        self.figure.patch.set_linewidth(4)        # Dicke des Rahmens
+        self.figure.patch.set_edgecolor('black')  # Rahmenfarbe schwarz
+        self.figure.patch.set_linestyle('solid')  # Rahmenstil
+
+        ax = self.figure.add_subplot(111)
+        self.ax = ax
+        ax.set_facecolor('black')
+        self.line, = ax.plot([], [], linewidth=4)
+
+        # Linksbündiger Titel oberhalb des Diagramms
+        self.title = self.figure.suptitle("", fontsize=36, weight='bold', ha='left', x=0.01, y=0.99)
+
+        # Achsen & Labels
+        ax.set_xlabel("Date", fontsize=30, color='white')
+        ax.set_ylabel("Price (EUR)", fontsize=30, color='white')
+        ax.tick_params(axis='x', colors='white', labelsize=24, width=2, length=6)  # Dickere Ticks
+        ax.tick_params(axis='y', colors='white', labelsize=24, width=2, length=6)  # Dickere Ticks
+
+        # Achsenlinien dicker machen
+        ax.spines['bottom'].set_color('white')
+        ax.spines['bottom'].set_linewidth(2.5)  # Dicke der unteren Achse
+        ax.spines['left'].set_color('white')
+        ax.spines['left'].set_linewidth(2.5)    # Dicke der linken Achse
+        ax.spines['top'].set_color('black')     # Ausgeblendete obere Achse bleibt schwarz
+        ax.spines['top'].set_linewidth(0)
+        ax.spines['right'].set_color('black')   # Ausgeblendete rechte Achse bleibt schwarz
+        ax.spines['right'].set_linewidth(0)
+
+        ax.grid(True, linestyle='--', alpha=0.3, color='white')
+
+        # tight_layout nur neu berechnen, wenn sich die Breite der Y-Tick-Labels ändert
+        self._layout_key = None
+
+    def render(self, df: pd.Series, title_text: str, line_color: str):
+        """Zeichnet die Kursreihe in die Vorlage und gibt das Bild als RGBA-Array (H x W x 4) zurück."""
+        x_values = mdates.date2num(df.index.to_pydatetime())
+        ax = self.ax
+
+        self.line.set_data(x_values, df.values)
+        self.line.set_color(line_color)
+        self.title.set_text(title_text)
+        self.title.set_color(line_color)
+
+        # X-Ticks reduzieren
+        num_ticks = 5
+        tick_indices = [int(i) for i in range(0, len(df), max(len(df) // num_ticks, 1))][:num_ticks]
+        tick_indices.append(len(df) - 1)
+        unique_tick_indices = sorted(set(tick_indices))
+        ax.set_xticks([x_values[i] for i in unique_tick_indices])
+        ax.set_xticklabels([df.index[i].strftime('%d.%m.') for i in unique_tick_indices], rotation=45, ha='right')
+
+        # X-Achse mit dem gleichen Rand wie die automatische Skalierung (5%)
+        x_margin = (x_values[-1] - x_values[0]) * 0.05 or 1.0
+        ax.set_xlim(x_values[0] - x_margin, x_values[-1] + x_margin)
+
+        # Y-Achse mit Puffer
+        y_min, y_max = df.min(), df.max()
+        padding = (y_max - y_min) * 0.1
+        ax.set_ylim(y_min - padding, y_max + padding)
+
+        y_ticks = ax.yaxis.get_major_locator()()
+        layout_key = max((len(label) for label in ax.yaxis.get_major_formatter().format_ticks(y_ticks)), default=0)
+        if layout_key != self._layout_key:
+            self.figure.tight_layout()
+            self._layout_key = layout_key
+
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba())
+
+    def render_layers(self, df: pd.Series, title_text: str, line_color: str):
+        """
+        Rendert den Chart ohne Kurslinie und gibt (BGR-Bild, ChartLine) zurück;
+        die Linie liegt in Pixelkoordinaten des Bildes vor (für die Linien-Animation).
+        """
+        self.line.set_visible(False)
+        try:
+            background = np.ascontiguousarray(self.render(df, title_text, line_color)[:, :, 2::-1])
+        finally:
+            self.line.set_visible(True)
+
+        # Datenkoordinaten -> Pixel (Agg zählt y von unten)
+        display = self.ax.transData.transform(np.column_stack(self.line.get_data()))
+        points = np.column_stack([display[:, 0], self.height - display[:, 1]]).astype(np.float32)
+        color = tuple(round(c * 255) for c in reversed(mcolors.to_rgb(line_color)))
+        width_px = self.line.get_linewidth() * self.figure.dpi / 72
+        return background, ChartLine(points, color, line_thickness(width_px))
+
+
+_thread_local = threading.local()
+
+
+def get_chart_template(width: int = 1080, height: int = 1920, dpi: float = 100) -> ChartTemplate:
+    """Liefert die Chart-Vorlage des aktuellen Threads für die Größe (wird beim ersten Aufruf erstellt)."""
+    templates = getattr(_thread_local, "chart_templates", None)
+    if templates is None:
+        templates = _thread_local.chart_templates = {}
+    key = (width, height, dpi)
+    if key not in templates:
+        templates[key] = ChartTemplate(width, height, dpi)
+    return templates[key]
+
+
+def get_fast_renderer(width: int = 1080, height: int = 1920, dpi: float = 100) -> FastChartRenderer:
+    """Liefert den schnellen Renderer des aktuellen Threads für die Größe (wird beim ersten Aufruf erstellt)."""
+    renderers = getattr(_thread_local, "fast_renderers", None)
+    if renderers is None:
+        renderers = _thread_local.fast_renderers = {}
+    key = (width, height, dpi)
+    if key not in renderers:
+        renderers[key] = FastChartRenderer(width, height, dpi)
+    return renderers[key]
+
+
+def _prepare_chart(ticker: str, historical_data: pd.Series, percentage_change: float):
+    """Bereitet Kursreihe, Titel und Linienfarbe für einen Chart vor."""
+    # Kursreihen aus der PriceMatrix haben bereits einen DatetimeIndex und werden ohne Kopie übernommen
+    df = historical_data
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df = pd.Series(df.to_numpy(), index=pd.to_datetime(df.index), name=df.name)
 
     # Farbe basierend auf Kursverlauf
     if percentage_change > 0:
@@ -38,77 +181,215 @@ def create_30_day_chart(ticker: str, historical_data: pd.Series, percentage_chan
         change_text = f"{percentage_change:.2f}%"
 
     # Namen aus Mapping holen
-    company_name = ticker_to_name.get(ticker, ticker)
-
-    # Plot vorbereiten
-    fig, ax = plt.subplots(figsize=(1080/100, 1920/100), dpi=100)
-    fig.patch.set_facecolor('black')
-    fig.patch.set_linewidth(4)        # Dicke des Rahmens
-    fig.patch.set_edgecolor('black')  # Rahmenfarbe schwarz
-    fig.patch.set_linestyle('solid')  # Rahmenstil
-    ax.set_facecolor('black')
-    ax.plot(df.index, df.values, color=line_color, linewidth=4)
-
-    # Linksbündiger Titel oberhalb des Diagramms
-    plt.suptitle(f"{company_name} ({ticker}) \n {change_text}",
-             fontsize=36, color=line_color, weight='bold',
-             ha='left', x=0.01, y=0.99)
-
-
-
-    # Achsen & Labels
-    ax.set_xlabel("Date", fontsize=30, color='white')
-    ax.set_ylabel("Price (EUR)", fontsize=30, color='white')
-    ax.tick_params(axis='x', colors='white', labelsize=24, width=2, length=6)  # Dickere Ticks
-    ax.tick_params(axis='y', colors='white', labelsize=24, width=2, length=6)  # Dickere Ticks
-
-    # Achsenlinien dicker machen
-    ax.spines['bottom'].set_color('white')
-    ax.spines['bottom'].set_linewidth(2.5)  # Dicke der unteren Achse
-    ax.spines['left'].set_color('white')
-    ax.spines['left'].set_linewidth(2.5)    # Dicke der linken Achse
-    ax.spines['top'].set_color('black')     # Ausgeblendete obere Achse bleibt schwarz
-    ax.spines['top'].set_linewidth(0)
-    ax.spines['right'].set_color('black')   # Ausgeblendete rechte Achse bleibt schwarz
-    ax.spines['right'].set_linewidth(0)
-
-    ax.grid(True, linestyle='--', alpha=0.3, color='white')
-
-    # X-Ticks reduzieren
-    num_ticks = 5
-    tick_indices = [int(i) for i in range(0, len(df), len(df) // num_ticks)][:num_ticks]
-    tick_indices.append(len(df) - 1)
-    unique_tick_indices = sorted(set(tick_indices))
-    ax.set_xticks([df.index[i] for i in unique_tick_indices])
-    ax.set_xticklabels([df.index[i].strftime('%d.%m.') for i in unique_tick_indices], rotation=45, ha='right')
-
-    # Y-Achse mit Puffer
-    y_min, y_max = df.min(), df.max()
-    padding = (y_max - y_min) * 0.1
-    ax.set_ylim(y_min - padding, y_max + padding)
-
-    plt.tight_layout()
-    safe_ticker = ticker.replace(".DE", "").replace(".DEX", "").replace("^", "")
-    filename = os.path.join(output_dir, f"{safe_ticker}_30_day_temp_chart.png")
-    plt.savefig(filename, facecolor=fig.get_facecolor())
-    plt.close(fig)
+    company_name = default_universe().name(ticker)
+    return df, f"{company_name} ({ticker}) \n {change_text}", line_color, company_name
+
+
+def _safe_ticker(ticker: str) -> str:
+    return ticker.replace(".DE", "").replace(".DEX", "").replace("^", "")
+
+
+def create_30_day_chart(ticker: str, historical_data: pd.Series, percentage_change: float, output_dir: str = "charts"):
+    os.makedirs(output_dir, exist_ok=True)
+    df, title_text, line_color, company_name = _prepare_chart(ticker, historical_data, percentage_change)
+
+    # Chart in der wiederverwendbaren Vorlage zeichnen
+    chart_rgba = get_chart_template().render(df, title_text, line_color)
+    chart_img = Image.fromarray(chart_rgba, "RGBA")
 
     # Schwarzes Hintergrundbild mit Rahmen (1280x2120)
     background_width = 1080 + 2 * 100  # = 1280
     background_height = 1920 + 2 * 100  # = 2120
     background = Image.new("RGB", (background_width, background_height), "black")
 
-    chart_img = Image.open(filename).convert("RGBA")
-
     # Position für zentriertes Einfügen
     x = (background_width - chart_img.width) // 2
     y = (background_height - chart_img.height) // 2
 
     background.paste(chart_img, (x, y), chart_img)
 
-    filename_f = os.path.join(output_dir, f"{safe_ticker}_30_day_chart.png")
+    filename_f = os.path.join(output_dir, f"{_safe_ticker(ticker)}_30_day_chart.png")
     background.save(filename_f)
-    os.remove(filename)
 
     print(f"Chart für {company_name} gespeichert unter: {filename_f}")
-    return filename_f
\ No newline at end of file
+    return filename_f
+
+
+def _chart_layout(frame_width: int, frame_height: int):
+    """Rand, Chartgröße und dpi so skaliert, wie es das Einpassen des 1280x2120-Bildes ergab."""
+    border_x = round(frame_width * CHART_BORDER / (1080 + 2 * CHART_BORDER))
+    border_y = round(frame_height * CHART_BORDER / (1920 + 2 * CHART_BORDER))
+    chart_width = frame_width - 2 * border_x
+    chart_height = frame_height - 2 * border_y
+    return border_x, border_y, chart_width, chart_height, 100 * chart_width / 1080
+
+
+def _place_in_frame(chart_bgr: np.ndarray, frame_width: int, frame_height: int, border_x: int, border_y: int) -> np.ndarray:
+    """Setzt das Chartbild mit schwarzem Rand in einen Frame der Videoauflösung."""
+    frame = np.zeros((frame_height, frame_width, 3), dtype=np.uint8)
+    frame_area = frame[border_y:border_y + chart_bgr.shape[0], border_x:border_x + chart_bgr.shape[1]]
+    frame_area[...] = chart_bgr[:frame_area.shape[0], :frame_area.shape[1]]
+    return frame
+
+
+def render_chart_frame(ticker: str, historical_data: pd.Series, percentage_change: float,
+                       frame_width: int = FRAME_WIDTH, frame_height: int = FRAME_HEIGHT,
+                       debug_dir: str = None, engine: str = None) -> np.ndarray:
+    """
+    Rendert den Chart direkt als BGR-Frame (frame_height x frame_width x 3, uint8) in Videoauflösung,
+    inklusive schwarzem Rand. Entspricht optisch create_30_day_chart nach dem Herunterskalieren
+    im Video, aber ohne PNG-Dateien und ohne Resize.
+    `engine` wählt die Render-Engine ("matplotlib" oder "fast", Standard aus config/settings.ini).
+    Mit `debug_dir` wird der Frame zusätzlich als PNG gespeichert.
+    """
+    df, title_text, line_color, company_name = _prepare_chart(ticker, historical_data, percentage_change)
+    if engine is None:
+        engine = get_chart_engine()
+    border_x, border_y, chart_width, chart_height, dpi = _chart_layout(frame_width, frame_height)
+
+    if engine == "fast":
+        chart_bgr = get_fast_renderer(chart_width, chart_height, dpi).render(df, title_text, line_color)
+    elif engine == "matplotlib":
+        # Hintergrund der Figure ist deckend schwarz, RGBA -> BGR genügt
+        chart_bgr = get_chart_template(chart_width, chart_height, dpi).render(df, title_text, line_color)[:, :, 2::-1]
+    else:
+        raise ValueError(f"Unbekannte Chart-Engine: {engine}")
+
+    frame = _place_in_frame(chart_bgr, frame_width, frame_height, border_x, border_y)
+
+    if debug_dir is not None:
+        os.makedirs(debug_dir, exist_ok=True)
+        debug_path = os.path.join(debug_dir, f"{_safe_ticker(ticker)}_30_day_chart.png")
+        Image.fromarray(frame[:, :, ::-1]).save(debug_path)
+        print(f"Debug-Chart für {company_name} gespeichert unter: {debug_path}")
+
+    return frame
+
+
+def render_chart_animation(ticker: str, historical_data: pd.Series, percentage_change: float,
+                           frame_width: int = FRAME_WIDTH, frame_height: int = FRAME_HEIGHT,
+                           engine: str = None) -> LineDrawAnimation:
+    """
+    Rendert den Chart einmal ohne Kurslinie in Videoauflösung und liefert eine
+    LineDrawAnimation, die die Linie Frame für Frame in diesen Hintergrund zeichnet.
+    """
+    df, title_text, line_color, _ = _prepare_chart(ticker, historical_data, percentage_change)
+    if engine is None:
+        engine = get_chart_engine()
+    border_x, border_y, chart_width, chart_height, dpi = _chart_layout(frame_width, frame_height)
+
+    if engine == "fast":
+        chart_bgr, line = get_fast_renderer(chart_width, chart_height, dpi).render_layers(df, title_text, line_color)
+    elif engine == "matplotlib":
+        chart_bgr, line = get_chart_template(chart_width, chart_height, dpi).render_layers(df, title_text, line_color)
+    else:
+        raise ValueError(f"Unbekannte Chart-Engine: {engine}")
+
+    background = _place_in_frame(chart_bgr, frame_width, frame_height, border_x, border_y)
+    line = line._replace(points=line.points + np.array([border_x, border_y], dtype=np.float32))
+    return LineDrawAnimation(background, line)
+
+
+def _render_chart_job(job):
+    """Rendert einen Chart-Auftrag im Worker-Prozess und hängt die Messwerte an das Ergebnis an."""
+    measurement = Measurement()
+    result = _render_chart(job)
+    return result._replace(metrics=measurement.finish())
+
+
+def _render_chart(job):
+    """Rendert einen Chart-Auftrag, als PNG-Datei, als Frame im Speicher oder als Animation."""
+    ticker, historical_data, percentage_change, output_dir, as_frames, save_debug_png, cache_dir, animate, size = job
+    frame_width, frame_height = size
+    try:
+        if animate:
+            cache = ChartCache(cache_dir) if cache_dir else None
+            if cache is not None:
+                style = f"{CHART_TEMPLATE_VERSION}:{get_chart_engine()}:{frame_width}x{frame_height}:animation"
+                key = ChartCache.make_key(ticker, historical_data, percentage_change, style)
+                animation = cache.get_animation(key)
+                if animation is not None:
+                    return ChartResult(ticker, None, None, cached=True, animation=animation, size=size)
+
+            animation = render_chart_animation(ticker, historical_data, percentage_change, frame_width, frame_height)
+            if cache is not None:
+                cache.put_animation(key, animation)
+            return ChartResult(ticker, None, None, animation=animation, size=size)
+        if as_frames:
+            path = os.path.join(output_dir, f"{_safe_ticker(ticker)}_30_day_chart.png") if save_debug_png else None
+            cache = ChartCache(cache_dir) if cache_dir else None
+            if cache is not None:
+                style = f"{CHART_TEMPLATE_VERSION}:{get_chart_engine()}:{frame_width}x{frame_height}"
+                key = ChartCache.make_key(ticker, historical_data, percentage_change, style)
+                frame = cache.get(key)
+                if frame is not None:
+                    return ChartResult(ticker, None, None, frame, True, size=size)
+
+            frame = render_chart_frame(ticker, historical_data, percentage_change, frame_width, frame_height,
+                                       debug_dir=output_dir if save_debug_png else None)
+            if cache is not None:
+                cache.put(key, frame)
+            return ChartResult(ticker, path, None, frame, size=size)
+        return ChartResult(ticker, create_30_day_chart(ticker, historical_data, percentage_change, output_dir), None,
+                           size=size)
+    except Exception as e:
+        return ChartResult(ticker, None, f"{type(e).__name__}: {e}", size=size)
+
+
+def create_charts_parallel(chart_jobs: list, output_dir: str = "charts", max_workers: int = None,
+                           as_frames: bool = False, save_debug_png: bool = False, cache_dir: str = None,
+                           animate: bool = False, frame_sizes: list = None):
+    """
+    Rendert mehrere Charts parallel in einem Prozess-Pool (Standard: ein Prozess pro CPU-Kern).
+    `chart_jobs` ist eine Liste von (ticker, historical_data, percentage_change).
+    Mit `as_frames` enthält jedes Ergebnis den BGR-Frame in Videoauflösung statt einer Datei;
+    `frame_sizes` ist eine Liste von (Breite, Höhe), für die jeder Chart gerendert wird
+    (Standard: FRAME_WIDTH x FRAME_HEIGHT), alle Größen teilen sich einen Pool;
+    `save_debug_png` schreibt die Frames zusätzlich nach `output_dir`.
+    Mit `cache_dir` werden Frames aus dem Chart-Cache geladen bzw. dort abgelegt (nur bei `as_frames`).
+    Mit `animate` enthält jedes Ergebnis stattdessen eine LineDrawAnimation (`animation`).
+    Ohne beides entsteht pro Chart eine PNG-Datei im festen Format von create_30_day_chart;
+    `frame_sizes` ist dann nicht zulässig (ValueError).
+    Gibt eine Liste von ChartResult in der Reihenfolge der Aufträge zurück, pro Auftrag
+    ein Ergebnis je Größe (`size`); Fehler werden pro Ticker gemeldet, statt den gesamten
+    Lauf abzubrechen.
+    """
+    if frame_sizes is not None and not (as_frames or animate):
+        raise ValueError("frame_sizes erfordert as_frames oder animate, PNG-Charts haben ein festes Format.")
+    if frame_sizes is None:
+        frame_sizes = [(FRAME_WIDTH, FRAME_HEIGHT)]
+    jobs = [(ticker, data, change, output_dir, as_frames, save_debug_png, cache_dir, animate, tuple(size))
+            for ticker, data, change in chart_jobs for size in frame_sizes]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(jobs))
+
+    if max_workers <= 1:
+        results = [_render_chart_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # map() liefert die Ergebnisse in Auftragsreihenfolge (Gewinner vor Verlierern)
+            results = list(executor.map(_render_chart_job, jobs))
+
+    report_chart_results(results, cache_dir if as_frames or animate else None)
+    return results
+
+
+def report_chart_results(results: list, cache_dir: str = None):
+    """
+    Trägt die Messwerte der Chart-Aufträge als Unterschritte "chart" in den aktiven RunRecorder ein;
+    mit `cache_dir` werden Treffer im Chart-Cache protokolliert und der Cache anschließend bereinigt.
+    """
+    recorder = active_recorder()
+    if recorder is not None:
+        stage_name = recorder.child_name("chart")
+        for result in results:
+            recorder.add_record(stage_name, result.metrics, status="ok" if result.error is None else "error",
+                                error=result.error, **recorder.current_labels(), ticker=result.ticker,
+                                cached=result.cached, size=f"{result.size[0]}x{result.size[1]}")
+
+    if cache_dir:
+        hits = sum(1 for result in results if result.cached)
+        misses = sum(1 for result in results if result.error is None and not result.cached)
+        logging.info(f"Chart-Cache: {hits} Treffer, {misses} nicht im Cache (neu gerendert).")
+        ChartCache(cache_dir).evict()
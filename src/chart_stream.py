@@ -0,0 +1,171 @@
+# src/chart_stream.py
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
+from chart_generator import ChartResult, _render_chart_job, report_chart_results
+from instrumentation import active_recorder, stage
+from video_maker import DeferredChart, VideoResult, create_tiktok_video
+
+# Charts, die pro Ausgabeformat höchstens vor dem langsamsten Video gerendert werden;
+# begrenzt die Frames bzw. Animationen, die gleichzeitig im Speicher liegen
+MAX_CHARTS_AHEAD = 4
+
+
+class ChartStream:
+    """
+    Rendert Charts in einem Prozess-Pool, während die Videos sie bereits kodieren.
+    Die Charts werden in Timeline-Reihenfolge (Gewinner vor Verlierern) eingereicht,
+    für alle Ausgabeformate im selben Pool. Ein Video holt seine Charts über `get`
+    (bzw. als DeferredChart aus `deferred`) und wartet nur, wenn der nächste Chart
+    noch nicht fertig ist.
+    Backpressure: Es werden nur Charts eingereicht, die höchstens `max_ahead` Positionen
+    vor dem langsamsten Video liegen; schneller rendernde Worker warten dann auf den Encoder.
+    Ein fehlgeschlagener Chart liefert None (das Video zeigt einen Platzhalter),
+    statt das Video abzubrechen.
+
+    Verwendung:
+        with ChartStream(chart_jobs, frame_sizes, cache_dir=CHART_CACHE_DIR) as stream:
+            create_tiktok_video(..., chart_frames=stream.deferred(size), frame_size=size)
+    """
+
+    def __init__(self, chart_jobs: list, frame_sizes: list, max_workers: int = None,
+                 max_ahead: int = MAX_CHARTS_AHEAD, output_dir: str = "charts", save_debug_png: bool = False,
+                 cache_dir: str = None, animate: bool = False):
+        self.chart_jobs = list(chart_jobs)
+        self.frame_sizes = [tuple(size) for size in frame_sizes]
+        self.max_ahead = max(1, max_ahead)
+        self.output_dir = output_dir
+        self.save_debug_png = save_debug_png
+        self.cache_dir = cache_dir
+        self.animate = animate
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        # Nicht mehr Worker, als Aufträge gleichzeitig eingereicht sein können: Der Pool startet sie
+        # dann alle in __enter__, bevor die Video-Threads laufen (fork ohne fremde Threads)
+        self.max_workers = max(1, min(max_workers, min(self.max_ahead, len(self.chart_jobs)) * len(self.frame_sizes)))
+        self.results = {} # (Position, Größe) -> ChartResult ohne Frame und Animation
+        self._cursors = {size: 0 for size in self.frame_sizes} # Nächste Position, die das Video anfordert
+        self._submitted = 0
+        self._futures = {}
+        self._condition = threading.Condition()
+        self._executor = None
+
+    def __enter__(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        with self._condition:
+            self._submit_ready()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._condition:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        self._executor.shutdown(wait=True)
+        report_chart_results(self.chart_results(), self.cache_dir)
+        return False
+
+    def _submit_ready(self):
+        """Reicht alle Charts bis `max_ahead` vor dem langsamsten Video ein (mit gehaltener Condition)."""
+        limit = min(min(self._cursors.values(), default=0) + self.max_ahead, len(self.chart_jobs))
+        while self._submitted < limit:
+            ticker, data, change = self.chart_jobs[self._submitted]
+            for size in self.frame_sizes:
+                job = (ticker, data, change, self.output_dir, True, self.save_debug_png, self.cache_dir,
+                       self.animate, size)
+                try:
+                    future = self._executor.submit(_render_chart_job, job)
+                except Exception as e: # z.B. BrokenProcessPool: der Chart gilt als fehlgeschlagen
+                    future = Future()
+                    future.set_exception(e)
+                self._futures[(self._submitted, size)] = future
+            self._submitted += 1
+        self._condition.notify_all()
+
+    def get(self, position: int, size):
+        """
+        Wartet auf den Chart an `position` im Format `size` und liefert den Frame bzw. die
+        LineDrawAnimation, bei einem Fehler None. Pro Format in aufsteigender Position aufrufen.
+        """
+        size = tuple(size)
+        with self._condition:
+            self._cursors[size] = position
+            self._submit_ready()
+            while (position, size) not in self._futures:
+                self._condition.wait()
+            future = self._futures.pop((position, size))
+
+        ticker = self.chart_jobs[position][0]
+        try:
+            result = future.result()
+        except Exception as e:
+            result = ChartResult(ticker, None, f"{type(e).__name__}: {e}", size=size)
+        self.results[(position, size)] = result._replace(frame=None, animation=None)
+        if result.error is not None:
+            logging.error(f"Fehler beim Erstellen des Charts für {ticker} ({size[0]}x{size[1]}): {result.error}")
+            return None
+        return result.animation if self.animate else result.frame
+
+    def finish(self, size):
+        """Das Video im Format `size` braucht keine Charts mehr (fertig oder abgebrochen)."""
+        with self._condition:
+            self._cursors[tuple(size)] = len(self.chart_jobs)
+            self._submit_ready()
+
+    def deferred(self, size) -> list:
+        """Die Charts eines Formats als DeferredChart, für create_tiktok_video(chart_frames=...)."""
+        return [DeferredChart(partial(self.get, position, tuple(size)), self.animate)
+                for position in range(len(self.chart_jobs))]
+
+    def chart_results(self) -> list:
+        """Die abgeholten Ergebnisse in Auftragsreihenfolge (wie create_charts_parallel, ohne Frames)."""
+        return [self.results[key] for key in sorted(self.results)]
+
+
+def _stream_video(stream: ChartStream, job, recorder_stages: list) -> VideoResult:
+    """Kodiert ein Video aus den Charts des Streams (im Thread, FFmpeg läuft als eigener Prozess)."""
+    recorder = active_recorder()
+    size = tuple(job.frame_size)
+    try:
+        with recorder.attach(recorder_stages) if recorder is not None else nullcontext():
+            with stage("video", size=f"{size[0]}x{size[1]}"):
+                create_tiktok_video(None, job.output_filepath, job.background_music_path, job.chart_display_duration,
+                                    {}, job.video_date, job.index_name, chart_frames=stream.deferred(size),
+                                    frame_size=size, chart_overlays=job.chart_overlays)
+        return VideoResult(job.output_filepath, None, None)
+    except Exception as e:
+        logging.error(f"Fehler bei der Videokodierung für {job.output_filepath}: {e}", exc_info=True)
+        return VideoResult(job.output_filepath, f"{type(e).__name__}: {e}", None)
+    finally:
+        stream.finish(size)
+
+
+def create_videos_streaming(chart_jobs: list, video_jobs: list, max_workers: int = None,
+                            max_ahead: int = MAX_CHARTS_AHEAD, output_dir: str = "charts",
+                            save_debug_png: bool = False, cache_dir: str = None, animate: bool = False):
+    """
+    Rendert die Charts und kodiert die Videos überlappend statt nacheinander:
+    Die Charts entstehen in einem Prozess-Pool (ChartStream), jedes Video (ein VideoJob
+    pro Ausgabeformat, `chart_files` bleibt leer) wird in einem eigenen Thread kodiert
+    und übernimmt seine Charts in Timeline-Reihenfolge, sobald sie fertig sind.
+    Die Laufzeit nähert sich damit der Dauer der langsameren Stufe statt der Summe.
+    `chart_jobs` ist eine Liste von (ticker, historical_data, percentage_change).
+    Gibt (VideoResult pro Auftrag, ChartResult pro Chart und Format) zurück; fehlgeschlagene
+    Charts erscheinen im Video als Platzhalter, ein fehlgeschlagenes Video bricht die übrigen nicht ab.
+    """
+    frame_sizes = [tuple(job.frame_size) for job in video_jobs]
+    if len(set(frame_sizes)) != len(frame_sizes):
+        raise ValueError("Jedes Video im Stream braucht eine eigene Auflösung.")
+    recorder = active_recorder()
+    recorder_stages = recorder.open_stages() if recorder is not None else []
+    with ChartStream(chart_jobs, frame_sizes, max_workers, max_ahead, output_dir,
+                     save_debug_png, cache_dir, animate) as stream:
+        with ThreadPoolExecutor(max_workers=max(1, len(video_jobs))) as executor:
+            futures = [executor.submit(_stream_video, stream, job, recorder_stages) for job in video_jobs]
+            results = [future.result() for future in futures]
+    return results, stream.chart_results()
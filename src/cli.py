@@ -0,0 +1,247 @@
+# src/cli.py
+"""
+Kommandozeile der TopMover-Pipeline:
+
+    python src/cli.py movers [--json]        # nur Mover berechnen (kein matplotlib/cv2)
+    python src/cli.py charts                 # Kursdaten, Mover und Charts (Schritte bis charts)
+    python src/cli.py video                  # Videos neu kodieren (Charts aus Checkpoint bzw. Chart-Cache)
+    python src/cli.py run                    # kompletter täglicher Lauf (wie main.py)
+    python src/cli.py startup                # Kaltstartzeit der Unterbefehle messen
+    python src/cli.py daemon [--port 8765]   # Dienst: Läufe nach XETRA-Kalender und per Trigger (daemon.py)
+
+Schwere Module (pandas, matplotlib, PIL, cv2) werden erst im Unterbefehl geladen,
+der sie braucht; Logging wird erst beim Ausführen eines Befehls eingerichtet.
+Mit `--timing` wird die Startzeit (Interpreter, Importe, Befehl) auf stderr ausgegeben.
+"""
+
+import time
+
+_CLI_STARTED = time.perf_counter()
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+# Module, die ein Unterbefehl lädt (für --import-only und die Kaltstartmessung)
+COMMAND_IMPORTS = {
+    "movers": ("dax_movers", "price_store", "data_provider"),
+    "charts": ("main",),
+    "video": ("main",),
+    "run": ("main",),
+}
+
+STARTUP_REPEATS = 5
+
+
+def _process_age_s():
+    """Sekunden seit dem Start des Prozesses (Linux /proc, sonst None), also inklusive Interpreter-Start."""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def _provider(args):
+    """ReplayProvider für --replay, sonst None (Live-Daten über yfinance)."""
+    if not args.replay:
+        return None
+    from data_provider import ReplayProvider
+
+    return ReplayProvider(args.replay)
+
+
+def _indices(args) -> tuple:
+    """Indizes aus --indices, sonst settings.MOVER_INDICES (wie main.py und daemon)."""
+    if args.indices:
+        return tuple(args.indices)
+    from settings import MOVER_INDICES
+
+    return tuple(MOVER_INDICES)
+
+
+def cmd_movers(args) -> int:
+    from dax_movers import get_index_movers
+    from price_store import PriceStore
+    from settings import CHART_DAYS, PRICE_STORE_FILE
+    from universe import default_universe
+
+    provider = _provider(args)
+    store = PriceStore(PRICE_STORE_FILE) if provider is None and not args.no_store else None
+    # Fortschrittsmeldungen nach stderr, damit stdout reines JSON bleibt
+    with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+        results = get_index_movers(_indices(args), args.num_movers, CHART_DAYS, store, provider, args.as_of,
+                                   horizon=args.horizon)
+    if results is None:
+        print("Fehler bei der Ermittlung der Mover.", file=sys.stderr)
+        return 1
+
+    universe = default_universe()
+    report = {index: {kind: [{"ticker": ticker, "name": universe.name(ticker), "change": round(float(change), 4)}
+                             for ticker, change in movers.items()]
+                      for kind, movers in (("gainers", gainers), ("losers", losers))}
+              for index, (gainers, losers, _) in results.items()}
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return 0
+    for index, kinds in report.items():
+        for kind, title in (("gainers", "Gewinner"), ("losers", "Verlierer")):
+            print(f"\n--- {index} Top {args.num_movers} {title} ---")
+            if not kinds[kind]:
+                print(f"Keine {title} gefunden.")
+            for mover in kinds[kind]:
+                print(f"{mover['ticker']:<10} {mover['name']:<28} {mover['change']:+8.2f}%")
+    return 0
+
+
+def _run_pipeline(args, force=(), targets=None) -> int:
+    from settings import configure_logging
+
+    configure_logging()
+    from main import run_daily_process
+
+    ok = run_daily_process(provider=_provider(args), as_of=args.as_of, indices=_indices(args),
+                           force=tuple(args.force) + tuple(force), targets=targets)
+    return 0 if ok else 1
+
+
+def cmd_charts(args) -> int:
+    return _run_pipeline(args, targets=("charts",))
+
+
+def cmd_video(args) -> int:
+    # Kursdaten und Mover kommen aus den Checkpoints, Kodierung und Mux laufen neu. Ohne VIDEO_STREAMING
+    # liest encode die Charts aus dem Checkpoint von charts; mit VIDEO_STREAMING rendert encode sie selbst
+    # (chart_stream), unveränderte Charts kommen dabei aus dem Chart-Cache
+    return _run_pipeline(args, force=("encode", "mux"))
+
+
+def cmd_run(args) -> int:
+    return _run_pipeline(args)
+
+
+def cmd_daemon(args) -> int:
+    from settings import configure_logging
+
+    configure_logging()
+    from daemon import TopMoverService
+
+    service = TopMoverService(args.indices, _provider(args), args.host, args.port)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def measure_cold_start(commands=tuple(COMMAND_IMPORTS), repeats: int = STARTUP_REPEATS) -> dict:
+    """
+    Misst die Kaltstartzeit (neuer Interpreter bis zum Ende der Importe) je Unterbefehl
+    über `cli.py --import-only <Befehl>` in frischen Prozessen, dazu den leeren Interpreter
+    als Referenz. Gibt {Befehl: Median in Sekunden} zurück.
+    """
+    variants = {"python": [sys.executable, "-c", "pass"]}
+    for command in commands:
+        variants[command] = [sys.executable, os.path.abspath(__file__), "--import-only", command]
+
+    results = {}
+    for name, argv in variants.items():
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run(argv, check=True, stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        results[name] = statistics.median(times)
+    return results
+
+
+def cmd_startup(args) -> int:
+    results = measure_cold_start(repeats=args.repeats)
+    if args.json:
+        print(json.dumps({name: round(seconds * 1000, 1) for name, seconds in results.items()}))
+        return 0
+    for name, seconds in results.items():
+        print(f"{name:<8} {seconds * 1000:8.1f} ms (Median aus {args.repeats} Starts)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="TopMover: DAX-Mover ermitteln, Charts und Videos erstellen.")
+    parser.add_argument("--timing", action="store_true", help="Startzeit und Laufzeit auf stderr ausgeben.")
+    parser.add_argument("--import-only", action="store_true", help=argparse.SUPPRESS)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(subparser):
+        subparser.add_argument("--indices", nargs="+",
+                               help="Indizes aus der Universe-Registry (Standard: settings.py).")
+        subparser.add_argument("--as-of", type=_parse_date, help="Stichtag (YYYY-MM-DD, Standard: heute).")
+        subparser.add_argument("--replay", metavar="DIR", help="Kursdaten aus Fixture-Dateien statt yfinance.")
+
+    movers = subparsers.add_parser("movers", help="Nur die Top-Mover berechnen.")
+    add_common(movers)
+    movers.add_argument("--num-movers", type=int, default=5, help="Gewinner bzw. Verlierer pro Index.")
+    movers.add_argument("--horizon", choices=("1d", "5d", "30d", "ytd"), default="1d",
+                        help="Zeitraum der Veränderung (Standard: Vortag).")
+    movers.add_argument("--json", action="store_true", help="Ausgabe als JSON auf stdout.")
+    movers.add_argument("--no-store", action="store_true", help="Lokalen Kursspeicher nicht verwenden.")
+    movers.set_defaults(func=cmd_movers)
+
+    for name, func, help_text in (("charts", cmd_charts, "Kursdaten, Mover und Charts (ohne Video)."),
+                                  ("video", cmd_video, "Videos neu kodieren und Musik einmischen; Charts aus dem "
+                                                             "Checkpoint oder (VIDEO_STREAMING) aus dem Chart-Cache."),
+                                  ("run", cmd_run, "Kompletter täglicher Lauf.")):
+        subparser = subparsers.add_parser(name, help=help_text)
+        add_common(subparser)
+        subparser.add_argument("--force", nargs="+", default=[], help="Schritte erneut ausführen (Name oder Art).")
+        subparser.set_defaults(func=func)
+
+    daemon = subparsers.add_parser("daemon", help="Als Dienst laufen (XETRA-Kalender, Trigger-Endpunkt).")
+    daemon.add_argument("--indices", nargs="+", help="Indizes aus der Universe-Registry (Standard: settings.py).")
+    daemon.add_argument("--replay", metavar="DIR", help="Kursdaten aus Fixture-Dateien statt yfinance.")
+    daemon.add_argument("--host", default="127.0.0.1", help="Adresse des Trigger-Endpunkts.")
+    daemon.add_argument("--port", type=int, default=8765, help="Port des Trigger-Endpunkts.")
+    daemon.set_defaults(func=cmd_daemon)
+
+    startup = subparsers.add_parser("startup", help="Kaltstartzeit der Unterbefehle messen.")
+    startup.add_argument("--repeats", type=int, default=STARTUP_REPEATS, help="Starts pro Unterbefehl.")
+    startup.add_argument("--json", action="store_true", help="Ausgabe als JSON (Millisekunden).")
+    startup.set_defaults(func=cmd_startup)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # Prozessstart (Interpreter und dieses Modul) bis vor die Importe des Unterbefehls
+    process_age = _process_age_s()
+    imports_started = time.perf_counter()
+    for module in COMMAND_IMPORTS.get(args.command, ()):
+        importlib.import_module(module)
+    if args.import_only:
+        return 0
+
+    command_started = time.perf_counter()
+    status = args.func(args)
+    if args.timing:
+        startup = f"Prozessstart {process_age * 1000:.0f} ms, " if process_age is not None else \
+            f"cli.py {(imports_started - _CLI_STARTED) * 1000:.1f} ms, "
+        print(f"[timing] {startup}Importe {args.command} {(command_started - imports_started) * 1000:.1f} ms, "
+              f"Befehl {(time.perf_counter() - command_started) * 1000:.1f} ms", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,284 @@
+# src/daemon.py
+"""
+Dienst-Modus: ein dauerhaft laufender Prozess statt eines täglichen Kaltstarts.
+
+    python src/daemon.py                                   # Video nach jedem XETRA-Handelstag
+    python src/daemon.py --port 8765 --indices DAX MDAX
+    curl -X POST http://127.0.0.1:8765/run                 # sofortiger Lauf für den letzten Handelstag
+    curl -X POST 'http://127.0.0.1:8765/run?as_of=2025-10-02&force=charts,encode'
+    curl http://127.0.0.1:8765/status
+
+Beim Start werden pandas, yfinance, matplotlib (inkl. Font-Cache), PIL und cv2
+geladen und die Chart-Vorlagen aller Ausgabeformate einmal gerendert; die Worker-
+Prozesse für Charts und Videos entstehen per fork aus diesem vorgewärmten Prozess.
+Der Lauf für einen Handelstag startet, sobald dessen Schlusskurse vorliegen
+(trading_calendar.data_available_at); Wochenenden und XETRA-Feiertage werden
+übersprungen. Fehlen die Kurse noch, wird nach RETRY_INTERVAL erneut versucht.
+Manuelle Läufe kommen über einen HTTP-Endpunkt auf localhost und laufen nacheinander
+mit den geplanten Läufen im selben Prozess.
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from trading_calendar import (XETRA_TIMEZONE, last_available_session, next_session_available, next_trading_day,
+                              previous_trading_day)
+
+DAEMON_HOST = "127.0.0.1" # Nur lokal erreichbar
+DAEMON_PORT = 8765
+
+# Erneuter Versuch, wenn die Kurse des Handelstags noch fehlen oder der Lauf fehlschlägt
+RETRY_INTERVAL = timedelta(minutes=15)
+MAX_ATTEMPTS = 8
+
+# Längste Wartezeit am Stück, danach wird der Zeitplan neu berechnet (z.B. nach Zeitumstellung)
+MAX_SLEEP_S = 3600
+
+# Manueller Lauf aus dem Trigger-Endpunkt: Parameter für run_daily_process, Signal und Ergebnis
+RunRequest = namedtuple("RunRequest", ["as_of", "force", "targets", "done", "result"])
+
+
+class TopMoverService:
+    """
+    Führt den täglichen Ablauf (main.run_daily_process) in einem langlebigen Prozess aus:
+    geplant nach dem XETRA-Kalender und auf Anforderung über `trigger`.
+    Alle Läufe laufen nacheinander im Thread von `serve_forever`.
+    """
+
+    def __init__(self, indices=None, provider=None, host: str = DAEMON_HOST, port: int = DAEMON_PORT):
+        from settings import MOVER_INDICES
+
+        self.indices = tuple(indices or MOVER_INDICES)
+        self.provider = provider
+        self.host = host
+        self.port = port
+        self.requests = queue.Queue()
+        self.completed = set()  # Handelstage, deren Videos erstellt wurden
+        self.attempts = {}      # Handelstag -> Anzahl fehlgeschlagener geplanter Läufe
+        self.retry_at = {}      # Handelstag -> frühester nächster Versuch
+        self.last_run = None
+        self.warm_up_s = None
+        self._stopping = threading.Event()
+        self._closed = False # Nach dem Ende von serve_forever werden keine Läufe mehr angenommen
+        self._lock = threading.Lock()
+        self._server = None
+
+    def warm_up(self):
+        """Lädt die schweren Module und rendert einmal pro Ausgabeformat einen Chart (Vorlagen, Schriften)."""
+        started = time.perf_counter()
+        import numpy as np
+        import pandas as pd
+        import main # noqa: F401 (pandas, yfinance, matplotlib, PIL, cv2)
+        from chart_generator import render_chart_animation, render_chart_frame
+        from settings import CHART_ANIMATION, CHART_DAYS, get_video_profiles
+
+        history = pd.Series(np.linspace(100.0, 110.0, CHART_DAYS),
+                            index=pd.bdate_range(end=datetime.now().date(), periods=CHART_DAYS))
+        render = render_chart_animation if CHART_ANIMATION else render_chart_frame
+        for profile in get_video_profiles():
+            render("SAP.DE", history, 1.0, profile.width, profile.height)
+        self.warm_up_s = time.perf_counter() - started
+        logging.info(f"Dienst vorgewärmt in {self.warm_up_s:.1f} s.")
+
+    def session_done(self, session: datetime) -> bool:
+        """Liegen die Videos aller Indizes und Formate für den Handelstag bereits vor?"""
+        if session in self.completed:
+            return True
+        from main import video_output_path
+        from settings import get_video_profiles
+
+        run_date = next_trading_day(session)
+        return all(os.path.exists(video_output_path(index, run_date, profile))
+                   for index in self.indices for profile in get_video_profiles())
+
+    def run(self, as_of: datetime, force=(), targets=None, require_session: bool = False) -> dict:
+        """Führt einen Lauf aus und gibt eine Zusammenfassung (JSON-fähig) zurück."""
+        from main import run_daily_process
+
+        started = time.perf_counter()
+        logging.info(f"Dienst: Lauf für {as_of:%Y-%m-%d} gestartet.")
+        try:
+            ok = run_daily_process(provider=self.provider, as_of=as_of, indices=self.indices, force=tuple(force),
+                                   targets=targets, require_session=require_session)
+            error = None if ok else "Fehlgeschlagene Schritte, siehe Log."
+        except Exception as e:
+            logging.error(f"Dienst: Lauf für {as_of:%Y-%m-%d} abgebrochen: {e}", exc_info=True)
+            ok, error = False, f"{type(e).__name__}: {e}"
+        self.last_run = {"as_of": as_of.strftime("%Y-%m-%d"), "ok": ok, "error": error,
+                         "seconds": round(time.perf_counter() - started, 2),
+                         "finished": datetime.now(XETRA_TIMEZONE).isoformat(timespec="seconds")}
+        return self.last_run
+
+    def trigger(self, as_of: datetime = None, force=(), targets=None) -> dict:
+        """
+        Stellt einen manuellen Lauf ein und wartet auf sein Ergebnis (aus einem anderen Thread aufrufen).
+        Endet der Dienst vorher, kommt ein Ergebnis mit Fehler zurück, statt endlos zu warten.
+        """
+        request = RunRequest(as_of, tuple(force), targets, threading.Event(), {})
+        with self._lock:
+            if self._closed:
+                _reject(request)
+            else:
+                self.requests.put(request)
+        request.done.wait()
+        return request.result
+
+    def _next_scheduled(self, now: datetime):
+        """(Handelstag, None), wenn jetzt ein geplanter Lauf fällig ist, sonst (None, Weckzeit)."""
+        session = last_available_session(now)
+        if self.session_done(session) or self.attempts.get(session, 0) >= MAX_ATTEMPTS:
+            return None, next_session_available(now)
+        retry_at = self.retry_at.get(session)
+        if retry_at is not None and now < retry_at:
+            return None, retry_at
+        return session, None
+
+    def _run_scheduled(self, session: datetime, now: datetime):
+        result = self.run(next_trading_day(session), require_session=True)
+        if result["ok"]:
+            self.completed.add(session)
+            return
+        attempts = self.attempts[session] = self.attempts.get(session, 0) + 1
+        if attempts >= MAX_ATTEMPTS:
+            logging.error(f"Dienst: Handelstag {session:%Y-%m-%d} nach {attempts} Versuchen aufgegeben.")
+        else:
+            self.retry_at[session] = now + RETRY_INTERVAL
+            logging.warning(f"Dienst: Lauf für {session:%Y-%m-%d} fehlgeschlagen, "
+                            f"nächster Versuch um {self.retry_at[session]:%H:%M}.")
+
+    def _run_requested(self, request: RunRequest):
+        as_of = request.as_of or next_trading_day(last_available_session())
+        request.result.update(self.run(as_of, request.force, request.targets))
+        if request.result["ok"] and not request.targets:
+            self.completed.add(previous_trading_day(as_of))
+        request.done.set()
+
+    def status(self) -> dict:
+        now = datetime.now(XETRA_TIMEZONE)
+        session = last_available_session(now)
+        return {"indices": list(self.indices), "warm_up_s": self.warm_up_s, "last_run": self.last_run,
+                "last_session": session.strftime("%Y-%m-%d"), "last_session_done": self.session_done(session),
+                "next_session_available": next_session_available(now).isoformat(timespec="minutes"),
+                "queued": self.requests.qsize()}
+
+    def start_server(self):
+        """Startet den HTTP-Trigger-Endpunkt in einem Hintergrund-Thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _TriggerHandler)
+        self._server.service = self
+        threading.Thread(target=self._server.serve_forever, name="trigger", daemon=True).start()
+        logging.info(f"Dienst: Trigger-Endpunkt auf http://{self.host}:{self.port}/run")
+
+    def serve_forever(self):
+        """Vorwärmen, Trigger-Endpunkt starten und geplante sowie manuelle Läufe abarbeiten bis `stop`."""
+        self.warm_up()
+        self.start_server()
+        try:
+            while not self._stopping.is_set():
+                now = datetime.now(XETRA_TIMEZONE)
+                session, wake_at = self._next_scheduled(now)
+                if session is not None:
+                    self._run_scheduled(session, now)
+                    continue
+                timeout = min(max(0.0, (wake_at - now).total_seconds()), MAX_SLEEP_S)
+                try:
+                    request = self.requests.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                if request is not None:
+                    self._run_requested(request)
+        finally:
+            # Noch wartende manuelle Läufe beantworten, damit offene POST /run nicht hängen bleiben
+            with self._lock:
+                self._closed = True
+            while True:
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    _reject(request)
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+
+    def stop(self):
+        """Beendet `serve_forever` nach dem laufenden Lauf (aus einem anderen Thread oder Signal-Handler)."""
+        self._stopping.set()
+        self.requests.put(None) # Weckt die wartende Schleife
+
+
+def _reject(request: RunRequest):
+    """Beantwortet einen manuellen Lauf, der wegen des Dienstendes nicht mehr ausgeführt wird."""
+    request.result.update({"as_of": request.as_of.strftime("%Y-%m-%d") if request.as_of else None, "ok": False,
+                           "error": "Dienst beendet, Lauf nicht ausgeführt."})
+    request.done.set()
+
+
+class _TriggerHandler(BaseHTTPRequestHandler):
+    """POST /run?as_of=YYYY-MM-DD&force=a,b&targets=a,b startet einen Lauf, GET /status liefert den Zustand."""
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/status":
+            self._reply(404, {"error": "Unbekannter Pfad"})
+            return
+        self._reply(200, self.server.service.status())
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/run":
+            self._reply(404, {"error": "Unbekannter Pfad"})
+            return
+        query = parse_qs(url.query)
+
+        def values(name):
+            return tuple(v for item in query.get(name, []) for v in item.split(",") if v)
+
+        try:
+            as_of = datetime.strptime(query["as_of"][0], "%Y-%m-%d") if "as_of" in query else None
+        except ValueError:
+            self._reply(400, {"error": "as_of muss das Format YYYY-MM-DD haben"})
+            return
+        result = self.server.service.trigger(as_of, values("force"), values("targets") or None)
+        self._reply(200 if result["ok"] else 500, result)
+
+    def _reply(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.info(f"Trigger {self.address_string()}: {format % args}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TopMover als Dienst: Läufe nach dem XETRA-Kalender und auf Anforderung.")
+    parser.add_argument("--indices", nargs="+", help="Indizes aus der Universe-Registry (Standard: settings.py).")
+    parser.add_argument("--host", default=DAEMON_HOST, help="Adresse des Trigger-Endpunkts.")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT, help="Port des Trigger-Endpunkts.")
+    args = parser.parse_args(argv)
+
+    from settings import configure_logging
+
+    configure_logging()
+    service = TopMoverService(args.indices, host=args.host, port=args.port)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Dienst beendet.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+# src/data_provider.py
+
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# Spalten, die ein Provider pro Ticker liefert (wie bei yfinance)
+OHLC_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class MarketDataProvider:
+    """
+    Schnittstelle für Marktdatenquellen.
+    `download` liefert einen DataFrame im Format von `yf.download(...)`:
+    Index = Datum, Spalten = MultiIndex (Preisfeld, Ticker). `end_date` ist exklusiv.
+    """
+
+    name = "base"
+
+    def download(self, tickers: list, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live-Daten von Yahoo Finance über yfinance."""
+
+    name = "yfinance"
+
+    def download(self, tickers, start_date, end_date):
+        import yfinance as yf  # Erst bei Bedarf laden, Replay-Läufe brauchen kein yfinance
+
+        return yf.download(tickers, start=start_date.strftime('%Y-%m-%d'),
+                           end=end_date.strftime('%Y-%m-%d'))
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Liefert aufgezeichnete oder synthetische OHLC-Daten aus lokalen Fixture-Dateien.
+    Pro Ticker eine Datei `<TICKER>.csv` oder `<TICKER>.parquet` mit einer
+    `Date`-Spalte und den Spalten aus OHLC_COLUMNS (Volume optional).
+    Ergebnisse sind bei gleichen Fixtures und gleichem Zeitraum immer identisch.
+    """
+
+    name = "replay"
+
+    def __init__(self, fixture_dir: str):
+        self.fixture_dir = fixture_dir
+        self._frames = {}
+
+    def _load_ticker(self, ticker):
+        if ticker in self._frames:
+            return self._frames[ticker]
+
+        frame = None
+        parquet_path = os.path.join(self.fixture_dir, f"{ticker}.parquet")
+        csv_path = os.path.join(self.fixture_dir, f"{ticker}.csv")
+        if os.path.exists(parquet_path):
+            frame = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            frame = pd.read_csv(csv_path)
+
+        if frame is not None:
+            if "Date" in frame.columns:
+                frame = frame.set_index("Date")
+            frame.index = pd.to_datetime(frame.index)
+            frame = frame.sort_index()
+
+        self._frames[ticker] = frame
+        return frame
+
+    def last_date(self, tickers: list):
+        """Letztes Datum, für das Fixtures vorhanden sind (für einen reproduzierbaren Stichtag)."""
+        dates = [frame.index[-1] for frame in map(self._load_ticker, tickers)
+                 if frame is not None and not frame.empty]
+        return max(dates).to_pydatetime() if dates else None
+
+    def download(self, tickers, start_date, end_date):
+        per_ticker = {}
+        for ticker in tickers:
+            frame = self._load_ticker(ticker)
+            if frame is None:
+                print(f"Warnung: Keine Replay-Daten für {ticker} in {self.fixture_dir}.")
+                continue
+            window = frame[(frame.index >= pd.Timestamp(start_date.date())) &
+                           (frame.index < pd.Timestamp(end_date.date()))]
+            per_ticker[ticker] = window.reindex(columns=OHLC_COLUMNS)
+
+        if not per_ticker:
+            return pd.DataFrame()
+
+        data = pd.concat(per_ticker, axis=1)  # Spalten: (Ticker, Feld)
+        data = data.swaplevel(0, 1, axis=1).sort_index(axis=1, level=0)
+        data.columns.names = ["Price", "Ticker"]
+        data.index.name = "Date"
+        return data
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Reicht Anfragen an einen anderen Provider weiter und schreibt die Antworten
+    als Fixtures (CSV), damit ein Live-Lauf später offline wiederholt werden kann.
+    """
+
+    name = "recording"
+
+    def __init__(self, provider: MarketDataProvider, fixture_dir: str):
+        self.provider = provider
+        self.fixture_dir = fixture_dir
+
+    def download(self, tickers, start_date, end_date):
+        data = self.provider.download(tickers, start_date, end_date)
+        if not data.empty:
+            write_fixtures(data, self.fixture_dir)
+        return data
+
+
+def write_fixtures(data: pd.DataFrame, fixture_dir: str, file_format: str = "csv"):
+    """
+    Schreibt einen yfinance-artigen DataFrame als eine Fixture-Datei pro Ticker.
+    Bereits vorhandene Tage in bestehenden Fixtures werden zusammengeführt.
+    """
+    os.makedirs(fixture_dir, exist_ok=True)
+    for ticker in data.columns.get_level_values(1).unique():
+        frame = data.xs(ticker, axis=1, level=1).dropna(how="all")
+        frame = frame.reindex(columns=[c for c in OHLC_COLUMNS if c in frame.columns])
+        frame.index.name = "Date"
+        path = os.path.join(fixture_dir, f"{ticker}.{file_format}")
+
+        existing = ReplayProvider(fixture_dir)._load_ticker(ticker)
+        if existing is not None:
+            frame = pd.concat([existing, frame])
+            frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+
+        if file_format == "parquet":
+            frame.to_parquet(path)
+        else:
+            frame.to_csv(path)
+
+
+def synthetic_ohlc(tickers: list, start_date: datetime, end_date: datetime, seed: int = 42) -> pd.DataFrame:
+    """
+    Erzeugt reproduzierbare synthetische OHLC-Daten (Random Walk an Werktagen)
+    im Format von MarketDataProvider.download.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start_date, end_date - timedelta(days=1), name="Date")
+    per_ticker = {}
+    for ticker in tickers:
+        start_price = rng.uniform(20, 500)
+        log_returns = rng.normal(0, 0.02, len(dates))
+        close = start_price * np.exp(np.cumsum(log_returns))
+        open_ = close * (1 + rng.normal(0, 0.005, len(dates)))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, len(dates))))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, len(dates))))
+        volume = rng.integers(100_000, 5_000_000, len(dates))
+        per_ticker[ticker] = pd.DataFrame(
+            {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+            index=dates,
+        )
+
+    data = pd.concat(per_ticker, axis=1).swaplevel(0, 1, axis=1)
+    data.columns.names = ["Price", "Ticker"]
+    return data
+
+
+def generate_synthetic_fixtures(tickers: list, start_date: datetime, end_date: datetime,
+                                fixture_dir: str, seed: int = 42, file_format: str = "csv"):
+    """Erzeugt synthetische OHLC-Daten (siehe synthetic_ohlc) und schreibt sie als Fixtures."""
+    write_fixtures(synthetic_ohlc(tickers, start_date, end_date, seed), fixture_dir, file_format)
@@ -1,27 +1,41 @@
-import yfinance as yf
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from price_store import PriceStore
+from data_provider import MarketDataProvider, YFinanceProvider
+from universe import Universe, default_universe
+from price_matrix import HORIZONS, PriceMatrix
+from instrumentation import stage
+
+# Maximale Anzahl Symbole pro Download-Anfrage
+DOWNLOAD_CHUNK_SIZE = 200
+
+# Gleichzeitige Download-Anfragen, Timeout pro Anfrage (Sekunden) und Wiederholungen mit
+# exponentiellem Backoff (FETCH_BACKOFF, 2 * FETCH_BACKOFF, 4 * FETCH_BACKOFF, ... Sekunden)
+FETCH_CONCURRENCY = 4
+FETCH_TIMEOUT = 60
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 1.0
+
+# Ergebnis eines Kursabrufs: Kursmatrix der geladenen Ticker, fehlgeschlagene Ticker (Fehler, Timeout)
+# und Ticker, für die eine erfolgreiche Antwort keine Kursdaten enthielt (z.B. nicht mehr gehandelt)
+FetchResult = namedtuple("FetchResult", ["close_data", "failed", "empty"])
+
+# Toleranz, um Rundungsfehler bei 0% zu vermeiden
+CHANGE_TOLERANCE = 1e-6 # 0.000001%
 
 def get_dax_tickers():
     """
     Gibt eine Liste der aktuellen DAX 40 Ticker-Symbole zurück.
-    Beachten Sie: Diese Liste muss manuell aktualisiert werden,
-    wenn sich die Zusammensetzung des DAX ändert.
-    """
-    # Aktuelle DAX 40 Ticker-Symbole (Stand Juli 2025)
-    # Quelle: Deutsche Börse / Finanzportale. `.DE` für XETRA-Handel bei Yahoo Finance.
-    # Präsentiert als eine "Matrix" (Liste von Listen) für bessere Lesbarkeit im Code.
-    dax_tickers_matrix = [
-        ["ADS.DE", "AIR.DE", "ALV.DE", "BAS.DE", "BAYN.DE", "BEI.DE", "BMW.DE", "BNR.DE"],
-        ["CON.DE", "1COV.DE", "DB1.DE", "DBK.DE", "DTG.DE", "DTE.DE", "DPWA.DU", "EOAN.DE"],
-        ["ENR.DE", "FRE.DE", "FME.DE", "HEI.DE", "HEN3.DE", "IFX.DE", "JEN.DE", "LIN.DE"],
-        ["LHA.DE", "MBG.DE", "MRK.DE", "MTX.DE", "MUV2.DE", "P911.DE", "PAH3.DE", "PUM.DE"],
-        ["QIA.DE", "RHM.DE", "RWE.DE", "SAP.DE", "SIE.DE", "SRT3.DE", "SY1.DE", "VOW3.DE"],
-        ["VNA.DE", "ZAL.DE"] 
-    ]
-
-    # Die Liste der Ticker abflachen (aus den Unterlisten eine einzige Liste machen)
-    dax_tickers = [ticker for sublist in dax_tickers_matrix for ticker in sublist]
+    Die Mitglieder werden zentral in der Universe-Registry (universe.py) gepflegt
+    und müssen dort aktualisiert werden, wenn sich die Zusammensetzung des DAX ändert.
+    """
+    dax_tickers = default_universe().members("DAX")
 
     # Überprüfung der Anzahl der Ticker
     if len(dax_tickers) != 40:
@@ -29,84 +43,280 @@ def get_dax_tickers():
 
     return dax_tickers
 
-def get_dax_movers(num_movers=5):
+def _call_with_timeout(func, timeout, *args):
     """
-    Ermittelt die Top N Gewinner und Verlierer des DAX vom Vortag
-    und ruft historische Daten für eine Monatsansicht ab.
+    Ruft `func(*args)` in einem eigenen Daemon-Thread auf und wartet höchstens `timeout` Sekunden.
+    Ein hängender Aufruf wird nicht abgebrochen, sondern zurückgelassen (TimeoutError);
+    als Daemon-Thread hält er das Programmende nicht auf.
     """
-    dax_tickers = get_dax_tickers()
+    outcome = {}
 
-    today = datetime.now()
-    # Der Vortag ist entscheidend, da die Daten nach Börsenschluss verfügbar sind
-    # oder am nächsten Morgen abgerufen werden.
-    yesterday = today - timedelta(days=1)
-    # Stellen Sie sicher, dass 'yesterday' ein Handelstag war.
-    # Für diesen einfachen Fall gehen wir davon aus, dass wir Daten für gestern erhalten.
-    # Für robustere Lösungen müsste man Wochenenden/Feiertage prüfen.
+    def target():
+        try:
+            outcome["result"] = func(*args)
+        except BaseException as e:
+            outcome["error"] = e
 
-    # Zeitraum für die Monatsansicht (ca. 30 Handelstage)
-    # Wir holen etwas mehr, um sicherzustellen, dass wir 30 Handelstage haben
-    start_date_month = today - timedelta(days=45) # 45 Tage für ca. 30 Handelstage
-    end_date_month = today # Bis heute, damit der letzte Kurs der Vortag ist
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"Keine Antwort nach {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
 
-    # Daten für alle DAX-Aktien abrufen
-    try:
-        data = yf.download(dax_tickers, start=start_date_month.strftime('%Y-%m-%d'),
-                           end=end_date_month.strftime('%Y-%m-%d'))
+def _fetch_chunk(provider: MarketDataProvider, chunk, start_date, end_date, timeout, retries, backoff):
+    """
+    Lädt die Schlusskurse eines Blocks mit Timeout und exponentiellem Backoff.
+    Der Backoff gilt nur für Fehler und Timeouts; jeder weitere Versuch fragt nur den
+    noch fehlenden Rest des Blocks an. Ticker, die in einer Antwort mit Kursdaten fehlen
+    (z.B. nicht mehr gehandelt), werden einmal ohne Wartezeit erneut angefragt und gelten
+    danach als leer, nicht als fehlgeschlagen.
+    Gibt (Liste der Close-DataFrames, fehlende Ticker, ob der letzte Versuch fehlschlug) zurück.
+    Eine leere erste Antwort ohne Fehler wird nicht wiederholt; ob sie "keine Handelstage"
+    oder "keine Kursdaten für diese Ticker" bedeutet, entscheidet download_close_in_chunks.
+    """
+    frames = []
+    pending = list(chunk)
+    errors = answers = 0
+    while True:
+        try:
+            data = _call_with_timeout(provider.download, timeout, pending, start_date, end_date)
+        except Exception as e:
+            errors += 1
+            logging.warning(f"Download von {len(pending)} Tickern fehlgeschlagen "
+                            f"(Versuch {errors}/{retries + 1}): {type(e).__name__}: {e}")
+            if errors > retries:
+                return frames, pending, True
+            time.sleep(backoff * 2 ** (errors - 1))
+            continue
 
-        if data.empty:
-            print("Fehler: Keine Daten für die angegebenen Ticker und den Zeitraum gefunden.")
-            return None, None, None
+        answers += 1
+        if data.empty and answers == 1:
+            return frames, pending, False
+        close = data['Close'].dropna(axis=1, how='all') if not data.empty else pd.DataFrame()
+        received = [ticker for ticker in pending if ticker in close.columns]
+        if received:
+            frames.append(close[received])
+        pending = [ticker for ticker in pending if ticker not in close.columns]
+        if not pending or answers > 1:
+            return frames, pending, False
+        logging.info(f"Keine Kursdaten für {', '.join(pending)}, frage sie erneut an.")
 
-        # Wir benötigen die 'Close' Spalte
-        adj_close_data = data['Close']
+def download_close_in_chunks(provider: MarketDataProvider, tickers, start_date, end_date,
+                             chunk_size=DOWNLOAD_CHUNK_SIZE, max_concurrency=FETCH_CONCURRENCY,
+                             timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF) -> FetchResult:
+    """
+    Lädt die Schlusskurse für viele Ticker in Blöcken von `chunk_size` Symbolen, mit höchstens
+    `max_concurrency` gleichzeitigen Anfragen, und fügt sie zu einer einzigen Kursmatrix
+    (Index: Datum, Spalten: Ticker) zusammen. Jeder Block hat einen eigenen Timeout
+    und eigene Wiederholungen (siehe _fetch_chunk); ein langsamer oder fehlerhafter
+    Block hält die übrigen nicht auf.
+    Gibt ein FetchResult mit der Kursmatrix, den fehlgeschlagenen Tickern (Fehler oder Timeout)
+    und den Tickern ohne Kursdaten in einer erfolgreichen Antwort zurück.
+    Liefert kein Block Kurse und keiner einen Fehler, liegt kein Handelstag im Zeitraum
+    und kein Ticker gilt als fehlgeschlagen oder leer.
+    """
+    chunks = [list(tickers[i:i + chunk_size]) for i in range(0, len(tickers), chunk_size)]
+    results = []
+    if chunks:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(chunks)))) as executor:
+            # map() liefert die Blöcke in Auftragsreihenfolge, die Spaltenreihenfolge bleibt stabil
+            results = list(executor.map(
+                lambda chunk: _fetch_chunk(provider, chunk, start_date, end_date, timeout, retries, backoff),
+                chunks))
 
-        # Berechnung der prozentualen Veränderung des Vortages
-        if len(adj_close_data) < 2:
-            print("Nicht genügend Handelstage in den abgerufenen Daten für die Berechnung der Veränderung.")
-            return None, None, None
+    close_frames = [frame for frames, _, _ in results for frame in frames]
+    failed = [ticker for _, missing, errored in results if errored for ticker in missing]
+    empty = [ticker for _, missing, errored in results if not errored and close_frames for ticker in missing]
+    if failed:
+        logging.warning(f"{len(failed)} von {len(tickers)} Tickern konnten nicht geladen werden: {', '.join(failed)}")
+    if empty:
+        logging.warning(f"Keine Kursdaten für {len(empty)} von {len(tickers)} Tickern: {', '.join(empty)}")
+    if not close_frames:
+        return FetchResult(pd.DataFrame(), failed, empty)
+    close_data = pd.concat(close_frames, axis=1).sort_index()
+    return FetchResult(close_data.loc[:, ~close_data.columns.duplicated()], failed, empty)
+
+def fetch_close_prices(tickers, start_date, end_date, store: PriceStore = None,
+                       provider: MarketDataProvider = None) -> FetchResult:
+    """
+    Liefert die Schlusskurse (Index: Datum, Spalten: Ticker) für den Zeitraum
+    als FetchResult zusammen mit den Tickern, deren Download fehlgeschlagen ist,
+    und denen, für die der Anbieter keine Kursdaten hat.
+    Mit `store` werden pro Ticker nur die Tage nach seiner letzten gespeicherten Zeile
+    heruntergeladen (Ticker mit gleichem Startdatum in einem gemeinsamen Abruf), in den
+    lokalen Speicher eingemischt und der gesamte Zeitraum anschließend aus dem Speicher
+    gelesen. Ein einzelner neuer oder nicht mehr gehandelter Ticker lädt so nicht den
+    ganzen Zeitraum für alle anderen nach.
+    Ohne `provider` werden die Daten live über yfinance abgerufen.
+    """
+    if provider is None:
+        provider = YFinanceProvider()
 
-        # Die letzten beiden Handelstage
-        latest_trading_day = adj_close_data.index[-1]
-        second_latest_trading_day = adj_close_data.index[-2]
+    if store is None:
+        with stage("download", provider=provider.name):
+            return download_close_in_chunks(provider, tickers, start_date, end_date)
 
-        yesterday_prices = adj_close_data.loc[latest_trading_day]
-        day_before_yesterday_prices = adj_close_data.loc[second_latest_trading_day]
+    failed, empty = [], []
+    groups = {} # Startdatum -> Ticker, denen ab diesem Tag Daten fehlen
+    for ticker, fetch_start in store.missing_starts(tickers, start_date).items():
+        # yfinance behandelt `end` exklusiv, daher nur laden, wenn mindestens ein Tag fehlt
+        if fetch_start.date() < end_date.date():
+            groups.setdefault(fetch_start, []).append(ticker)
+    for fetch_start, group in sorted(groups.items()):
+        print(f"Lade fehlende Kursdaten für {len(group)} Ticker ab {fetch_start.strftime('%Y-%m-%d')}...")
+        with stage("download", provider=provider.name):
+            close_data, group_failed, group_empty = download_close_in_chunks(provider, group, fetch_start, end_date)
+        failed += group_failed
+        empty += group_empty
+        with stage("store_upsert"):
+            store.upsert(close_data)
+    if not groups:
+        print("Alle Kursdaten bereits im lokalen Speicher vorhanden.")
 
-        # Vermeidung von Division durch Null, falls ein Kurs 0 war
-        percentage_changes = ((yesterday_prices - day_before_yesterday_prices) / day_before_yesterday_prices) * 100
-        percentage_changes = percentage_changes.dropna() # Entferne Ticker ohne Daten
+    with stage("store_load"):
+        return FetchResult(store.load(tickers, start_date, end_date).dropna(how='all'), failed, empty)
 
-        # NEU: Filterung in explizite Gewinner und Verlierer
-        # Verwende eine kleine Toleranz, um Rundungsfehler bei 0% zu vermeiden
-        tolerance = 1e-6 # 0.000001%
+def _as_matrix(close_data) -> PriceMatrix:
+    return close_data if isinstance(close_data, PriceMatrix) else PriceMatrix.from_frame(close_data)
 
-        # Nur positive Veränderungen
-        actual_gainers = percentage_changes[percentage_changes > tolerance]
-        # Nur negative Veränderungen
-        actual_losers = percentage_changes[percentage_changes < -tolerance]
+def compute_index_movers(close_data, index_members: dict, num_movers=5, horizon="1d"):
+    """
+    Berechnet die Veränderung aller Ticker über `horizon` ("1d", "5d", "30d" oder "ytd",
+    siehe price_matrix.HORIZONS) in einem einzigen vektorisierten Durchlauf über die
+    Kursmatrix und wählt daraus die Top N Gewinner und Verlierer pro Index aus.
+    `close_data` ist eine breite Close-Tabelle oder eine PriceMatrix,
+    `index_members` ordnet jedem Index seine Ticker zu.
+    Gibt {index: (top_gainers, top_losers)} als absteigend bzw. aufsteigend sortierte Series zurück.
+    """
+    matrix = _as_matrix(close_data)
+    metrics = matrix.compute((horizon,))
+    last_row, has_last, changes = metrics.last_row, metrics.has_last, metrics.changes[horizon]
+    tickers = pd.Index(matrix.tickers)
 
-        # Sortieren für Top Gewinner und Verlierer, begrenzt auf num_movers
-        top_gainers = actual_gainers.nlargest(num_movers)
-        top_losers = actual_losers.nsmallest(num_movers)
+    results = {}
+    for index, members in index_members.items():
+        positions = np.array([matrix.positions[t] for t in members if t in matrix.positions], dtype=np.intp)
+        if positions.size == 0:
+            results[index] = (pd.Series(dtype=float), pd.Series(dtype=float))
+            continue
 
+        # Nur Ticker berücksichtigen, die am letzten Handelstag des Index einen Kurs haben
+        latest_row = last_row[positions][has_last[positions]].max() if has_last[positions].any() else -1
+        index_changes = changes[positions]
+        current = (last_row[positions] == latest_row) & ~np.isnan(index_changes)
 
+        results[index] = (
+            _select_top(index_changes, positions, current & (index_changes > CHANGE_TOLERANCE),
+                        num_movers, tickers, largest=True),
+            _select_top(index_changes, positions, current & (index_changes < -CHANGE_TOLERANCE),
+                        num_movers, tickers, largest=False),
+        )
+    return results
+
+def _select_top(values, positions, mask, num_movers, tickers, largest):
+    """Top N Werte aus `values[mask]` per argpartition, sortiert als Series mit Ticker-Index."""
+    candidates = np.flatnonzero(mask)
+    signed = -values[candidates] if largest else values[candidates]
+    if candidates.size > num_movers:
+        partition = np.argpartition(signed, num_movers - 1)[:num_movers]
+        candidates, signed = candidates[partition], signed[partition]
+    order = candidates[np.argsort(signed, kind='stable')]
+    return pd.Series(values[order], index=pd.Index(tickers[positions[order]], name="Ticker"), dtype=float)
+
+def select_index_movers(close_data, index_members: dict, num_movers=5, chart_days=30, horizon="1d"):
+    """
+    Berechnet die Mover aller Indizes aus einer vorhandenen Kursmatrix (Close-Tabelle oder
+    PriceMatrix) und schneidet die Kursreihen für die Monatscharts zu. Die Kursreihen
+    sind Sichten auf die Matrix (float32), keine Kopien.
+    Gibt {index: (top_gainers, top_losers, historical_data_for_charts)} zurück.
+    """
+    matrix = _as_matrix(close_data)
+    results = {}
+    for index, (top_gainers, top_losers) in compute_index_movers(matrix, index_members, num_movers, horizon).items():
         # Historische Daten für die Monatsansicht für alle relevanten Mover
-        mover_tickers = top_gainers.index.tolist() + top_losers.index.tolist()
-        mover_tickers = list(set(mover_tickers)) # Doppelte Ticker entfernen
+        mover_tickers = list(dict.fromkeys(top_gainers.index.tolist() + top_losers.index.tolist()))
 
         historical_data_for_charts = {}
         for ticker in mover_tickers:
-            if ticker in adj_close_data.columns:
-                historical_data_for_charts[ticker] = adj_close_data[ticker].tail(30)
-            else:
-                print(f"Warnung: Daten für {ticker} nicht in den Hauptdaten gefunden.")
+            historical_data_for_charts[ticker] = matrix.history(ticker, chart_days)
+
+        results[index] = (top_gainers, top_losers, historical_data_for_charts)
+    return results
+
+def history_start(as_of: datetime, chart_days=30, horizon="1d") -> datetime:
+    """
+    Beginn des Abrufzeitraums, damit Chartfenster und Horizont vollständig abgedeckt sind
+    (ca. 1,5 Kalendertage pro Handelstag, für "ytd" ab dem Vorjahresende).
+    """
+    trading_days = max(chart_days, (HORIZONS[horizon] or 0) + 1)
+    start = as_of - timedelta(days=int(trading_days * 1.5))
+    if HORIZONS[horizon] is None:
+        start = min(start, datetime(as_of.year - 1, 12, 20))
+    return start
+
+def get_index_movers(indices=("DAX",), num_movers=5, chart_days=30, store: PriceStore = None,
+                     provider: MarketDataProvider = None, as_of: datetime = None,
+                     universe: Universe = None, horizon="1d"):
+    """
+    Ermittelt die Top N Gewinner und Verlierer vom Vortag (bzw. über `horizon`, z.B. "5d"
+    für ein Wochenvideo) für mehrere Indizes aus einem gemeinsamen Download und einer
+    gemeinsamen Kursmatrix.
+    Gibt {index: (top_gainers, top_losers, historical_data_for_charts)} zurück,
+    oder None, wenn keine Daten abgerufen werden konnten.
+    """
+    if universe is None:
+        universe = default_universe()
+    index_members = {index: universe.members(index) for index in indices}
+    all_tickers = universe.tickers(list(indices))
 
-        return top_gainers, top_losers, historical_data_for_charts
+    today = as_of if as_of is not None else datetime.now()
+    # Abgerufen wird bis ausschließlich `today`; der letzte Kurs ist damit der letzte
+    # Handelstag davor (Wochenenden und XETRA-Feiertage liefern keine Zeilen, siehe trading_calendar).
+
+    # Zeitraum für die Monatsansicht (ca. 30 Handelstage)
+    # Wir holen etwas mehr, um sicherzustellen, dass wir 30 Handelstage haben
+    start_date_month = history_start(today, chart_days, horizon) # Für "1d" 45 Tage, ca. 30 Handelstage
+    end_date_month = today # Bis heute, damit der letzte Kurs der Vortag ist
+
+    try:
+        # Wir benötigen die 'Close' Spalte
+        # Fehlende Ticker werden übersprungen, die Mover der übrigen trotzdem berechnet
+        adj_close_data = fetch_close_prices(all_tickers, start_date_month, end_date_month, store, provider).close_data
+
+        if adj_close_data.empty:
+            print("Fehler: Keine Daten für die angegebenen Ticker und den Zeitraum gefunden.")
+            return None
+
+        # Berechnung der prozentualen Veränderung des Vortages
+        if len(adj_close_data) < 2:
+            print("Nicht genügend Handelstage in den abgerufenen Daten für die Berechnung der Veränderung.")
+            return None
+
+        with stage("compute", tickers=len(all_tickers)):
+            return select_index_movers(adj_close_data, index_members, num_movers, chart_days, horizon)
 
     except Exception as e:
         print(f"Ein Fehler ist aufgetreten: {e}")
+        return None
+
+def get_dax_movers(num_movers=5, chart_days=30, store: PriceStore = None,
+                   provider: MarketDataProvider = None, as_of: datetime = None):
+    """
+    Ermittelt die Top N Gewinner und Verlierer des DAX vom Vortag
+    und ruft historische Daten für eine Monatsansicht ab.
+    Mit `store` (PriceStore) werden nur fehlende Tage heruntergeladen;
+    `chart_days` legt die Anzahl der Handelstage für die Charts fest.
+    `provider` ersetzt die Datenquelle (z.B. ReplayProvider für Offline-Läufe),
+    `as_of` den Stichtag (Standard: jetzt), damit Läufe reproduzierbar sind.
+    """
+    get_dax_tickers() # Prüft die Anzahl der DAX-Mitglieder
+    results = get_index_movers(("DAX",), num_movers, chart_days, store, provider, as_of)
+    if results is None:
         return None, None, None
+    return results["DAX"]
 
 # --- Ausführung des Skripts ---
 if __name__ == "__main__":
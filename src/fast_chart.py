@@ -0,0 +1,254 @@
+# src/fast_chart.py
+
+import importlib.util
+import math
+import os
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
+from chart_animation import ChartLine, draw_polyline, line_thickness
+
+# Layout in Punkt (1/72 Zoll), abgeleitet aus der matplotlib-Vorlage nach tight_layout.
+# Links kommt noch die Breite des breitesten Y-Tick-Labels hinzu.
+MARGIN_LEFT_PT = 54.8
+MARGIN_RIGHT_PT = 10.8
+MARGIN_TOP_PT = 108.0
+MARGIN_BOTTOM_PT = 125.5
+
+# Schriftgrößen und Linienstärken wie in ChartTemplate (chart_generator.py)
+TITLE_SIZE_PT = 36
+LABEL_SIZE_PT = 30
+TICK_LABEL_SIZE_PT = 24
+LINE_WIDTH_PT = 4
+SPINE_WIDTH_PT = 2.5
+TICK_LENGTH_PT = 6
+TICK_WIDTH_PT = 2
+TICK_PAD_PT = 3.5   # Abstand Tick -> Label (matplotlib: xtick.major.pad)
+LABEL_PAD_PT = 4.0  # Abstand Tick-Labels -> Achsenbeschriftung (matplotlib: axes.labelpad)
+TITLE_LINE_SPACING = 1.2
+
+# Grid: gestrichelt ('--', Muster 3.7/1.6 x Linienstärke), weiß mit alpha 0.3
+GRID_WIDTH_PT = 0.8
+GRID_DASH_PT = (3.7 * 0.8, 1.6 * 0.8)
+GRID_VALUE = round(255 * 0.3)
+
+# Y-Ticks wie matplotlibs AutoLocator (MaxNLocator, höchstens 9 Intervalle)
+Y_TICK_STEPS = (1.0, 2.0, 2.5, 5.0, 10.0)
+MAX_Y_BINS = 9
+
+# Linienfarben (matplotlib-Namen) als RGB
+COLORS_RGB = {
+    'limegreen': (50, 205, 50),
+    'red': (255, 0, 0),
+    'gray': (128, 128, 128),
+    'white': (255, 255, 255),
+}
+
+
+def _font_path(bold: bool) -> str:
+    """DejaVu Sans (wie matplotlib) aus dem matplotlib-Paket, ohne matplotlib zu importieren."""
+    filename = "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"
+    spec = importlib.util.find_spec("matplotlib")
+    if spec is not None and spec.submodule_search_locations:
+        path = os.path.join(spec.submodule_search_locations[0], "mpl-data", "fonts", "ttf", filename)
+        if os.path.exists(path):
+            return path
+    return filename # PIL sucht dann in den System-Schriftverzeichnissen
+
+
+def y_ticks(vmin: float, vmax: float, nbins: int) -> np.ndarray:
+    """'Schöne' Tick-Werte im Bereich [vmin, vmax] nach dem Verfahren von MaxNLocator."""
+    span = vmax - vmin
+    if span <= 0:
+        return np.array([vmin])
+    raw_step = span / nbins
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(s * magnitude for s in Y_TICK_STEPS if s * magnitude >= raw_step * (1 - 1e-9))
+    first = math.ceil(vmin / step - 1e-9) * step
+    ticks = np.arange(first, vmax + step * 1e-9, step)
+    return ticks[(ticks >= vmin - step * 1e-9) & (ticks <= vmax + step * 1e-9)]
+
+
+def format_ticks(ticks: np.ndarray) -> list:
+    """Einheitliche Nachkommastellen für alle Labels, wie matplotlibs ScalarFormatter."""
+    decimals = 0
+    while decimals < 6 and np.any(np.abs(np.round(ticks, decimals) - ticks) > 1e-9 * np.maximum(1, np.abs(ticks))):
+        decimals += 1
+    return [f"{value:.{decimals}f}" for value in ticks]
+
+
+class FastChartRenderer:
+    """
+    Zeichnet das gleiche Chart-Layout wie ChartTemplate direkt mit NumPy, PIL und OpenCV:
+    schwarzer Hintergrund, gestricheltes Grid, eine antialiasierte Kurslinie, Achsen,
+    Tick-Labels und Titel. Texte werden einmal als Alpha-Maske gerastert und
+    zwischengespeichert, Koordinaten werden vektorisiert aus der Kursreihe berechnet.
+    Liefert BGR-Bilder (height x width x 3, uint8). Eine Instanz pro Thread verwenden.
+    """
+
+    def __init__(self, width: int = 1080, height: int = 1920, dpi: float = 100):
+        self.width = width
+        self.height = height
+        self.scale = dpi / 72.0 # Pixel pro Punkt
+        self._fonts = {}
+        self._text_cache = {}
+
+    def _px(self, points: float) -> float:
+        return points * self.scale
+
+    def _font(self, size_pt: float, bold: bool):
+        key = (size_pt, bold)
+        if key not in self._fonts:
+            size_px = max(1, round(self._px(size_pt)))
+            try:
+                self._fonts[key] = ImageFont.truetype(_font_path(bold), size_px)
+            except OSError:
+                self._fonts[key] = ImageFont.load_default(size_px)
+        return self._fonts[key]
+
+    def text_mask(self, text: str, size_pt: float, bold: bool = False, angle: float = 0) -> np.ndarray:
+        """Gerasterter Text als Alpha-Maske (float32, 0..1), gecacht nach (Text, Größe, Schnitt, Winkel)."""
+        key = (text, size_pt, bold, angle)
+        mask = self._text_cache.get(key)
+        if mask is None:
+            font = self._font(size_pt, bold)
+            ascent, descent = font.getmetrics()
+            width = max(1, math.ceil(font.getlength(text)))
+            image = Image.new("L", (width, ascent + descent), 0)
+            ImageDraw.Draw(image).text((0, 0), text, font=font, fill=255)
+            if angle:
+                image = image.rotate(angle, resample=Image.BICUBIC, expand=True)
+            mask = np.asarray(image, dtype=np.float32) / 255.0
+            self._text_cache[key] = mask
+        return mask
+
+    @staticmethod
+    def blit(canvas: np.ndarray, mask: np.ndarray, x: float, y: float, color_bgr):
+        """Mischt eine Alpha-Maske mit Farbe an Position (x, y = linke obere Ecke) in das Bild."""
+        x, y = int(round(x)), int(round(y))
+        h, w = mask.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, canvas.shape[1]), min(y + h, canvas.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        alpha = mask[y0 - y:y1 - y, x0 - x:x1 - x, None]
+        region = canvas[y0:y1, x0:x1]
+        region[...] = (region + (np.asarray(color_bgr, dtype=np.float32) - region) * alpha + 0.5).astype(np.uint8)
+
+    def _dashed_mask(self, length: int) -> np.ndarray:
+        on, off = self._px(GRID_DASH_PT[0]), self._px(GRID_DASH_PT[1])
+        positions = np.arange(length) + 0.5
+        return (positions % (on + off)) < on
+
+    def render(self, df: pd.Series, title_text: str, line_color: str) -> np.ndarray:
+        """Rendert den kompletten Chart als BGR-Bild (height x width x 3, uint8)."""
+        canvas, line = self.render_layers(df, title_text, line_color)
+        draw_polyline(canvas, line.points, line.color, line.thickness)
+        return canvas
+
+    def render_layers(self, df: pd.Series, title_text: str, line_color: str):
+        """
+        Rendert den Chart ohne Kurslinie und gibt (BGR-Bild, ChartLine) zurück,
+        z.B. für die Linien-Animation (chart_animation.LineDrawAnimation).
+        """
+        canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        color_bgr = COLORS_RGB.get(line_color, COLORS_RGB['gray'])[::-1]
+        white = (255, 255, 255)
+
+        values = df.to_numpy(dtype=np.float64)
+        x_days = pd.to_datetime(df.index).asi8 / 86400e9
+
+        # Y-Achse mit Puffer
+        y_min, y_max = float(values.min()), float(values.max())
+        padding = (y_max - y_min) * 0.1
+        if padding == 0:
+            padding = abs(y_min) * 0.05 or 1.0
+        y_lo, y_hi = y_min - padding, y_max + padding
+
+        # Achsenbereich (Pixel), links abhängig von der Breite der Y-Tick-Labels
+        top = self._px(MARGIN_TOP_PT)
+        bottom = self.height - self._px(MARGIN_BOTTOM_PT)
+        right = self.width - self._px(MARGIN_RIGHT_PT)
+        axes_height_pt = (bottom - top) / self.scale
+        nbins = max(1, min(MAX_Y_BINS, int(axes_height_pt // (TICK_LABEL_SIZE_PT * 2))))
+        ticks_y = y_ticks(y_lo, y_hi, nbins)
+        labels_y = format_ticks(ticks_y)
+        label_masks_y = [self.text_mask(label, TICK_LABEL_SIZE_PT) for label in labels_y]
+        max_label_width = max((mask.shape[1] for mask in label_masks_y), default=0)
+        left = self._px(MARGIN_LEFT_PT) + max_label_width
+
+        # Vektorisierte Abbildung Daten -> Pixel (X mit 5% Rand wie die automatische Skalierung)
+        x_margin = (x_days[-1] - x_days[0]) * 0.05 or 1.0
+        x_lo, x_hi = x_days[0] - x_margin, x_days[-1] + x_margin
+        px_x = left + (x_days - x_lo) / (x_hi - x_lo) * (right - left)
+        px_y = bottom - (values - y_lo) / (y_hi - y_lo) * (bottom - top)
+
+        # X-Ticks reduzieren (gleiche Auswahl wie ChartTemplate)
+        num_ticks = 5
+        tick_indices = [int(i) for i in range(0, len(df), max(len(df) // num_ticks, 1))][:num_ticks]
+        tick_indices.append(len(df) - 1)
+        unique_tick_indices = sorted(set(tick_indices))
+        ticks_x_px = px_x[unique_tick_indices]
+        ticks_y_px = bottom - (ticks_y - y_lo) / (y_hi - y_lo) * (bottom - top)
+
+        # Grid (unter der Linie)
+        ileft, iright, itop, ibottom = int(round(left)), int(round(right)), int(round(top)), int(round(bottom))
+        grid_width = max(1, round(self._px(GRID_WIDTH_PT)))
+        dash_h = self._dashed_mask(iright - ileft)
+        dash_v = self._dashed_mask(ibottom - itop)
+        for y in ticks_y_px:
+            row = int(round(y - grid_width / 2))
+            canvas[row:row + grid_width, ileft:iright][:, dash_h] = GRID_VALUE
+        for x in ticks_x_px:
+            col = int(round(x - grid_width / 2))
+            canvas[itop:ibottom, col:col + grid_width][dash_v, :] = GRID_VALUE
+
+        # Kurslinie (wird vom Aufrufer antialiasiert gezeichnet)
+        line = ChartLine(np.stack([px_x, px_y], axis=1).astype(np.float32), tuple(int(c) for c in color_bgr),
+                         line_thickness(self._px(LINE_WIDTH_PT)))
+
+        # Achsenlinien links und unten
+        spine = self._px(SPINE_WIDTH_PT)
+        s0, s1 = int(round(left - spine / 2)), int(round(left + spine / 2))
+        canvas[itop:int(round(bottom + spine / 2)), s0:s1] = white
+        b0, b1 = int(round(bottom - spine / 2)), int(round(bottom + spine / 2))
+        canvas[b0:b1, s0:iright] = white
+
+        # Ticks nach außen
+        tick_length = self._px(TICK_LENGTH_PT)
+        tick_width = max(1, round(self._px(TICK_WIDTH_PT)))
+        for x in ticks_x_px:
+            c0 = int(round(x - tick_width / 2))
+            canvas[ibottom:int(round(bottom + tick_length)), c0:c0 + tick_width] = white
+        for y in ticks_y_px:
+            r0 = int(round(y - tick_width / 2))
+            canvas[r0:r0 + tick_width, int(round(left - tick_length)):ileft] = white
+
+        # Y-Tick-Labels: rechtsbündig, vertikal zentriert
+        label_right = left - tick_length - self._px(TICK_PAD_PT)
+        for y, mask in zip(ticks_y_px, label_masks_y):
+            self.blit(canvas, mask, label_right - mask.shape[1], y - mask.shape[0] / 2, white)
+
+        # X-Tick-Labels: um 45° gedreht, rechte obere Ecke am Tick
+        label_top = bottom + tick_length + self._px(TICK_PAD_PT)
+        x_labels_bottom = label_top
+        for i, x in zip(unique_tick_indices, ticks_x_px):
+            mask = self.text_mask(df.index[i].strftime('%d.%m.'), TICK_LABEL_SIZE_PT, angle=45)
+            self.blit(canvas, mask, x - mask.shape[1], label_top, white)
+            x_labels_bottom = max(x_labels_bottom, label_top + mask.shape[0])
+
+        # Achsenbeschriftungen
+        mask = self.text_mask("Date", LABEL_SIZE_PT)
+        self.blit(canvas, mask, (left + right - mask.shape[1]) / 2, x_labels_bottom + self._px(LABEL_PAD_PT), white)
+        mask = self.text_mask("Price (EUR)", LABEL_SIZE_PT, angle=90)
+        self.blit(canvas, mask, label_right - max_label_width - self._px(LABEL_PAD_PT) - mask.shape[1],
+                  (top + bottom - mask.shape[0]) / 2, white)
+
+        # Linksbündiger Titel oberhalb des Diagramms (x=0.01, y=0.99 wie suptitle)
+        title_x, title_y = 0.01 * self.width, 0.01 * self.height
+        line_height = self._px(TITLE_SIZE_PT) * TITLE_LINE_SPACING
+        for line_number, title_line in enumerate(title_text.split("\n")):
+            mask = self.text_mask(title_line, TITLE_SIZE_PT, bold=True)
+            self.blit(canvas, mask, title_x, title_y + line_number * line_height, color_bgr)
+
+        return canvas, line
@@ -0,0 +1,273 @@
+# src/instrumentation.py
+
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+# Präfix der Prometheus-Metriken (textfile collector des node_exporters)
+METRIC_PREFIX = "topmover"
+
+# ru_maxrss: Kilobyte unter Linux, Byte unter macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _io_bytes_written():
+    """Geschriebene Bytes des Prozesses (Dateien und Pipes) aus /proc/self/io, sonst None."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _snapshot():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (time.perf_counter(), own.ru_utime + own.ru_stime,
+            children.ru_utime + children.ru_stime, _io_bytes_written())
+
+
+class Measurement:
+    """
+    Misst einen Abschnitt: Wall-Clock, CPU-Zeit des Prozesses und beendeter
+    Kindprozesse (z.B. FFmpeg), Höchststand des RSS und geschriebene Bytes.
+    Der RSS-Wert ist der Höchststand des Prozesses bis zum Ende des Abschnitts.
+    Auch in Worker-Prozessen nutzbar; das Ergebnis ist ein einfaches Dictionary.
+    """
+
+    def __init__(self):
+        self._start = _snapshot()
+        self.started_at = datetime.now()
+
+    def finish(self) -> dict:
+        wall, cpu, children_cpu, written = _snapshot()
+        start_wall, start_cpu, start_children_cpu, start_written = self._start
+        return {
+            "start": self.started_at.isoformat(timespec="milliseconds"),
+            "pid": os.getpid(),
+            "wall_s": wall - start_wall,
+            "cpu_s": cpu - start_cpu,
+            "children_cpu_s": children_cpu - start_children_cpu,
+            "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT,
+            "children_peak_rss_bytes": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * _RSS_UNIT,
+            "bytes_written": None if written is None or start_written is None else written - start_written,
+        }
+
+
+class RunRecorder:
+    """
+    Sammelt Messwerte für einen Lauf von run_daily_process, gegliedert nach Schritten
+    und Unterschritten (z.B. "charts.render" mit Label ticker=SAP.DE).
+    Am Ende wird jeder Schritt als eine JSON-Zeile (plus eine Zusammenfassung des Laufs)
+    an `jsonl_path` angehängt und optional eine Datei für den Prometheus
+    textfile collector geschrieben.
+
+    Verwendung:
+        with RunRecorder(jsonl_path, prometheus_path) as run:
+            with stage("fetch"):
+                ...
+    """
+
+    def __init__(self, jsonl_path: str = None, prometheus_path: str = None, run_id: str = None):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = []
+        self._local = threading.local() # Offene Schritte pro Thread
+        self._run_measurement = None
+        self._previous = None
+        self._error = None
+
+    @property
+    def _stack(self) -> list:
+        """Offene Schritte des aktuellen Threads; Threads messen unabhängig voneinander."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def open_stages(self) -> list:
+        """Die offenen Schritte des aktuellen Threads, zum Fortsetzen in einem anderen Thread (siehe `attach`)."""
+        return list(self._stack)
+
+    @contextmanager
+    def attach(self, stages: list):
+        """
+        Setzt im aktuellen Thread die offenen Schritte eines anderen Threads fort, damit
+        Unterschritte von Hilfs-Threads unter demselben Namen und mit denselben Labels
+        erscheinen (z.B. ein Video-Thread im Schritt "encode").
+        """
+        self._local.stack = list(stages)
+        try:
+            yield self
+        finally:
+            self._local.stack = []
+
+    def mark_failed(self, reason: str):
+        """Markiert den Lauf als fehlgeschlagen (z.B. bei einem Abbruch ohne Exception)."""
+        self._error = reason
+
+    def __enter__(self):
+        global _active_recorder
+        self._previous, _active_recorder = _active_recorder, self
+        self._run_measurement = Measurement()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active_recorder
+        _active_recorder = self._previous
+        if exc_type is not None:
+            self.mark_failed(f"{exc_type.__name__}: {exc}")
+        failed_stages = sum(1 for record in self.records if record["status"] != "ok")
+        summary = self._run_measurement.finish()
+        summary.update(type="run", run_id=self.run_id, stages=len(self.records), failed_stages=failed_stages,
+                       status="error" if self._error or failed_stages else "ok")
+        if self._error:
+            summary["error"] = self._error
+        try:
+            self.write(summary)
+        except OSError as e:
+            logging.error(f"Laufprotokoll konnte nicht geschrieben werden: {e}")
+        return False
+
+    @contextmanager
+    def stage(self, name: str, **labels):
+        """
+        Misst einen (Unter-)Schritt. Verschachtelte Schritte erhalten den Namen "aussen.innen"
+        und erben die Labels der umgebenden Schritte (z.B. index=DAX).
+        """
+        full_name, labels = self.child_name(name), {**self.current_labels(), **labels}
+        self._stack.append((name, labels))
+        measurement = Measurement()
+        extra = {}
+        status, error = "ok", None
+        try:
+            yield extra
+        except BaseException as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._stack.pop()
+            metrics = measurement.finish()
+            metrics.update(extra)
+            self.add_record(full_name, metrics, status=status, error=error, **labels)
+
+    def child_name(self, name: str) -> str:
+        """Vollständiger Name eines Unterschritts im aktuell offenen Schritt."""
+        return ".".join([parent for parent, _ in self._stack] + [name])
+
+    def current_labels(self) -> dict:
+        """Labels des aktuell offenen Schritts (inklusive geerbter Labels)."""
+        return dict(self._stack[-1][1]) if self._stack else {}
+
+    def add_record(self, name: str, metrics: dict, status: str = "ok", error: str = None, **labels):
+        """Fügt einen außerhalb gemessenen Schritt hinzu (z.B. aus einem Worker-Prozess)."""
+        record = {"type": "stage", "run_id": self.run_id, "stage": name, "status": status}
+        if error:
+            record["error"] = error
+        record.update(metrics)
+        if labels:
+            record["labels"] = labels
+        self.records.append(record)
+
+    def write(self, summary: dict):
+        if self.jsonl_path:
+            os.makedirs(os.path.dirname(self.jsonl_path) or ".", exist_ok=True)
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                for record in self.records + [summary]:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if self.prometheus_path:
+            write_prometheus_textfile(self.prometheus_path, self.records, summary)
+        logging.info(f"Laufprotokoll {self.run_id}: {len(self.records)} Schritte, "
+                     f"{summary['wall_s']:.2f}s gesamt, Status {summary['status']}.")
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def write_prometheus_textfile(path: str, records: list, summary: dict):
+    """
+    Schreibt die Metriken des Laufs im Prometheus-Textformat (atomar über eine temporäre Datei).
+    Schritte mit gleichem Namen (z.B. ein Chart pro Ticker) werden je Schritt und Index
+    zusammengefasst, damit die Anzahl der Zeitreihen begrenzt bleibt.
+    """
+    aggregated = {}
+    for record in records:
+        key = (record["stage"], record.get("labels", {}).get("index", ""))
+        entry = aggregated.setdefault(key, {"wall_s": 0.0, "cpu_s": 0.0, "children_cpu_s": 0.0,
+                                            "bytes_written": 0, "peak_rss_bytes": 0, "count": 0, "errors": 0})
+        entry["wall_s"] += record["wall_s"]
+        entry["cpu_s"] += record["cpu_s"]
+        entry["children_cpu_s"] += record["children_cpu_s"]
+        entry["bytes_written"] += record["bytes_written"] or 0
+        entry["peak_rss_bytes"] = max(entry["peak_rss_bytes"], record["peak_rss_bytes"])
+        entry["count"] += 1
+        entry["errors"] += record["status"] != "ok"
+
+    metrics = [
+        ("stage_wall_seconds", "gauge", "Wall-Clock-Zeit des Schritts im letzten Lauf", "wall_s"),
+        ("stage_cpu_seconds", "gauge", "CPU-Zeit des Prozesses im Schritt", "cpu_s"),
+        ("stage_children_cpu_seconds", "gauge", "CPU-Zeit beendeter Kindprozesse (FFmpeg) im Schritt", "children_cpu_s"),
+        ("stage_bytes_written", "gauge", "Geschriebene Bytes im Schritt", "bytes_written"),
+        ("stage_peak_rss_bytes", "gauge", "Höchster RSS bis zum Ende des Schritts", "peak_rss_bytes"),
+        ("stage_count", "gauge", "Anzahl der Ausführungen des Schritts", "count"),
+        ("stage_errors", "gauge", "Anzahl fehlgeschlagener Ausführungen des Schritts", "errors"),
+    ]
+    lines = []
+    for metric, kind, help_text, field in metrics:
+        lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {kind}")
+        for (stage_name, index), entry in sorted(aggregated.items()):
+            labels = f'stage="{_escape_label(stage_name)}"' + (f',index="{_escape_label(index)}"' if index else "")
+            lines.append(f"{METRIC_PREFIX}_{metric}{{{labels}}} {entry[field]}")
+
+    run_metrics = [
+        ("run_duration_seconds", "Dauer des letzten Laufs", summary["wall_s"]),
+        ("run_success", "1, wenn der letzte Lauf ohne Fehler beendet wurde", int(summary["status"] == "ok")),
+        ("run_peak_rss_bytes", "Höchster RSS des letzten Laufs", summary["peak_rss_bytes"]),
+        ("run_last_timestamp_seconds", "Zeitpunkt des Laufendes (Unix-Zeit)", int(time.time())),
+    ]
+    for metric, help_text, value in run_metrics:
+        lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} gauge")
+        lines.append(f"{METRIC_PREFIX}_{metric} {value}")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+_active_recorder = None
+
+
+def active_recorder() -> RunRecorder:
+    """Der aktuell laufende RunRecorder oder None (Instrumentierung ist dann ohne Wirkung)."""
+    return _active_recorder
+
+
+@contextmanager
+def stage(name: str, **labels):
+    """
+    Misst einen Schritt im aktiven RunRecorder. Ohne aktiven Recorder ein No-op,
+    damit Module wie video_encoder auch ohne Instrumentierung nutzbar bleiben.
+    Liefert ein Dictionary, in das zusätzliche Werte für den Datensatz eingetragen werden können.
+    """
+    recorder = _active_recorder
+    if recorder is None:
+        yield {}
+        return
+    with recorder.stage(name, **labels) as extra:
+        yield extra
@@ -0,0 +1,195 @@
+# src/intraday.py
+"""
+Live-Modus "Top Mover jetzt" während der Handelszeit:
+
+    python src/intraday.py --replay ticks.csv            # Ticks aus einer Aufzeichnung
+    python src/intraday.py --replay ticks.csv --speed 60 # in 60-facher Geschwindigkeit
+    python src/intraday.py --replay ticks.csv --as-of 2025-09-15
+
+Kurse kommen als Ticks aus einem austauschbaren Feed (TickFeed). Pro Tick wird nur
+die Veränderung des betroffenen Tickers gegenüber dem Vortagesschluss neu berechnet;
+die Top N Gewinner und Verlierer werden in einer sortierten Liste gepflegt.
+Ein Ereignis (eine JSON-Zeile) wird nur ausgegeben, wenn sich Zusammensetzung oder
+Reihenfolge der Top N ändern, nicht bei jeder Kursänderung.
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import math
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+import pandas as pd
+
+from dax_movers import CHANGE_TOLERANCE, fetch_close_prices
+from universe import default_universe
+
+# Ein Kurs-Tick: Zeitpunkt, Ticker und letzter Preis
+Tick = namedtuple("Tick", ["timestamp", "ticker", "price"])
+
+# Änderung der Top N eines Index: Art ("gainers"/"losers") und die neue Liste (Ticker, Veränderung in %)
+MoverEvent = namedtuple("MoverEvent", ["timestamp", "index", "kind", "movers"])
+
+
+class TickFeed:
+    """
+    Schnittstelle für Live-Kursquellen.
+    `ticks()` liefert Tick-Tupel in zeitlicher Reihenfolge, solange der Feed läuft.
+    """
+
+    name = "base"
+
+    def ticks(self):
+        raise NotImplementedError
+
+
+class ReplayTickFeed(TickFeed):
+    """
+    Spielt aufgezeichnete Ticks aus einer CSV-Datei mit den Spalten
+    `timestamp` (ISO-Format), `ticker` und `price` ab.
+    Mit `speed` werden die Abstände zwischen den Ticks nachgebildet
+    (1 = Echtzeit, 60 = eine Minute pro Sekunde, None = ohne Pause).
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, speed: float = None):
+        self.path = path
+        self.speed = speed
+
+    def ticks(self):
+        previous = None
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                tick = Tick(datetime.fromisoformat(row["timestamp"]), row["ticker"].strip(), float(row["price"]))
+                if self.speed and previous is not None:
+                    delay = (tick.timestamp - previous).total_seconds() / self.speed
+                    if delay > 0:
+                        time.sleep(delay)
+                previous = tick.timestamp
+                yield tick
+
+
+class StreamingMovers:
+    """
+    Pflegt die Top N Gewinner und Verlierer eines Index bei laufenden Kurs-Ticks.
+    Die Veränderung des Tickers wird pro Tick in O(1) berechnet (Referenzkurs aus einem dict).
+    Alle Ticker mit Kurs liegen als (Veränderung, Ticker) in einer sortierten Liste;
+    ein Tick ersetzt genau einen Eintrag: Binärsuche in O(log n), das Verschieben der
+    Listenelemente ist aber O(n). Bewusst kein Heap oder Order-Statistic-Baum: Ein Heap
+    liefert die Top N nicht geordnet und kann veraltete Einträge nur verzögert entfernen,
+    ein Baum bräuchte eine zusätzliche Abhängigkeit; bei Indizes mit wenigen Dutzend
+    Werten ist das Verschieben ein einzelnes memmove.
+    Die Top N sind die Enden der Liste. Sie werden nur neu ausgelesen, wenn der
+    Ticker vor oder nach dem Tick in einem der beiden Enden liegt.
+    """
+
+    def __init__(self, index: str, reference_prices: dict, num_movers: int = 5):
+        self.index = index
+        self.reference_prices = reference_prices
+        self.num_movers = num_movers
+        self.changes = {}
+        self._sorted = []
+        self.gainers = ()
+        self.losers = ()
+
+    def update(self, tick: Tick) -> list:
+        """Verarbeitet einen Tick und gibt die dadurch ausgelösten MoverEvents zurück (meist keine)."""
+        reference = self.reference_prices.get(tick.ticker)
+        if not reference or not math.isfinite(tick.price):
+            return []
+        change = (tick.price - reference) / reference * 100
+
+        old_change = self.changes.get(tick.ticker)
+        if old_change == change:
+            return []
+        touches_top = self._in_top(old_change)
+        if old_change is not None:
+            del self._sorted[bisect.bisect_left(self._sorted, (old_change, tick.ticker))]
+        bisect.insort(self._sorted, (change, tick.ticker))
+        self.changes[tick.ticker] = change
+        if not (touches_top or self._in_top(change)):
+            return []
+
+        events = []
+        gainers = tuple((ticker, value) for value, ticker in reversed(self._sorted[-self.num_movers:])
+                        if value > CHANGE_TOLERANCE)
+        losers = tuple((ticker, value) for value, ticker in self._sorted[:self.num_movers]
+                       if value < -CHANGE_TOLERANCE)
+        if _ranking(gainers) != _ranking(self.gainers):
+            events.append(MoverEvent(tick.timestamp, self.index, "gainers", gainers))
+        if _ranking(losers) != _ranking(self.losers):
+            events.append(MoverEvent(tick.timestamp, self.index, "losers", losers))
+        self.gainers, self.losers = gainers, losers
+        return events
+
+    def _in_top(self, change) -> bool:
+        """Liegt ein Wert in den obersten oder untersten N Einträgen der sortierten Liste?"""
+        if change is None:
+            return False
+        if len(self._sorted) <= self.num_movers:
+            return True
+        return change >= self._sorted[-self.num_movers][0] or change <= self._sorted[self.num_movers - 1][0]
+
+
+def _ranking(movers: tuple) -> tuple:
+    """Nur Zusammensetzung und Reihenfolge zählen, nicht die aktuellen Werte."""
+    return tuple(ticker for ticker, _ in movers)
+
+
+def reference_prices(close_data: pd.DataFrame, before: datetime) -> dict:
+    """Letzter Schlusskurs jedes Tickers vor dem Tag `before` (Referenz für die Tagesveränderung)."""
+    history = close_data[close_data.index < pd.Timestamp(before.date())]
+    last = history.ffill().iloc[-1] if not history.empty else pd.Series(dtype=float)
+    return {ticker: float(price) for ticker, price in last.items() if pd.notna(price) and price > 0}
+
+
+def stream_movers(feed: TickFeed, trackers: list):
+    """
+    Verteilt die Ticks des Feeds an die StreamingMovers aller Indizes, die den Ticker enthalten,
+    und liefert die entstehenden MoverEvents.
+    """
+    by_ticker = {}
+    for tracker in trackers:
+        for ticker in tracker.reference_prices:
+            by_ticker.setdefault(ticker, []).append(tracker)
+    for tick in feed.ticks():
+        for tracker in by_ticker.get(tick.ticker, ()):
+            yield from tracker.update(tick)
+
+
+def build_trackers(indices=("DAX",), num_movers: int = 5, as_of: datetime = None, store=None, provider=None) -> list:
+    """Ein StreamingMovers pro Index, mit den Vortagesschlusskursen als Referenz."""
+    universe = default_universe()
+    today = as_of if as_of is not None else datetime.now()
+    tickers = universe.tickers(list(indices))
+    close_data = fetch_close_prices(tickers, today - timedelta(days=10), today, store, provider).close_data
+    prices = reference_prices(close_data, today)
+    return [StreamingMovers(index, {t: prices[t] for t in universe.members(index) if t in prices}, num_movers)
+            for index in indices]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Top Mover live aus einem Tick-Feed (Ausgabe: JSON-Zeilen).")
+    parser.add_argument("--replay", required=True, help="CSV-Datei mit timestamp,ticker,price.")
+    parser.add_argument("--speed", type=float, help="Abspielgeschwindigkeit (Standard: ohne Pause).")
+    parser.add_argument("--indices", nargs="+", default=["DAX"], help="Indizes aus der Universe-Registry.")
+    parser.add_argument("--num-movers", type=int, default=5, help="Gewinner bzw. Verlierer pro Index.")
+    parser.add_argument("--as-of", type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+                        help="Handelstag der Ticks (Standard: heute), bestimmt den Vortagesschluss.")
+    args = parser.parse_args(argv)
+
+    from settings import PRICE_STORE_FILE
+    from price_store import PriceStore
+
+    feed = ReplayTickFeed(args.replay, args.speed)
+    trackers = build_trackers(tuple(args.indices), args.num_movers, args.as_of, store=PriceStore(PRICE_STORE_FILE))
+    for event in stream_movers(feed, trackers):
+        print(json.dumps({"timestamp": event.timestamp.isoformat(), "index": event.index, "kind": event.kind,
+                          "movers": [[ticker, round(change, 4)] for ticker, change in event.movers]}), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,130 +3,350 @@
 import os
 from datetime import datetime
 import logging
-import sys
+
+import pickle
+import shutil
+import pandas as pd
 
 # Importieren der Module
-from dax_movers import get_dax_movers
-from chart_generator import create_30_day_chart
-from video_maker import create_tiktok_video
-
-# --- Konfiguration ---
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__)) # src-Ordner
-PROJECT_ROOT = os.path.dirname(PROJECT_ROOT) # Eine Ebene höher zum Projekt-Root
-
-CHARTS_DIR = os.path.join(PROJECT_ROOT, "charts")
-VIDEOS_DIR = os.path.join(PROJECT_ROOT, "videos")
-MUSIC_DIR = os.path.join(PROJECT_ROOT, "music")
-LOGS_DIR = os.path.join(PROJECT_ROOT, "logs")
-
-BACKGROUND_MUSIC_FILE = os.path.join(MUSIC_DIR, "background_music.mp3")
-VIDEO_DURATION_PER_CHART = 2 # Sekunden pro Chart
-
-# --- Logging Konfiguration ---
-os.makedirs(LOGS_DIR, exist_ok=True)
-log_filename = os.path.join(LOGS_DIR, f"daily_tiktok_generation_{datetime.now().strftime('%Y-%m-%d')}.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filename),
-        logging.StreamHandler(sys.stdout) # Auch auf Konsole ausgeben
-    ]
-)
-
-def run_daily_process():
+from dax_movers import fetch_close_prices, history_start, select_index_movers
+from chart_generator import CHART_TEMPLATE_VERSION, create_charts_parallel
+from chart_cache import ChartCache
+from video_maker import (CROSSFADE_DURATION, ENCODER_CRF, ENCODER_PRESET, FPS, LINE_DRAW_FRACTION, VideoJob,
+                         create_videos_parallel, video_duration)
+from video_encoder import mux_audio
+from chart_stream import create_videos_streaming
+from audio_cache import AUDIO_CACHE_VERSION, AUDIO_FADE_OUT, AudioCache
+from price_store import PriceStore
+from instrumentation import RunRecorder
+from pipeline import Pipeline, Step, hash_frame, hash_inputs, prune_run_dirs
+from trading_calendar import previous_trading_day
+from settings import get_chart_engine, get_video_profiles
+# Konfiguration (Pfade und Laufparameter) liegt in settings.py
+from settings import (AUDIO_CACHE_DIR, BACKGROUND_MUSIC_FILE, CHART_ANIMATION, CHART_CACHE_DIR, CHART_DAYS,
+                      CHART_DEBUG_OUTPUT, CHART_WORKERS, CHARTS_DIR, MOVER_HORIZON, MOVER_INDICES, NUM_MOVERS, PRICE_STORE_FILE,
+                      PROMETHEUS_TEXTFILE, RUN_DIRS_KEEP, RUN_RECORD_FILE, RUNS_DIR, VIDEO_DURATION_PER_CHART,
+                      VIDEO_OVERLAYS, VIDEO_STREAMING, VIDEOS_DIR, configure_logging)
+from render_profiles import DEFAULT_PROFILE, get_profile
+from universe import default_universe
+
+def video_output_path(index: str, run_date: datetime, profile=None) -> str:
+    """
+    Zielpfad im Format "yyyy-mm-dd-TikTok.mp4" (DAX) bzw. "yyyy-mm-dd-<INDEX>-TikTok.mp4";
+    für andere Ausgabeformate steht deren Bezeichnung statt "TikTok" (z.B. "Instagram-Square").
+    """
+    index_suffix = "" if index == "DAX" else f"-{index}"
+    label = (profile or get_profile(DEFAULT_PROFILE)).label
+    return os.path.join(VIDEOS_DIR, f"{run_date.strftime('%Y-%m-%d')}{index_suffix}-{label}.mp4")
+
+
+def _ordered_movers(top_gainers: pd.Series, top_losers: pd.Series) -> list:
+    """
+    Geordnete Liste (Ticker, Veränderung, Typ): zuerst Gewinner, dann Verlierer.
+    Dies stellt die Reihenfolge der Charts im Video sicher.
+    """
+    # Top-Gewinner sind bereits absteigend, Top-Verlierer aufsteigend nach Performance sortiert
+    return ([(ticker, change, 'gainer') for ticker, change in top_gainers.items()] +
+            [(ticker, change, 'loser') for ticker, change in top_losers.items()])
+
+
+def _file_signature(path: str):
+    """Pfad, Größe und Änderungszeit einer Eingabedatei (None, wenn sie fehlt)."""
+    if not path or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [path, stat.st_size, int(stat.st_mtime)]
+
+
+def build_daily_pipeline(run_date: datetime, indices=MOVER_INDICES, provider=None, price_store=None,
+                         force=(), targets=None, require_session: bool = False) -> Pipeline:
+    """
+    Baut den Step-Graphen des täglichen Ablaufs:
+    fetch -> movers -> charts-<INDEX> -> encode-<INDEX> -> mux-<INDEX>.
+    Checkpoints und Zwischenergebnisse liegen in runs/<Handelstag>/ (letzter XETRA-Handelstag vor `run_date`).
+    `targets` beschränkt den Lauf auf diese Schritte (Name oder Art) und ihre Abhängigkeiten.
+    Mit `require_session` schlägt fetch fehl, solange die Kurse dieses Handelstags noch nicht vorliegen,
+    statt die Mover aus älteren Kursen zu berechnen.
+    Mit VIDEO_STREAMING entfällt charts-<INDEX>: encode-<INDEX> rendert die Charts selbst, während die
+    Videos kodiert werden (fetch -> movers -> encode-<INDEX> -> mux-<INDEX>); nur wenn die Charts
+    selbst Ziel des Laufs sind (`targets`, z.B. cli.py charts), bleibt der getrennte Schritt.
+    """
+    trading_date = previous_trading_day(run_date)
+    run_dir = os.path.join(RUNS_DIR, trading_date.strftime("%Y-%m-%d"))
+    universe = default_universe()
+    index_members = {index: universe.members(index) for index in indices}
+    tickers = universe.tickers(list(indices))
+    steps = []
+
+    # 1. Kursdaten abrufen (ein gemeinsamer Download für alle Indizes)
+    def fetch(inputs):
+        start_date = history_start(run_date, CHART_DAYS, MOVER_HORIZON) # Chartfenster und Horizont
+        close_data, failed, empty = fetch_close_prices(tickers, start_date, run_date, price_store, provider)
+        if len(close_data) < 2:
+            raise RuntimeError("Nicht genügend Kursdaten für die Berechnung der Veränderung.")
+        if require_session and close_data.index[-1] < pd.Timestamp(trading_date):
+            raise RuntimeError(f"Kursdaten für den {trading_date:%d.%m.%Y} liegen noch nicht vor "
+                               f"(letzter Kurs: {close_data.index[-1]:%d.%m.%Y}).")
+        if failed:
+            logging.warning(f"Mover werden ohne {len(failed)} fehlgeschlagene Ticker berechnet: {', '.join(failed)}")
+        path = os.path.join(run_dir, "close.pkl")
+        close_data.to_pickle(path)
+        return {"files": [path], "output_hash": hash_frame(close_data),
+                "last_date": close_data.index[-1].strftime("%Y-%m-%d"), "failed_tickers": failed,
+                "empty_tickers": empty}
+
+    def fetch_complete(checkpoint):
+        # Ohne Kurse des Handelstags (z.B. Lauf vor Börsenschluss) wird erneut geladen
+        if checkpoint["last_date"] < trading_date.strftime("%Y-%m-%d"):
+            logging.warning(f"Kursdaten reichen nur bis {checkpoint['last_date']}, lade erneut.")
+            return False
+        # Fehlgeschlagene Ticker beim nächsten Lauf erneut versuchen; Ticker ohne Kursdaten (empty_tickers)
+        # bleiben voraussichtlich leer und machen den Checkpoint nicht ungültig
+        if checkpoint.get("failed_tickers"):
+            logging.warning(f"{len(checkpoint['failed_tickers'])} Ticker fehlten beim letzten Abruf, lade erneut.")
+            return False
+        return True
+
+    steps.append(Step("fetch", fetch, params={
+        "tickers": hash_inputs(tickers), "provider": provider.name if provider else "yfinance",
+        "run_date": run_date.strftime("%Y-%m-%d"), "chart_days": CHART_DAYS, "horizon": MOVER_HORIZON,
+    }, validate=fetch_complete))
+
+    # 2. Mover ermitteln
+    def movers(inputs):
+        close_data = pd.read_pickle(inputs["fetch"]["files"][0])
+        results = select_index_movers(close_data, index_members, NUM_MOVERS, CHART_DAYS, MOVER_HORIZON)
+        path = os.path.join(run_dir, "movers.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(results, f)
+        summary = {index: {"gainers": gainers.to_dict(), "losers": losers.to_dict()}
+                   for index, (gainers, losers, _) in results.items()}
+        for index, info in summary.items():
+            logging.info(f"{index} Gewinner: {info['gainers']}, Verlierer: {info['losers']}")
+        return {"files": [path], "output_hash": hash_inputs(summary, inputs["fetch"]["output_hash"]),
+                "movers": summary}
+
+    steps.append(Step("movers", movers, deps=["fetch"], params={"indices": index_members, "num_movers": NUM_MOVERS,
+                                                                  "horizon": MOVER_HORIZON}))
+
+    streaming = VIDEO_STREAMING and not (targets and "charts" in targets)
+    if streaming and "charts" in force:
+        force = tuple(force) + ("encode",) # Die Charts entstehen im Schritt encode
+    for index in indices:
+        steps += _index_steps(index, run_date, run_dir, streaming)
+    return Pipeline(run_dir, steps, force, targets)
+
+
+def _index_steps(index: str, run_date: datetime, run_dir: str, streaming: bool = False) -> list:
+    """
+    Schritte charts, encode und mux für die Videos eines Index, ein Video pro Ausgabeformat
+    (settings.ini, [video] profiles). Mover und Chartdaten werden für alle Formate
+    gemeinsam vorbereitet; die Charts aller Formate entstehen in einem Prozess-Pool,
+    die Videos werden parallel kodiert.
+    Mit `streaming` gibt es nur encode und mux: encode rendert die Charts und kodiert
+    die Videos überlappend (chart_stream.create_videos_streaming).
+    """
+    profiles = get_video_profiles()
+    chart_dir = os.path.join(run_dir, f"charts-{index}")
+    silent_videos = {profile.name: os.path.join(run_dir, f"video-{index}-{profile.name}.mp4") for profile in profiles}
+    output_videos = {profile.name: video_output_path(index, run_date, profile) for profile in profiles}
+    profile_by_size = {(profile.width, profile.height): profile for profile in profiles}
+
+    def load_chart_jobs(inputs):
+        """Geordnete Mover und Chart-Aufträge (ticker, historical_data, percentage_change) des Index."""
+        with open(inputs["movers"]["files"][0], "rb") as f:
+            top_gainers, top_losers, historical_chart_data = pickle.load(f)[index]
+        ordered_movers = _ordered_movers(top_gainers, top_losers)
+        if not ordered_movers:
+            raise RuntimeError(f"Keine {index} Mover gefunden. Kein Video wird generiert.")
+
+        chart_jobs = []
+        for ticker, percentage_change, _ in ordered_movers:
+            if ticker in historical_chart_data:
+                chart_jobs.append((ticker, historical_chart_data[ticker], percentage_change))
+            else:
+                logging.warning(f"Keine historischen Daten für {ticker} gefunden, Chart kann nicht erstellt werden.")
+        return ordered_movers, chart_jobs
+
+    chart_params = {"template": CHART_TEMPLATE_VERSION, "engine": get_chart_engine(),
+                    "sizes": [f"{profile.width}x{profile.height}" for profile in profiles],
+                    "animation": CHART_ANIMATION}
+    encode_params = {"fps": FPS, "preset": ENCODER_PRESET, "crf": ENCODER_CRF,
+                     "seconds_per_chart": VIDEO_DURATION_PER_CHART, "line_draw_fraction": LINE_DRAW_FRACTION,
+                     "crossfade": CROSSFADE_DURATION, "overlays": VIDEO_OVERLAYS,
+                     "video_date": run_date.strftime("%Y-%m-%d")}
+
+    # 3. Charts generieren
+    def charts(inputs):
+        ordered_movers, chart_jobs = load_chart_jobs(inputs)
+        mover_types = {ticker: mover_type for ticker, _, mover_type in ordered_movers}
+        changes = {ticker: float(change) for ticker, change, _ in ordered_movers}
+        store = ChartCache(chart_dir)
+        files, failed = {profile.name: [] for profile in profiles}, []
+        overlays = {profile.name: [] for profile in profiles} # (Ticker, Veränderung) pro Chart-Datei
+        results = create_charts_parallel(chart_jobs, CHARTS_DIR, CHART_WORKERS, as_frames=True,
+                                         save_debug_png=CHART_DEBUG_OUTPUT, cache_dir=CHART_CACHE_DIR,
+                                         animate=CHART_ANIMATION, frame_sizes=list(profile_by_size))
+        for position, result in enumerate(results):
+            profile = profile_by_size[result.size]
+            if result.error is not None:
+                logging.error(f"Fehler beim Erstellen des Charts für {result.ticker} ({profile.name}): {result.error}")
+                failed.append(result.ticker)
+                continue
+            key = f"{position // len(profile_by_size):02d}-{result.ticker}-{profile.name}"
+            if CHART_ANIMATION:
+                store.put_animation(key, result.animation)
+            else:
+                store.put(key, result.frame)
+            files[profile.name].append(store.path(key, animation=CHART_ANIMATION))
+            overlays[profile.name].append([result.ticker, changes[result.ticker]])
+            status = "aus dem Cache geladen" if result.cached else "erstellt"
+            logging.info(f"Chart für {result.ticker} ({mover_types[result.ticker]}, {profile.name}) {status}"
+                         + (f": {result.path}" if result.path else "."))
+
+        if not any(files.values()):
+            raise RuntimeError("Keine Charts generiert. Video kann nicht erstellt werden.")
+        return {"files": [path for paths in files.values() for path in paths], "profiles": files,
+                "overlays": overlays, "failed": sorted(set(failed))}
+
+    # Fehlgeschlagene Charts beim nächsten Lauf erneut versuchen (erfolgreiche kommen aus dem Chart-Cache)
+    charts_step = Step(f"charts-{index}", charts, deps=["movers"], kind="charts", labels={"index": index},
+                       validate=lambda checkpoint: not checkpoint["failed"], params=chart_params)
+
+    # 4. Videos ohne Ton kodieren (ein FFmpeg-Prozess pro Format, parallel)
+    def encode(inputs):
+        chart_files = inputs[charts_step.name]["profiles"]
+        # Checkpoints älterer Läufe enthalten noch keine Overlays, die Videos entstehen dann ohne
+        overlays = inputs[charts_step.name].get("overlays", {}) if VIDEO_OVERLAYS else {}
+        jobs = [VideoJob(f"{silent_videos[profile.name]}.{os.getpid()}.tmp.mp4", chart_files[profile.name],
+                         (profile.width, profile.height), VIDEO_DURATION_PER_CHART, run_date, index,
+                         None, # Musik folgt im Schritt mux
+                         [tuple(overlay) for overlay in overlays[profile.name]] if profile.name in overlays else None)
+                for profile in profiles if chart_files.get(profile.name)]
+        errors = []
+        for job, result in zip(jobs, create_videos_parallel(jobs)):
+            if result.error is not None:
+                errors.append(f"{os.path.basename(job.output_filepath)}: {result.error}")
+        if errors:
+            raise RuntimeError(f"Videokodierung fehlgeschlagen: {'; '.join(errors)}")
+
+        files, durations = [], {}
+        for profile in profiles:
+            if chart_files.get(profile.name):
+                os.replace(f"{silent_videos[profile.name]}.{os.getpid()}.tmp.mp4", silent_videos[profile.name])
+                files.append(silent_videos[profile.name])
+                durations[silent_videos[profile.name]] = video_duration(len(chart_files[profile.name]),
+                                                                        VIDEO_DURATION_PER_CHART)
+        return {"files": files, "durations": durations}
+
+    encode_step = Step(f"encode-{index}", encode, deps=[charts_step.name], kind="encode", labels={"index": index},
+                       params=encode_params)
+
+    # 3./4. Charts rendern und Videos ohne Ton kodieren, überlappend: ein Video-Thread pro Format
+    # übernimmt die Charts in Timeline-Reihenfolge, sobald sie aus dem Prozess-Pool kommen
+    def stream(inputs):
+        ordered_movers, chart_jobs = load_chart_jobs(inputs)
+        if not chart_jobs:
+            raise RuntimeError("Keine Charts generiert. Video kann nicht erstellt werden.")
+        mover_types = {ticker: mover_type for ticker, _, mover_type in ordered_movers}
+        # Fehlgeschlagene Charts erscheinen als Platzhalter mit ihrem Overlay, die Videolänge bleibt gleich
+        overlays = [(ticker, float(change)) for ticker, _, change in chart_jobs] if VIDEO_OVERLAYS else None
+        jobs = [VideoJob(f"{silent_videos[profile.name]}.{os.getpid()}.tmp.mp4", None, (profile.width, profile.height),
+                         VIDEO_DURATION_PER_CHART, run_date, index, None, overlays) for profile in profiles]
+        results, chart_results = create_videos_streaming(chart_jobs, jobs, CHART_WORKERS, output_dir=CHARTS_DIR,
+                                                         save_debug_png=CHART_DEBUG_OUTPUT, cache_dir=CHART_CACHE_DIR,
+                                                         animate=CHART_ANIMATION)
+        for result in chart_results:
+            if result.error is None:
+                status = "aus dem Cache geladen" if result.cached else "erstellt"
+                logging.info(f"Chart für {result.ticker} ({mover_types[result.ticker]}, "
+                             f"{profile_by_size[result.size].name}) {status}.")
+        errors = [f"{os.path.basename(job.output_filepath)}: {result.error}"
+                  for job, result in zip(jobs, results) if result.error is not None]
+        if errors:
+            raise RuntimeError(f"Videokodierung fehlgeschlagen: {'; '.join(errors)}")
+        if not any(result.error is None for result in chart_results):
+            raise RuntimeError("Keine Charts generiert. Video kann nicht erstellt werden.")
+
+        files, durations = [], {}
+        for job, profile in zip(jobs, profiles):
+            os.replace(job.output_filepath, silent_videos[profile.name])
+            files.append(silent_videos[profile.name])
+            durations[silent_videos[profile.name]] = video_duration(len(chart_jobs), VIDEO_DURATION_PER_CHART)
+        return {"files": files, "durations": durations,
+                "failed": sorted({result.ticker for result in chart_results if result.error is not None})}
+
+    if streaming:
+        # Videos mit fehlgeschlagenen Charts (Platzhalter) beim nächsten Lauf neu erstellen
+        encode_step = Step(f"encode-{index}", stream, deps=["movers"], kind="encode", labels={"index": index},
+                           validate=lambda checkpoint: not checkpoint["failed"],
+                           params={**chart_params, **encode_params, "streaming": True})
+
+    # 5. Hintergrundmusik einmischen (Video- und Audiostrom werden nur kopiert)
+    def mux(inputs):
+        os.makedirs(VIDEOS_DIR, exist_ok=True)
+        has_music = os.path.exists(BACKGROUND_MUSIC_FILE)
+        if not has_music:
+            logging.error(f"Hintergrundmusikdatei nicht gefunden: {BACKGROUND_MUSIC_FILE}")
+            logging.warning("Video wird ohne Musik erstellt.")
+        # Musik einmal pro Videolänge gekürzt und ausgeblendet aus dem Audio-Cache;
+        # Checkpoints älterer Läufe ohne Videolänge mischen die Musik wie bisher mit Neukodierung ein
+        audio_cache = AudioCache(AUDIO_CACHE_DIR) if has_music else None
+        durations = inputs[encode_step.name].get("durations", {})
+        files = []
+        for profile in profiles:
+            silent_video, output_video = silent_videos[profile.name], output_videos[profile.name]
+            if silent_video not in inputs[encode_step.name]["files"]:
+                continue
+            if has_music and silent_video in durations:
+                music = audio_cache.variant(BACKGROUND_MUSIC_FILE, durations[silent_video])
+                mux_audio(silent_video, music, output_video, copy_audio=True)
+            elif has_music:
+                mux_audio(silent_video, BACKGROUND_MUSIC_FILE, output_video)
+            else:
+                tmp_path = f"{output_video}.{os.getpid()}.tmp"
+                shutil.copyfile(silent_video, tmp_path)
+                os.replace(tmp_path, output_video)
+            logging.info(f"Video ({profile.name}) erfolgreich erstellt: {output_video}")
+            files.append(output_video)
+        return {"files": files}
+
+    mux_step = Step(f"mux-{index}", mux, deps=[encode_step.name], kind="mux", labels={"index": index},
+                    params={"music": _file_signature(BACKGROUND_MUSIC_FILE), "outputs": output_videos,
+                            "fade_out": AUDIO_FADE_OUT, "audio_cache": AUDIO_CACHE_VERSION})
+    return [encode_step, mux_step] if streaming else [charts_step, encode_step, mux_step]
+
+
+def run_daily_process(provider=None, as_of=None, price_store=None, indices=MOVER_INDICES, force=(), targets=None,
+                      require_session=False):
+    """
+    Führt den täglichen Ablauf als Step-Graph aus (siehe build_daily_pipeline):
+    Mover ermitteln, Charts erstellen, Video kodieren, Musik einmischen (ein Video pro Index).
+    Jeder Schritt schreibt einen Checkpoint; ein erneuter Lauf setzt beim ersten fehlenden
+    oder veralteten Schritt fort. `force` erzwingt einzelne Schritte erneut (z.B. ("charts",)),
+    `targets` führt nur die angegebenen Schritte samt Abhängigkeiten aus (z.B. ("charts",)).
+    `provider` (z.B. ReplayProvider) und `as_of` erlauben reproduzierbare Offline-Läufe.
+    `require_session` siehe build_daily_pipeline (für den Dienst, der direkt nach Handelsschluss läuft).
+    Der lokale Kursspeicher wird standardmäßig nur für Live-Daten verwendet,
+    damit Replay-Daten ihn nicht verfälschen.
+    Gibt True zurück, wenn alle Schritte erfolgreich waren.
+    """
     logging.info("--- Start der täglichen TikTok-Generierung ---")
-    current_date_str = datetime.now().strftime("%Y-%m-%d")
-
-    # 1. Daten abrufen und Mover ermitteln
-    logging.info("Schritt 1: DAX Top Mover ermitteln...")
-    top_gainers, top_losers, historical_chart_data = get_dax_movers(num_movers=5)
-
-    if top_gainers is None or top_losers is None or historical_chart_data is None:
-        logging.error("Fehler beim Abrufen der DAX Mover-Daten. Prozess abgebrochen.")
-        return
-
-    # Erstelle eine geordnete Liste von Movern, die zuerst Gewinner und dann Verlierer enthält.
-    # Dies stellt die Reihenfolge der Charts im Video sicher.
-    ordered_movers_for_charts = []
-    # Außerdem ein Dictionary für video_maker, das die Infos für die Overlays bereitstellt.
-    movers_info_for_video_maker = {}
-
-    # Füge Top-Gewinner hinzu (bereits absteigend sortiert nach Performance von get_dax_movers)
-    for ticker, change in top_gainers.items():
-        ordered_movers_for_charts.append((ticker, change, 'gainer'))
-        movers_info_for_video_maker[ticker] = {'change': change, 'type': 'gainer'}
-
-    # Füge Top-Verlierer hinzu (bereits aufsteigend sortiert nach Performance von get_dax_movers)
-    for ticker, change in top_losers.items():
-        ordered_movers_for_charts.append((ticker, change, 'loser'))
-        movers_info_for_video_maker[ticker] = {'change': change, 'type': 'loser'}
-
-    if not ordered_movers_for_charts:
-        logging.warning("Keine Mover gefunden. Kein Video wird generiert.")
-        return
-
-    # 2. Charts generieren
-    logging.info("Schritt 2: Charts generieren...")
-    generated_chart_files = []
-
-    for ticker, percentage_change, mover_type in ordered_movers_for_charts:
-        if ticker in historical_chart_data:
-            try:
-                chart_filename = create_30_day_chart(ticker, historical_chart_data[ticker], percentage_change, CHARTS_DIR)
-                generated_chart_files.append(chart_filename)
-                logging.info(f"Chart für {ticker} ({mover_type}) erstellt: {chart_filename}")
-            except Exception as e:
-                logging.error(f"Fehler beim Erstellen des Charts für {ticker}: {e}")
-        else:
-            logging.warning(f"Keine historischen Daten für {ticker} gefunden, Chart kann nicht erstellt werden.")
-
-    if not generated_chart_files:
-        logging.error("Keine Charts generiert. Video kann nicht erstellt werden. Prozess abgebrochen.")
-        return
-
-    # 3. Video generieren
-    logging.info("Schritt 3: Video generieren...")
-    os.makedirs(VIDEOS_DIR, exist_ok=True)
-
-    # Basis-Dateiname im Format "yyyy-mm-dd-TikTok.mp4"
-    base_filename = f"{current_date_str}-TikTok.mp4"
-    output_video_filename = os.path.join(VIDEOS_DIR, base_filename)
-
-    # Überprüfen, ob die Datei bereits existiert und einen Zeitstempel hinzufügen
-    # Dies verhindert das Überschreiben bei mehrmaligem Ausführen am selben Tag
-    if os.path.exists(output_video_filename):
-        timestamp_suffix = datetime.now().strftime("_%H%M%S")
-        name_part, ext_part = os.path.splitext(base_filename)
-        output_video_filename = os.path.join(VIDEOS_DIR, f"{name_part}{timestamp_suffix}{ext_part}")
-        logging.warning(f"Video für {current_date_str} existiert bereits. Speichere unter neuem Namen: {output_video_filename}")
-
-    try:
-        create_tiktok_video(
-            chart_image_paths=generated_chart_files,
-            output_filepath=output_video_filename,
-            background_music_path=BACKGROUND_MUSIC_FILE,
-            chart_display_duration=VIDEO_DURATION_PER_CHART,
-            movers_info=movers_info_for_video_maker
-        )
-        logging.info(f"TikTok-Video erfolgreich erstellt: {output_video_filename}")
-    except FileNotFoundError as e:
-        logging.error(f"Fehler: Musikdatei oder FFmpeg nicht gefunden. {e}")
-        logging.error("Stellen Sie sicher, dass FFmpeg korrekt installiert und im PATH ist, und die Musikdatei existiert.")
-    except Exception as e:
-        logging.error(f"Ein unerwarteter Fehler bei der Videogenerierung ist aufgetreten: {e}", exc_info=True)
-    finally:
-        # Optional: Aufräumen der generierten Charts nach Videoerstellung
-        logging.info("Schritt 4: Aufräumen der temporären Chart-Bilder...")
-        for chart_file in generated_chart_files:
-            try:
-                os.remove(chart_file)
-                logging.info(f"Gelöscht: {chart_file}")
-            except Exception as e:
-                logging.warning(f"Konnte Chart-Datei nicht löschen {chart_file}: {e}")
+    run_date = as_of if as_of is not None else datetime.now()
+
+    # Messwerte für jeden Schritt (Laufprotokoll als JSON-Zeilen, optional Prometheus)
+    with RunRecorder(RUN_RECORD_FILE, PROMETHEUS_TEXTFILE) as run:
+        if price_store is None and provider is None:
+            price_store = PriceStore(PRICE_STORE_FILE)
+        pipeline = build_daily_pipeline(run_date, indices, provider, price_store, force, targets, require_session)
+        pipeline.run()
+        if pipeline.failed:
+            run.mark_failed(f"Fehlgeschlagene Schritte: {', '.join(pipeline.failed)}")
 
+    prune_run_dirs(RUNS_DIR, RUN_DIRS_KEEP)
     logging.info("--- Ende der täglichen TikTok-Generierung ---")
+    return not pipeline.failed
 
 if __name__ == "__main__":
-    run_daily_process()
\ No newline at end of file
+    configure_logging()
+    run_daily_process()
@@ -0,0 +1,127 @@
+# src/overlay.py
+
+from collections import namedtuple
+import cv2
+import numpy as np
+
+# Gerasterte Ebene (Text oder Grafik): BGRA-Kachel (uint8, wie die Frames in BGR-Reihenfolge)
+# sowie die daraus vorberechneten Mischwerte für das Compositing (uint16, Alpha auf 0..256 skaliert):
+# inverse_alpha = 256 - Alpha (h x w x 1), premultiplied = Farbe * Alpha (h x w x 3)
+OverlayTile = namedtuple("OverlayTile", ["bgra", "inverse_alpha", "premultiplied"])
+
+# Platzierte Ebene: Kachel und linke obere Ecke im Frame (darf teilweise außerhalb liegen)
+Layer = namedtuple("Layer", ["tile", "x", "y"])
+
+
+def tile_from_bgra(bgra: np.ndarray) -> OverlayTile:
+    """Bereitet eine BGRA-Kachel (uint8) einmalig für das Compositing vor."""
+    bgra = np.ascontiguousarray(bgra, dtype=np.uint8)
+    alpha = bgra[:, :, 3:4].astype(np.uint16)
+    alpha += alpha >> 7 # 0..255 -> 0..256, damit volle Deckkraft exakt die Ebenenfarbe ergibt
+    return OverlayTile(bgra, 256 - alpha, bgra[:, :, :3] * alpha)
+
+
+class LayerCache:
+    """
+    Rastert Text-Ebenen einmal und hält sie als OverlayTile vor, Schlüssel ist
+    (Text, Schriftart, Farbe, Skalierung, Linienstärke). Alle Frames und Videos
+    eines Prozesses teilen sich die Kacheln (siehe get_layer_cache).
+    """
+
+    def __init__(self):
+        self._tiles = {}
+
+    def text(self, text: str, font: int, color_bgr, scale: float, thickness: int) -> OverlayTile:
+        key = (text, font, tuple(color_bgr), scale, thickness)
+        tile = self._tiles.get(key)
+        if tile is None:
+            (width, height), baseline = cv2.getTextSize(text, font, scale, thickness)
+            # Rand für Antialiasing und Unterlängen
+            pad = thickness + 2
+            mask = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+            cv2.putText(mask, text, (pad, pad + height), font, scale, 255, thickness, cv2.LINE_AA)
+            bgra = np.empty(mask.shape + (4,), dtype=np.uint8)
+            bgra[:, :, :3] = color_bgr
+            bgra[:, :, 3] = mask
+            tile = tile_from_bgra(bgra)
+            self._tiles[key] = tile
+        return tile
+
+    def __len__(self):
+        return len(self._tiles)
+
+
+_layer_cache = None
+
+
+def get_layer_cache() -> LayerCache:
+    """Gemeinsamer LayerCache des Prozesses."""
+    global _layer_cache
+    if _layer_cache is None:
+        _layer_cache = LayerCache()
+    return _layer_cache
+
+
+def centered(tile: OverlayTile, frame_width: int, center_y: int) -> Layer:
+    """Platziert eine Kachel horizontal zentriert, vertikal mittig um `center_y`."""
+    height, width = tile.bgra.shape[:2]
+    return Layer(tile, (frame_width - width) // 2, center_y - height // 2)
+
+
+class Compositor:
+    """
+    Setzt Frames aus einem Basisbild und Overlay-Ebenen zusammen und blendet
+    zwischen zwei Bildern über (Crossfade). Gerechnet wird vektorisiert mit
+    NumPy in Ganzzahlen (uint16), in vorab angelegte Puffer: `compose` und
+    `crossfade` liefern jedes Mal denselben Ausgabepuffer, er muss verarbeitet
+    sein, bevor der nächste Frame angefordert wird. Pro Frame fallen damit keine
+    neuen Allokationen an; Ebenen kosten nur die Fläche ihrer Kacheln.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+        self._fade_a = np.empty((height, width, 3), dtype=np.uint16)
+        self._fade_b = np.empty((height, width, 3), dtype=np.uint16)
+
+    def blend(self, canvas: np.ndarray, layers) -> np.ndarray:
+        """Mischt die Ebenen in das Bild (in place): canvas = (canvas * (256 - a) + Farbe * a) / 256."""
+        for layer in layers:
+            tile = layer.tile
+            h, w = tile.bgra.shape[:2]
+            x0, y0 = max(layer.x, 0), max(layer.y, 0)
+            x1, y1 = min(layer.x + w, canvas.shape[1]), min(layer.y + h, canvas.shape[0])
+            if x0 >= x1 or y0 >= y1:
+                continue
+            tile_rows, tile_cols = slice(y0 - layer.y, y1 - layer.y), slice(x0 - layer.x, x1 - layer.x)
+            region = canvas[y0:y1, x0:x1]
+            scratch = self._fade_a[:y1 - y0, :x1 - x0]
+            np.multiply(region, tile.inverse_alpha[tile_rows, tile_cols], out=scratch)
+            np.add(scratch, tile.premultiplied[tile_rows, tile_cols], out=scratch)
+            np.right_shift(scratch, 8, out=scratch)
+            np.copyto(region, scratch, casting="unsafe")
+        return canvas
+
+    def compose(self, base: np.ndarray, layers) -> np.ndarray:
+        """Basisbild plus Ebenen im Ausgabepuffer."""
+        np.copyto(self.buffer, base)
+        return self.blend(self.buffer, layers)
+
+    def render(self, base: np.ndarray, layers) -> np.ndarray:
+        """Wie `compose`, aber als eigenes Bild (für Standbilder, die länger gehalten werden)."""
+        return self.blend(base.copy(), layers)
+
+    def crossfade(self, start: np.ndarray, end: np.ndarray, weight: int) -> np.ndarray:
+        """Überblendung im Ausgabepuffer: weight 0 = `start`, 256 = `end`."""
+        np.multiply(start, np.uint16(256 - weight), out=self._fade_a)
+        np.multiply(end, np.uint16(weight), out=self._fade_b)
+        np.add(self._fade_a, self._fade_b, out=self._fade_a)
+        np.right_shift(self._fade_a, 8, out=self._fade_a)
+        np.copyto(self.buffer, self._fade_a, casting="unsafe")
+        return self.buffer
+
+    def crossfade_frames(self, start: np.ndarray, end: np.ndarray, num_frames: int):
+        """Generator über `num_frames` Überblendungs-Frames von `start` nach `end` (beide ausschließlich)."""
+        for frame_number in range(1, num_frames + 1):
+            yield self.crossfade(start, end, round(256 * frame_number / (num_frames + 1)))
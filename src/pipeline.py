@@ -0,0 +1,167 @@
+# src/pipeline.py
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from instrumentation import stage
+
+# Version des Checkpoint-Formats; bei inkompatiblen Änderungen erhöhen, damit alle Schritte neu laufen
+CHECKPOINT_VERSION = 1
+
+
+def hash_inputs(*parts) -> str:
+    """SHA-256 über JSON-serialisierbare Eingaben (Parameter, Hashes vorgelagerter Schritte)."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def hash_frame(frame: pd.DataFrame) -> str:
+    """Inhalts-Hash einer Kursmatrix (Datum, Ticker, Werte), unabhängig vom Dateiformat."""
+    digest = hashlib.sha256()
+    digest.update(pd.to_datetime(frame.index).asi8.tobytes())
+    digest.update("\0".join(map(str, frame.columns)).encode())
+    digest.update(np.ascontiguousarray(frame.to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class Step:
+    """
+    Ein Schritt des Step-Graphen.
+    `run(inputs)` erhält die Checkpoints der vorgelagerten Schritte ({Name: Checkpoint})
+    und gibt die Ausgaben als Dictionary zurück: `files` (erzeugte Dateien), optional
+    `output_hash` (Inhalts-Hash der Ausgabe, Standard: Hash der Eingaben) und beliebige
+    weitere JSON-Werte. `validate(checkpoint)` kann einen vorhandenen Checkpoint
+    zusätzlich als veraltet verwerfen (z.B. unvollständige Kursdaten).
+    """
+
+    def __init__(self, name: str, run, deps=(), params: dict = None, kind: str = None,
+                 labels: dict = None, validate=None):
+        self.name = name
+        self.kind = kind or name
+        self.run = run
+        self.deps = list(deps)
+        self.params = params or {}
+        self.labels = labels or {}
+        self.validate = validate
+
+
+class Pipeline:
+    """
+    Führt Schritte in der angegebenen (topologischen) Reihenfolge aus und legt nach jedem
+    Schritt einen Checkpoint `<Schritt>.json` im Laufverzeichnis ab.
+    Ein Schritt wird übersprungen, wenn sein Checkpoint zum Hash der aktuellen Eingaben
+    passt und alle Ausgabedateien noch existieren. Der Hash der Eingaben umfasst die
+    Parameter des Schritts und die Ausgabe-Hashes der vorgelagerten Schritte; ändert sich
+    eine Ausgabe nicht, bleiben auch die nachgelagerten Schritte gültig.
+    `force` erzwingt einzelne Schritte, per Name ("charts-DAX") oder Art ("charts").
+    `targets` beschränkt den Lauf auf diese Schritte (Name oder Art) und alles, wovon sie abhängen.
+    """
+
+    def __init__(self, run_dir: str, steps: list, force=(), targets=None):
+        self.run_dir = run_dir
+        self.steps = _select_steps(steps, targets) if targets else steps
+        self.force = set(force or ())
+        self.failed = {}
+
+    def _checkpoint_path(self, step: Step) -> str:
+        return os.path.join(self.run_dir, f"{step.name}.json")
+
+    def load_checkpoint(self, step: Step):
+        try:
+            with open(self._checkpoint_path(step), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_checkpoint(self, step: Step, checkpoint: dict):
+        path = self._checkpoint_path(step)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def _is_fresh(self, step: Step, checkpoint: dict, input_hash: str) -> bool:
+        if checkpoint is None or checkpoint.get("version") != CHECKPOINT_VERSION:
+            return False
+        if checkpoint.get("input_hash") != input_hash:
+            return False
+        if not all(os.path.exists(path) for path in checkpoint.get("files", [])):
+            return False
+        return step.validate is None or step.validate(checkpoint)
+
+    def run(self) -> dict:
+        """
+        Führt alle fehlenden oder veralteten Schritte aus und gibt {Name: Checkpoint} zurück.
+        Schlägt ein Schritt fehl, werden nur die von ihm abhängigen Schritte übersprungen
+        (z.B. bleibt das Video eines anderen Index unberührt); die Fehler stehen in `failed`.
+        """
+        os.makedirs(self.run_dir, exist_ok=True)
+        checkpoints = {}
+        self.failed = {}
+        for step in self.steps:
+            missing = [dep for dep in step.deps if dep not in checkpoints]
+            if missing:
+                logging.warning(f"Schritt '{step.name}' übersprungen, da {', '.join(missing)} fehlgeschlagen ist.")
+                self.failed[step.name] = f"Abhängigkeit fehlgeschlagen: {', '.join(missing)}"
+                continue
+            try:
+                checkpoints[step.name] = self._run_step(step, {dep: checkpoints[dep] for dep in step.deps})
+            except Exception as e:
+                logging.error(f"Schritt '{step.name}' fehlgeschlagen: {e}", exc_info=True)
+                self.failed[step.name] = f"{type(e).__name__}: {e}"
+        return checkpoints
+
+    def _run_step(self, step: Step, inputs: dict) -> dict:
+        input_hash = hash_inputs(step.name, step.params, {dep: cp["output_hash"] for dep, cp in inputs.items()})
+        checkpoint = self.load_checkpoint(step)
+        forced = step.name in self.force or step.kind in self.force
+
+        if not forced and self._is_fresh(step, checkpoint, input_hash):
+            logging.info(f"Schritt '{step.name}' ist aktuell (Checkpoint vom {checkpoint['created']}), übersprungen.")
+            return checkpoint
+
+        reason = "erzwungen" if forced else ("kein Checkpoint" if checkpoint is None else "veraltet")
+        logging.info(f"Schritt '{step.name}' wird ausgeführt ({reason})...")
+        with stage(step.kind, **step.labels):
+            outputs = step.run(inputs)
+
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "step": step.name,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "input_hash": input_hash,
+            "params": step.params,
+            "output_hash": outputs.pop("output_hash", input_hash),
+            "files": outputs.pop("files", []),
+        }
+        checkpoint.update(outputs)
+        self._save_checkpoint(step, checkpoint)
+        return checkpoint
+
+
+def _select_steps(steps: list, targets) -> list:
+    """Die Zielschritte (per Name oder Art) und ihre transitiven Abhängigkeiten, in der ursprünglichen Reihenfolge."""
+    by_name = {step.name: step for step in steps}
+    needed = set()
+    pending = [step.name for step in steps if step.name in targets or step.kind in targets]
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(by_name[name].deps)
+    return [step for step in steps if step.name in needed]
+
+
+def prune_run_dirs(runs_dir: str, keep: int):
+    """Löscht bis auf die `keep` neuesten Laufverzeichnisse (Namen sind ISO-Daten) alle älteren."""
+    if not os.path.isdir(runs_dir):
+        return
+    run_dirs = sorted(name for name in os.listdir(runs_dir) if os.path.isdir(os.path.join(runs_dir, name)))
+    for name in run_dirs[:-keep] if keep > 0 else run_dirs:
+        shutil.rmtree(os.path.join(runs_dir, name), ignore_errors=True)
+        logging.info(f"Altes Laufverzeichnis entfernt: {name}")
@@ -0,0 +1,132 @@
+# src/price_matrix.py
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# Zeithorizonte der Kursveränderung: Anzahl Handelstage zurück (None = seit Jahresbeginn)
+HORIZONS = {"1d": 1, "5d": 5, "30d": 30, "ytd": None}
+
+# Handelstage pro Jahr für die annualisierte Volatilität und Fenster (Handelstage) für ihre Berechnung
+TRADING_DAYS_PER_YEAR = 252
+VOLATILITY_WINDOW = 30
+
+# Kennzahlen aller Ticker aus PriceMatrix.compute: Zeile des letzten Kurses, ob es einen gibt,
+# Veränderungen in % je Horizont ({Horizont: Array}) und annualisierte Volatilität in %
+MatrixMetrics = namedtuple("MatrixMetrics", ["last_row", "has_last", "changes", "volatility"])
+
+
+class PriceMatrix:
+    """
+    Kompakte Kursmatrix für viele Ticker: float32-Werte (Ticker x Handelstage, eine
+    zusammenhängende Zeile pro Ticker), ein Datumsindex und ein Tickerindex.
+    Fehlende Kurse sind NaN (z.B. Börsen mit abweichenden Feiertagen).
+    Ausschnitte (`window`) und Kursreihen für Charts (`history`) sind Sichten auf
+    denselben Speicher, keine Kopien.
+    """
+
+    def __init__(self, values: np.ndarray, dates: np.ndarray, tickers: list):
+        self.values = values
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    @classmethod
+    def from_frame(cls, close_data: pd.DataFrame) -> "PriceMatrix":
+        """Aus einer breiten Close-Tabelle (Index: Datum, Spalten: Ticker), wie sie fetch_close_prices liefert."""
+        values = np.ascontiguousarray(close_data.to_numpy(dtype=np.float32).T)
+        dates = pd.to_datetime(close_data.index).to_numpy(dtype="datetime64[ns]")
+        return cls(values, dates, close_data.columns)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def window(self, start: int, stop: int) -> "PriceMatrix":
+        """Sicht auf die Handelstage [start, stop) (Zeilenpositionen im Datumsindex)."""
+        matrix = PriceMatrix.__new__(PriceMatrix)
+        matrix.values = self.values[:, start:stop]
+        matrix.dates = self.dates[start:stop]
+        matrix.tickers = self.tickers
+        matrix.positions = self.positions
+        return matrix
+
+    def history(self, ticker: str, num_days: int) -> pd.Series:
+        """
+        Die letzten `num_days` vorhandenen Kurse des Tickers als Series (Index: Datum).
+        Ohne Lücken im Ausschnitt teilt die Series den Speicher der Matrix (float32);
+        nur bei Lücken wird der Ausschnitt kompakt kopiert.
+        """
+        row = self.values[self.positions[ticker]]
+        valid = np.flatnonzero(~np.isnan(row))
+        if valid.size == 0:
+            return pd.Series(np.empty(0, dtype=np.float32), index=pd.DatetimeIndex([]), copy=False)
+        chosen = valid[-num_days:]
+        if chosen[-1] - chosen[0] + 1 == chosen.size:
+            values, dates = row[chosen[0]:chosen[-1] + 1], self.dates[chosen[0]:chosen[-1] + 1]
+        else:
+            values, dates = row[chosen], self.dates[chosen]
+        return pd.Series(values, index=pd.DatetimeIndex(dates), name=ticker, copy=False)
+
+    def compute(self, horizons=tuple(HORIZONS), volatility_window: int = VOLATILITY_WINDOW) -> MatrixMetrics:
+        """
+        Berechnet in einem vektorisierten Durchlauf über die Matrix für alle Ticker die
+        Veränderung je Horizont und die annualisierte Volatilität der täglichen Log-Renditen.
+        Bezugspunkt eines Horizonts von h Handelstagen ist der letzte vorhandene Kurs
+        h Zeilen vor dem letzten Kurs des Tickers (für "1d" also der vorletzte Kurs);
+        für "ytd" der letzte Kurs des Vorjahres (ohne diesen der erste Kurs des Jahres).
+        """
+        values = self.values
+        num_tickers, num_rows = values.shape
+        valid = ~np.isnan(values)
+        has_last = valid.any(axis=1)
+        last_row = num_rows - 1 - np.argmax(valid[:, ::-1], axis=1)
+
+        # Letzter vorhandener Kurs bis zu jeder Zeile (forward fill über Indizes, ohne Kopie der Werte pro Horizont)
+        filled_index = np.maximum.accumulate(np.where(valid, np.arange(num_rows), -1), axis=1)
+        tickers = np.arange(num_tickers)
+        last_prices = values[tickers, last_row].astype(np.float64)
+
+        def change_from(reference_row):
+            ok = has_last & (reference_row >= 0)
+            source = filled_index[tickers, np.clip(reference_row, 0, max(num_rows - 1, 0))]
+            ok &= source >= 0
+            reference = values[tickers, np.maximum(source, 0)].astype(np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change = (last_prices - reference) / reference * 100
+            change[~ok | ~np.isfinite(change)] = np.nan
+            return change
+
+        changes = {}
+        for horizon in horizons:
+            days = HORIZONS[horizon]
+            if days is not None:
+                changes[horizon] = change_from(last_row - days)
+                continue
+            # Jahresanfang des letzten Kurses je Ticker; Bezug ist die Zeile davor (Vorjahresschluss),
+            # für Ticker ohne Kurs im Vorjahr (z.B. neu gelistet) der erste Kurs des Jahres
+            years = self.dates.astype("datetime64[Y]")
+            year_start = np.searchsorted(self.dates, years[last_row].astype("datetime64[ns]"), side="left")
+            first_valid = np.argmax(valid & (np.arange(num_rows) >= year_start[:, None]), axis=1)
+            has_prior = (year_start > 0) & (filled_index[tickers, np.maximum(year_start - 1, 0)] >= 0)
+            changes[horizon] = change_from(np.where(has_prior, year_start - 1, first_valid))
+
+        # Volatilität: Standardabweichung der Log-Renditen in den `volatility_window` Zeilen bis zum
+        # letzten Kurs des Tickers (wie bei den Horizonten relativ zu last_row, nicht zum Matrixende)
+        window_rows = last_row[:, None] + np.arange(-volatility_window, 1)
+        window = values[tickers[:, None], np.maximum(window_rows, 0)].astype(np.float64)
+        window[window_rows < 0] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_returns = np.diff(np.log(window), axis=1)
+        counts = np.sum(~np.isnan(log_returns), axis=1)
+        volatility = np.full(num_tickers, np.nan)
+        enough = counts >= 2
+        if enough.any():
+            volatility[enough] = np.nanstd(log_returns[enough], axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100
+        return MatrixMetrics(last_row, has_last, changes, volatility)
+
+    def metrics(self, horizons=tuple(HORIZONS)) -> pd.DataFrame:
+        """Kennzahlen aus `compute` als Tabelle (Index: Ticker, Spalten: change_<Horizont>, volatility)."""
+        result = self.compute(horizons)
+        columns = {f"change_{horizon}": change for horizon, change in result.changes.items()}
+        columns["volatility"] = result.volatility
+        return pd.DataFrame(columns, index=pd.Index(self.tickers, name="Ticker"))
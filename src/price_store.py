@@ -0,0 +1,142 @@
+# src/price_store.py
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pandas as pd
+
+# Größte Lücke am Anfang des Zeitraums, die noch als Wochenende/Feiertage gilt
+MAX_LEADING_GAP = timedelta(days=7)
+
+
+class PriceStore:
+    """
+    Persistenter lokaler Speicher für Schlusskurse (SQLite).
+    Jede Zeile ist über (Ticker, Datum) eindeutig, dadurch können neue Tage
+    einfach nachgeladen und eingemischt werden, ohne Bestehendes zu duplizieren.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS close_prices (
+                    ticker TEXT NOT NULL,
+                    date   TEXT NOT NULL,
+                    close  REAL NOT NULL,
+                    PRIMARY KEY (ticker, date)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Verbindung für einen Block: am Ende committet (bei Fehlern zurückgerollt) und geschlossen."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def date_ranges(self, tickers: list) -> dict:
+        """
+        Gibt pro Ticker das Datum der ersten und letzten gespeicherten Zeile zurück
+        (None, falls für den Ticker noch nichts gespeichert ist).
+        """
+        result = {ticker: None for ticker in tickers}
+        if not tickers:
+            return result
+
+        placeholders = ",".join("?" for _ in tickers)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT ticker, MIN(date), MAX(date) FROM close_prices "
+                f"WHERE ticker IN ({placeholders}) GROUP BY ticker",
+                list(tickers),
+            ).fetchall()
+
+        for ticker, first_date, last_date in rows:
+            result[ticker] = (
+                datetime.strptime(first_date, "%Y-%m-%d"),
+                datetime.strptime(last_date, "%Y-%m-%d"),
+            )
+        return result
+
+    def load(self, tickers: list, start_date: datetime = None, end_date: datetime = None) -> pd.DataFrame:
+        """
+        Lädt die Schlusskurse als breite Tabelle (Index: Datum, Spalten: Ticker),
+        im gleichen Format wie `yf.download(...)['Close']`.
+        `end_date` ist wie bei yfinance exklusiv.
+        """
+        if not tickers:
+            return pd.DataFrame()
+
+        placeholders = ",".join("?" for _ in tickers)
+        query = f"SELECT ticker, date, close FROM close_prices WHERE ticker IN ({placeholders})"
+        params = list(tickers)
+        if start_date is not None:
+            query += " AND date >= ?"
+            params.append(start_date.strftime("%Y-%m-%d"))
+        if end_date is not None:
+            query += " AND date < ?"
+            params.append(end_date.strftime("%Y-%m-%d"))
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        if not rows:
+            return pd.DataFrame(columns=list(tickers), dtype=float)
+
+        long_df = pd.DataFrame(rows, columns=["ticker", "date", "close"])
+        long_df["date"] = pd.to_datetime(long_df["date"])
+        wide_df = long_df.pivot(index="date", columns="ticker", values="close").sort_index()
+        wide_df.index.name = "Date"
+        wide_df.columns.name = "Ticker"
+        # Spaltenreihenfolge wie angefragt, fehlende Ticker als leere Spalten
+        return wide_df.reindex(columns=list(tickers))
+
+    def upsert(self, close_data: pd.DataFrame) -> int:
+        """
+        Mischt eine breite Close-Tabelle (Index: Datum, Spalten: Ticker) in den Speicher ein.
+        Vorhandene Einträge für (Ticker, Datum) werden überschrieben.
+        Gibt die Anzahl geschriebener Zeilen zurück.
+        """
+        if close_data is None or close_data.empty:
+            return 0
+
+        long_df = close_data.stack().dropna()
+        rows = [
+            (ticker, pd.Timestamp(date).strftime("%Y-%m-%d"), float(close))
+            for (date, ticker), close in long_df.items()
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO close_prices (ticker, date, close) VALUES (?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def missing_starts(self, tickers: list, start_date: datetime) -> dict:
+        """
+        Ermittelt pro Ticker das Datum, ab dem Daten fehlen: der Tag nach der letzten
+        gespeicherten Zeile. Ticker ohne gespeicherte Daten, mit Daten nur vor `start_date`
+        oder mit einer Lücke am Anfang des Zeitraums (z.B. längeres Chartfenster als bisher)
+        benötigen den gesamten Zeitraum ab `start_date`.
+        """
+        starts = {}
+        for ticker, date_range in self.date_ranges(tickers).items():
+            if date_range is None:
+                starts[ticker] = start_date
+                continue
+            first_date, last_date = date_range
+            if last_date < start_date or first_date > start_date + MAX_LEADING_GAP:
+                starts[ticker] = start_date
+            else:
+                starts[ticker] = last_date + timedelta(days=1)
+        return starts
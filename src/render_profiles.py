@@ -0,0 +1,22 @@
+# src/render_profiles.py
+
+from collections import namedtuple
+
+# Ausgabeformat eines Videos: Name (für settings.ini), Bezeichnung im Dateinamen und Auflösung
+RenderProfile = namedtuple("RenderProfile", ["name", "label", "width", "height"])
+
+# Bekannte Formate; TikTok, YouTube Shorts und Instagram Reels teilen sich 9:16
+RENDER_PROFILES = {
+    "tiktok": RenderProfile("tiktok", "TikTok", 1080, 1920),
+    "instagram-square": RenderProfile("instagram-square", "Instagram-Square", 1080, 1080),
+    "instagram-portrait": RenderProfile("instagram-portrait", "Instagram-Portrait", 1080, 1350),
+}
+
+DEFAULT_PROFILE = "tiktok"
+
+
+def get_profile(name: str) -> RenderProfile:
+    name = name.strip().lower()
+    if name not in RENDER_PROFILES:
+        raise KeyError(f"Unbekanntes Ausgabeformat: {name}. Verfügbar: {', '.join(RENDER_PROFILES)}")
+    return RENDER_PROFILES[name]
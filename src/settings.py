@@ -0,0 +1,91 @@
+# src/settings.py
+
+import configparser
+import logging
+import os
+import sys
+from datetime import datetime
+from render_profiles import DEFAULT_PROFILE, get_profile
+
+# --- Konfiguration ---
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__)) # src-Ordner
+PROJECT_ROOT = os.path.dirname(PROJECT_ROOT) # Eine Ebene höher zum Projekt-Root
+
+CHARTS_DIR = os.path.join(PROJECT_ROOT, "charts")
+VIDEOS_DIR = os.path.join(PROJECT_ROOT, "videos")
+MUSIC_DIR = os.path.join(PROJECT_ROOT, "music")
+LOGS_DIR = os.path.join(PROJECT_ROOT, "logs")
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+CHART_CACHE_DIR = os.path.join(PROJECT_ROOT, "cache", "charts") # Gerenderte Chart-Frames (inhaltsadressiert)
+AUDIO_CACHE_DIR = os.path.join(PROJECT_ROOT, "cache", "audio") # Aufbereitete Musik (AAC, pro Videolänge)
+RUNS_DIR = os.path.join(PROJECT_ROOT, "runs") # Checkpoints und Zwischenergebnisse pro Handelstag
+
+PRICE_STORE_FILE = os.path.join(DATA_DIR, "prices.sqlite") # Lokaler Kursspeicher (Ticker, Datum)
+BACKGROUND_MUSIC_FILE = os.path.join(MUSIC_DIR, "background_music.mp3")
+VIDEO_DURATION_PER_CHART = 2 # Sekunden pro Chart
+CHART_DEBUG_OUTPUT = False # Chart-Frames zusätzlich als PNG in CHARTS_DIR speichern
+CHART_ANIMATION = True # Kurslinie im Video animiert zeichnen statt Standbild
+VIDEO_OVERLAYS = True # Ticker und Veränderung als Text-Overlay über jedem Chart
+CHART_WORKERS = None # Prozesse für das Chart-Rendering (None = Anzahl CPU-Kerne)
+VIDEO_STREAMING = True # Charts rendern und Videos kodieren überlappend (chart_stream) statt nacheinander
+MOVER_INDICES = ("DAX",) # Indizes aus der Universe-Registry, für die ein Video erstellt wird
+NUM_MOVERS = 5 # Gewinner bzw. Verlierer pro Index
+CHART_DAYS = 30 # Handelstage pro Chart
+MOVER_HORIZON = "1d" # Zeitraum der Veränderung: "1d" (Vortag), "5d" (Woche), "30d" (Monat) oder "ytd"
+RUN_DIRS_KEEP = 14 # Anzahl der Laufverzeichnisse (Handelstage), die aufbewahrt werden
+RUN_RECORD_FILE = os.path.join(LOGS_DIR, "run_records.jsonl") # Messwerte pro Schritt (eine JSON-Zeile pro Schritt)
+PROMETHEUS_TEXTFILE = None # z.B. "/var/lib/node_exporter/textfile_collector/topmover.prom" (None = deaktiviert)
+
+SETTINGS_FILE = os.path.join(PROJECT_ROOT, "config", "settings.ini")
+
+# Standardwerte, falls settings.ini fehlt oder einen Eintrag nicht enthält
+DEFAULTS = {
+    "chart": {
+        "engine": "matplotlib",
+    },
+    "video": {
+        "profiles": DEFAULT_PROFILE,
+    },
+}
+
+_settings = None
+
+
+def load_settings(path: str = SETTINGS_FILE) -> configparser.ConfigParser:
+    """Liest config/settings.ini (einmalig) und ergänzt fehlende Einträge mit den Standardwerten."""
+    global _settings
+    if _settings is None or path != SETTINGS_FILE:
+        parser = configparser.ConfigParser()
+        parser.read_dict(DEFAULTS)
+        parser.read(path, encoding="utf-8")
+        if path != SETTINGS_FILE:
+            return parser
+        _settings = parser
+    return _settings
+
+
+def get_chart_engine() -> str:
+    return load_settings().get("chart", "engine").strip().lower()
+
+
+def get_video_profiles() -> list:
+    """Ausgabeformate aus settings.ini (kommagetrennt), als Liste von RenderProfile."""
+    names = [name.strip().lower() for name in load_settings().get("video", "profiles").split(",") if name.strip()]
+    return [get_profile(name) for name in dict.fromkeys(names)]
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Logging in die Tages-Logdatei und auf die Konsole. Wird von den Einstiegspunkten
+    (cli.py, main.py, backfill.py) aufgerufen, nicht beim Import eines Moduls.
+    """
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    log_filename = os.path.join(LOGS_DIR, f"daily_tiktok_generation_{datetime.now().strftime('%Y-%m-%d')}.log")
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_filename),
+            logging.StreamHandler(sys.stdout) # Auch auf Konsole ausgeben
+        ]
+    )
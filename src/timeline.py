@@ -0,0 +1,64 @@
+# src/timeline.py
+
+import numpy as np
+
+
+class Segment:
+    """
+    Ein Abschnitt der Video-Timeline mit fester Länge in Frames.
+    Entweder ein Standbild (`image`), das nur einmal an den Encoder übergeben wird,
+    oder eine Folge von Frames (`frames`, z.B. ein Generator für Animationen),
+    die Frame für Frame geschrieben wird.
+    Ein verzögertes Standbild (`resolve`) entsteht erst, wenn der Encoder das Segment
+    schreibt; so steht die Timeline fest, bevor alle Charts gerendert sind.
+    """
+
+    def __init__(self, num_frames: int, image: np.ndarray = None, frames=None, label: str = "", resolve=None):
+        if sum(source is not None for source in (image, frames, resolve)) != 1:
+            raise ValueError("Ein Segment benötigt entweder ein Standbild, eine Frame-Folge oder eine Funktion, "
+                             "die das Standbild liefert.")
+        self.num_frames = int(num_frames)
+        self._image = image
+        self._resolve = resolve
+        self._still = frames is None
+        self.frames = frames
+        self.label = label
+
+    @classmethod
+    def still(cls, image: np.ndarray, num_frames: int, label: str = ""):
+        return cls(num_frames, image=image, label=label)
+
+    @classmethod
+    def generated(cls, frames, num_frames: int, label: str = ""):
+        return cls(num_frames, frames=frames, label=label)
+
+    @classmethod
+    def deferred(cls, resolve, num_frames: int, label: str = ""):
+        """Standbild, das `resolve()` beim ersten Zugriff auf `image` liefert."""
+        return cls(num_frames, resolve=resolve, label=label)
+
+    @property
+    def image(self) -> np.ndarray:
+        if self._image is None and self._resolve is not None:
+            self._image, self._resolve = self._resolve(), None
+        return self._image
+
+    @property
+    def is_still(self) -> bool:
+        return self._still
+
+    def release(self):
+        """Gibt Bild und Frame-Folge frei, nachdem das Segment kodiert ist."""
+        self._image = self._resolve = self.frames = None
+
+    def __repr__(self):
+        kind = "still" if self.is_still else "generated"
+        return f"Segment({kind}, {self.num_frames} Frames, {self.label!r})"
+
+
+def seconds_to_frames(seconds: float, fps: int) -> int:
+    return int(seconds * fps)
+
+
+def total_frames(segments: list) -> int:
+    return sum(segment.num_frames for segment in segments if segment.num_frames > 0)
@@ -0,0 +1,94 @@
+# src/trading_calendar.py
+
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+# Handelszeiten XETRA (Frankfurter Ortszeit)
+XETRA_TIMEZONE = ZoneInfo("Europe/Berlin")
+XETRA_CLOSE = time(17, 30)
+
+# Verzögerung, bis die Tagesdaten nach Handelsschluss beim Datenanbieter (yfinance) vorliegen
+DATA_DELAY = timedelta(minutes=30)
+
+
+def easter_sunday(year: int) -> date:
+    """Ostersonntag im gregorianischen Kalender (Gaußsche Osterformel, anonymer Algorithmus)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=None)
+def xetra_holidays(year: int) -> frozenset:
+    """
+    Handelsfreie Tage an XETRA außer Wochenenden: Neujahr, Karfreitag, Ostermontag,
+    1. Mai, Heiligabend, 1. und 2. Weihnachtstag und Silvester.
+    """
+    easter = easter_sunday(year)
+    return frozenset({
+        date(year, 1, 1),
+        easter - timedelta(days=2),
+        easter + timedelta(days=1),
+        date(year, 5, 1),
+        date(year, 12, 24),
+        date(year, 12, 25),
+        date(year, 12, 26),
+        date(year, 12, 31),
+    })
+
+
+def _as_date(day) -> date:
+    return day.date() if isinstance(day, datetime) else day
+
+
+def is_trading_day(day) -> bool:
+    """Ist an diesem Tag (date oder datetime) an XETRA Handel?"""
+    day = _as_date(day)
+    return day.weekday() < 5 and day not in xetra_holidays(day.year)
+
+
+def previous_trading_day(as_of) -> datetime:
+    """Letzter Handelstag vor `as_of` (Wochenenden und XETRA-Feiertage übersprungen), als Mitternacht."""
+    day = _as_date(as_of) - timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return datetime.combine(day, time())
+
+
+def next_trading_day(as_of) -> datetime:
+    """Nächster Handelstag nach `as_of`, als Mitternacht."""
+    day = _as_date(as_of) + timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return datetime.combine(day, time())
+
+
+def data_available_at(day) -> datetime:
+    """Zeitpunkt (mit Zeitzone), ab dem die Schlusskurse des Handelstags abrufbar sind."""
+    return datetime.combine(_as_date(day), XETRA_CLOSE, tzinfo=XETRA_TIMEZONE) + DATA_DELAY
+
+
+def last_available_session(now: datetime = None) -> datetime:
+    """Letzter Handelstag, dessen Schlusskurse zum Zeitpunkt `now` (Standard: jetzt) vorliegen."""
+    now = now.astimezone(XETRA_TIMEZONE) if now is not None else datetime.now(XETRA_TIMEZONE)
+    day = now.date()
+    if not (is_trading_day(day) and now >= data_available_at(day)):
+        return previous_trading_day(day)
+    return datetime.combine(day, time())
+
+
+def next_session_available(now: datetime = None) -> datetime:
+    """Nächster Zeitpunkt nach `now`, zu dem die Schlusskurse eines Handelstags vorliegen."""
+    now = now.astimezone(XETRA_TIMEZONE) if now is not None else datetime.now(XETRA_TIMEZONE)
+    day = now.date()
+    if is_trading_day(day) and now < data_available_at(day):
+        return data_available_at(day)
+    return data_available_at(next_trading_day(day))
@@ -0,0 +1,102 @@
+# src/universe.py
+
+import csv
+import os
+
+# Verzeichnis mit zusätzlichen Index-Mitgliedslisten (eine CSV-Datei pro Index)
+UNIVERSES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "universes")
+
+# Aktuelle DAX 40 Ticker-Symbole mit Unternehmensnamen (Stand Juli 2025)
+# Quelle: Deutsche Börse / Finanzportale. `.DE` für XETRA-Handel bei Yahoo Finance.
+DAX_MEMBERS = [
+    ("ADS.DE", "Adidas"), ("AIR.DE", "Airbus"), ("ALV.DE", "Allianz"), ("BAS.DE", "BASF"),
+    ("BAYN.DE", "Bayer"), ("BEI.DE", "Beiersdorf"), ("BMW.DE", "BMW"), ("BNR.DE", "Brenntag"),
+    ("CON.DE", "Continental"), ("1COV.DE", "Covestro"), ("DB1.DE", "Deutsche Börse"), ("DBK.DE", "Deutsche Bank"),
+    ("DTG.DE", "Daimler Truck"), ("DTE.DE", "Deutsche Telekom"), ("DHL.DE", "DHL Group"), ("EOAN.DE", "E.ON"),
+    ("ENR.DE", "Siemens Energy"), ("FRE.DE", "Fresenius"), ("FME.DE", "Fresenius Medical Care"), ("HEI.DE", "Heidelberg Materials"),
+    ("HEN3.DE", "Henkel"), ("IFX.DE", "Infineon"), ("JEN.DE", "Jenoptik"), ("LIN.DE", "Linde"),
+    ("LHA.DE", "Lufthansa"), ("MBG.DE", "Mercedes-Benz"), ("MRK.DE", "Merck"), ("MTX.DE", "MTU Aero Engines"),
+    ("MUV2.DE", "Munich Re"), ("P911.DE", "Porsche AG"), ("PAH3.DE", "Porsche SE"), ("PUM.DE", "Puma"),
+    ("QIA.DE", "Qiagen"), ("RHM.DE", "Rheinmetall"), ("RWE.DE", "RWE"), ("SAP.DE", "SAP"),
+    ("SIE.DE", "Siemens"), ("SRT3.DE", "Sartorius"), ("SY1.DE", "Symrise"), ("VOW3.DE", "Volkswagen"),
+    ("VNA.DE", "Vonovia"), ("ZAL.DE", "Zalando"),
+]
+
+
+class Universe:
+    """
+    Registry aller Indizes und ihrer Mitglieder samt Unternehmensnamen.
+    Ein Ticker kann in mehreren Indizes enthalten sein (z.B. DAX und TecDAX),
+    wird für Downloads und Berechnungen aber nur einmal geführt.
+    """
+
+    def __init__(self):
+        self._members = {}
+        self._names = {}
+
+    def register_index(self, index: str, members: list):
+        """Registriert einen Index. `members` ist eine Liste von (Ticker, Name)-Paaren."""
+        tickers = []
+        for ticker, name in members:
+            tickers.append(ticker)
+            if name:
+                self._names[ticker] = name
+        self._members[index] = tickers
+
+    def load_csv(self, index: str, path: str):
+        """
+        Lädt die Mitglieder eines Index aus einer CSV-Datei mit den Spalten
+        `ticker` und optional `name`.
+        """
+        with open(path, newline="", encoding="utf-8") as f:
+            members = [(row["ticker"].strip(), (row.get("name") or "").strip())
+                       for row in csv.DictReader(f) if row.get("ticker")]
+        self.register_index(index, members)
+
+    def load_directory(self, directory: str):
+        """Lädt alle `<INDEX>.csv` Dateien eines Verzeichnisses (Dateiname = Indexname)."""
+        if not os.path.isdir(directory):
+            return
+        for filename in sorted(os.listdir(directory)):
+            index, ext = os.path.splitext(filename)
+            if ext.lower() == ".csv":
+                self.load_csv(index, os.path.join(directory, filename))
+
+    def indices(self) -> list:
+        return list(self._members)
+
+    def members(self, index: str) -> list:
+        if index not in self._members:
+            raise KeyError(f"Unbekannter Index: {index}. Verfügbar: {', '.join(self._members)}")
+        return list(self._members[index])
+
+    def tickers(self, indices: list = None) -> list:
+        """Alle Ticker der angegebenen Indizes, ohne Duplikate und in stabiler Reihenfolge."""
+        if indices is None:
+            indices = self.indices()
+        unique = {}
+        for index in indices:
+            for ticker in self.members(index):
+                unique.setdefault(ticker, None)
+        return list(unique)
+
+    def name(self, ticker: str) -> str:
+        """Unternehmensname zum Ticker (Fallback: der Ticker selbst)."""
+        return self._names.get(ticker, ticker)
+
+
+_default_universe = None
+
+
+def default_universe() -> Universe:
+    """
+    Standard-Registry: DAX fest eingebaut, weitere Indizes (MDAX, SDAX, TecDAX, SP500, ...)
+    als CSV-Dateien in config/universes/.
+    """
+    global _default_universe
+    if _default_universe is None:
+        universe = Universe()
+        universe.register_index("DAX", DAX_MEMBERS)
+        universe.load_directory(UNIVERSES_DIR)
+        _default_universe = universe
+    return _default_universe
@@ -0,0 +1,266 @@
+# src/video_encoder.py
+
+import logging
+import os
+import subprocess
+import tempfile
+import numpy as np
+from timeline import total_frames
+from instrumentation import Measurement, active_recorder, stage
+
+# Standard-Einstellungen für H.264 (TikTok/Shorts/Reels akzeptieren yuv420p mit faststart)
+DEFAULT_PRESET = "veryfast"
+DEFAULT_CRF = 23
+DEFAULT_AUDIO_BITRATE = "192k"
+
+
+class FFmpegEncoder:
+    """
+    Streamt BGR-Frames (numpy, uint8) über stdin in einen einzigen FFmpeg-Prozess,
+    der direkt H.264 kodiert und die Hintergrundmusik im selben Durchlauf als AAC einmischt.
+    Mit `audio_copy` ist die Musik bereits passend kodiert (siehe audio_cache.AudioCache)
+    und wird nur kopiert. FFmpeg läuft parallel zur Frame-Erzeugung; es entsteht keine Zwischendatei.
+
+    Verwendung:
+        with FFmpegEncoder(path, 1080, 1920, 24, audio_path=music) as encoder:
+            encoder.write(frame)
+    """
+
+    def __init__(self, output_filepath: str, width: int, height: int, fps: int,
+                 audio_path: str = None, preset: str = DEFAULT_PRESET, crf: int = DEFAULT_CRF,
+                 audio_bitrate: str = DEFAULT_AUDIO_BITRATE, audio_copy: bool = False, ffmpeg_binary: str = "ffmpeg"):
+        self.output_filepath = output_filepath
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.audio_path = audio_path
+        self.preset = preset
+        self.crf = crf
+        self.audio_bitrate = audio_bitrate
+        self.audio_copy = audio_copy
+        self.ffmpeg_binary = ffmpeg_binary
+        self.frames_written = 0
+        self._process = None
+        self._stderr_file = None
+        self._measurement = None
+
+    def build_command(self) -> list:
+        command = [
+            self.ffmpeg_binary, '-hide_banner', '-loglevel', 'error',
+            # Eingabe 0: Rohframes aus stdin
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{self.width}x{self.height}', '-framerate', str(self.fps),
+            '-i', 'pipe:0',
+        ]
+        if self.audio_path:
+            # Eingabe 1: Hintergrundmusik
+            command += ['-i', self.audio_path]
+
+        command += self.video_filter_args()
+        command += [
+            '-map', '0:v:0',
+            '-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf),
+            '-pix_fmt', 'yuv420p', '-r', str(self.fps),
+        ]
+        if self.audio_path and self.audio_copy:
+            # Spur hat bereits Zielformat und Videolänge
+            command += ['-map', '1:a:0', '-c:a', 'copy']
+        elif self.audio_path:
+            command += [
+                '-map', '1:a:0',
+                '-c:a', 'aac', '-b:a', self.audio_bitrate,
+                '-shortest',     # Beendet das Video, wenn die kürzere Spur endet
+            ]
+        command += [
+            '-movflags', '+faststart', # Metadaten an den Anfang für schnelles Abspielen
+            '-y',                      # Überschreibt Ausgabedatei ohne Nachfrage
+            self.output_filepath,
+        ]
+        return command
+
+    def video_filter_args(self) -> list:
+        """Zusätzliche Filter-Argumente für den Videostrom (in Unterklassen erweiterbar)."""
+        return []
+
+    def open(self):
+        command = self.build_command()
+        logging.info(f"Starte FFmpeg-Encoder: {' '.join(command)}")
+        # stderr in eine Datei, damit eine volle Pipe FFmpeg nicht blockieren kann
+        self._stderr_file = tempfile.TemporaryFile()
+        self._measurement = Measurement()
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL, stderr=self._stderr_file)
+        return self
+
+    def write(self, frame: np.ndarray):
+        """Schreibt einen BGR-Frame (height x width x 3, uint8) ohne zusätzliche Kopie in die Pipe."""
+        if frame.shape != (self.height, self.width, 3) or frame.dtype != np.uint8:
+            raise ValueError(f"Frame hat Form {frame.shape}/{frame.dtype}, erwartet ({self.height}, {self.width}, 3)/uint8")
+        try:
+            self._process.stdin.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        except BrokenPipeError:
+            # FFmpeg hat sich beendet, der Fehler wird in close() mit stderr gemeldet
+            self.close()
+            raise
+        self.frames_written += 1
+
+    def close(self):
+        """Beendet die Eingabe, wartet auf FFmpeg und wirft CalledProcessError bei einem Fehler."""
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = process.wait()
+        self._record_ffmpeg(returncode)
+
+        self._stderr_file.seek(0)
+        stderr = self._stderr_file.read().decode(errors="replace")
+        self._stderr_file.close()
+        if stderr:
+            logging.info(f"FFmpeg stderr: {stderr}")
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, process.args, stderr=stderr)
+        logging.info(f"FFmpeg-Encoder beendet: {self.frames_written} Eingabeframes, "
+                     f"{os.path.getsize(self.output_filepath)} Bytes -> {self.output_filepath}")
+
+    def _record_ffmpeg(self, returncode: int):
+        """Meldet Laufzeit und Ressourcen des FFmpeg-Prozesses (open bis Prozessende) an den aktiven RunRecorder."""
+        recorder = active_recorder()
+        if recorder is None or self._measurement is None:
+            return
+        metrics = self._measurement.finish()
+        metrics.update(input_frames=self.frames_written, returncode=returncode,
+                       output_bytes=os.path.getsize(self.output_filepath) if os.path.exists(self.output_filepath) else None)
+        recorder.add_record(recorder.child_name("ffmpeg"), metrics, status="ok" if returncode == 0 else "error",
+                            **recorder.current_labels())
+
+    def abort(self):
+        """Bricht die Kodierung ab (z.B. nach einem Fehler bei der Frame-Erzeugung)."""
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        process.kill()
+        process.wait()
+        self._stderr_file.close()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class TimelineEncoder(FFmpegEncoder):
+    """
+    Kodiert eine Timeline aus Segmenten (siehe timeline.Segment).
+    Standbilder werden nur einmal in die Pipe geschrieben; FFmpeg setzt über `setpts`
+    den Zeitstempel des nächsten Frames an den Segmentanfang und füllt die Lücke
+    mit dem `fps`-Filter durch Frame-Duplikate. Aufwand in Python und Pipe-Verkehr
+    hängen damit von der Anzahl der Segmente ab, nicht von der Anzahl der Frames.
+    """
+
+    def __init__(self, output_filepath: str, width: int, height: int, fps: int, segments: list, **kwargs):
+        super().__init__(output_filepath, width, height, fps, **kwargs)
+        self.segments = [segment for segment in segments if segment.num_frames > 0]
+        self.total_frames = total_frames(self.segments)
+
+    def _pts_expression(self) -> str:
+        """
+        Zeitstempel-Ausdruck für `setpts`: Eingabeframe N landet an Position
+        N + (Summe der übersprungenen Duplikate aller vorherigen Standbilder).
+        """
+        terms = ["N"]
+        input_index = 0
+        for segment in self.segments:
+            if segment.is_still:
+                if segment.num_frames > 1:
+                    terms.append(f"{segment.num_frames - 1}*gte(N,{input_index + 1})")
+                input_index += 1
+            else:
+                input_index += segment.num_frames
+        return f"({'+'.join(terms)})/(FRAME_RATE*TB)"
+
+    def video_filter_args(self) -> list:
+        last_segment_frames = self.segments[-1].num_frames if self.segments else 0
+        filters = [
+            f"setpts='{self._pts_expression()}'",
+            f"fps={self.fps}",
+            # Letztes Standbild sicher bis zum Ende halten, -frames:v schneidet exakt ab
+            f"tpad=stop_mode=clone:stop={last_segment_frames}",
+        ]
+        return ['-vf', ",".join(filters), '-frames:v', str(self.total_frames)]
+
+    def encode(self):
+        """Schreibt alle Segmente in den laufenden Encoder."""
+        for segment in self.segments:
+            frames_before = self.frames_written
+            with stage("segment", segment=segment.label) as extra:
+                self._encode_segment(segment)
+                extra.update(input_frames=self.frames_written - frames_before, output_frames=segment.num_frames,
+                             pipe_bytes=(self.frames_written - frames_before) * self.width * self.height * 3)
+            # Bilder geschriebener Segmente nicht bis zum Videoende im Speicher halten
+            segment.release()
+
+    def _encode_segment(self, segment):
+        """Schreibt ein Segment: Standbilder einmal, generierte Segmente Frame für Frame."""
+        if segment.is_still:
+            self.write(segment.image)
+            return
+
+        written = 0
+        last_frame = None
+        for frame in segment.frames:
+            if written == segment.num_frames:
+                logging.warning(f"Segment {segment.label!r} liefert mehr als {segment.num_frames} Frames, Rest wird verworfen.")
+                break
+            self.write(frame)
+            last_frame = frame
+            written += 1
+
+        # Fehlende Frames auffüllen, damit die Zeitstempel der Folgesegmente stimmen
+        if written < segment.num_frames:
+            logging.warning(f"Segment {segment.label!r} liefert nur {written} von {segment.num_frames} Frames, wird aufgefüllt.")
+            filler = last_frame if last_frame is not None else np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            for _ in range(segment.num_frames - written):
+                self.write(filler)
+
+
+def mux_audio(video_path: str, audio_path: str, output_filepath: str, audio_bitrate: str = DEFAULT_AUDIO_BITRATE,
+              ffmpeg_binary: str = "ffmpeg", copy_audio: bool = False):
+    """
+    Mischt die Hintergrundmusik in ein bereits kodiertes Video, ohne das Bild neu zu kodieren
+    (`-c:v copy`). Mit `copy_audio` ist die Musik bereits als AAC in Videolänge aufbereitet
+    (siehe audio_cache.AudioCache) und wird ebenfalls nur kopiert, sonst als AAC kodiert
+    und mit `-shortest` gekürzt. Die Ausgabe wird zuerst in eine temporäre Datei geschrieben
+    und dann umbenannt, damit nie ein halbfertiges Video unter dem Zielnamen liegt.
+    """
+    root, ext = os.path.splitext(output_filepath)
+    tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+    command = [
+        ffmpeg_binary, '-hide_banner', '-loglevel', 'error',
+        '-i', video_path, '-i', audio_path,
+        '-map', '0:v:0', '-map', '1:a:0', '-c:v', 'copy',
+        *(['-c:a', 'copy'] if copy_audio else ['-c:a', 'aac', '-b:a', audio_bitrate, '-shortest']),
+        '-movflags', '+faststart', '-y', tmp_path,
+    ]
+    logging.info(f"Starte FFmpeg-Mux: {' '.join(command)}")
+    measurement = Measurement()
+    try:
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    finally:
+        recorder = active_recorder()
+        if recorder is not None:
+            recorder.add_record(recorder.child_name("ffmpeg"), measurement.finish(), **recorder.current_labels())
+    if result.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise subprocess.CalledProcessError(result.returncode, command, stderr=result.stderr)
+    os.replace(tmp_path, output_filepath)
+    logging.info(f"FFmpeg-Mux beendet: {os.path.getsize(output_filepath)} Bytes -> {output_filepath}")
@@ -6,6 +6,14 @@ import os
 import logging
 from datetime import datetime
 import subprocess # Für FFmpeg Aufrufe
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from timeline import Segment, seconds_to_frames, total_frames
+from chart_animation import LineDrawAnimation
+from chart_cache import load_chart_file
+from overlay import Compositor, centered, get_layer_cache
+from video_encoder import TimelineEncoder
+from instrumentation import Measurement, active_recorder, stage
 
 # --- Konfiguration ---
 # Video-Dimensionen für TikTok (Hochformat)
@@ -13,6 +21,25 @@ VIDEO_WIDTH = 1080
 VIDEO_HEIGHT = 1920
 FPS = 24 # Bilder pro Sekunde für das Ausgabevideo
 
+# H.264-Einstellungen für FFmpeg (Preset: Geschwindigkeit vs. Kompression, CRF: Qualität, kleiner = besser)
+ENCODER_PRESET = "veryfast"
+ENCODER_CRF = 23
+
+# Anteil der Chart-Dauer, in dem sich die Kurslinie zeichnet (danach Standbild)
+LINE_DRAW_FRACTION = 0.75
+
+# Dauer von Intro und Outro in Sekunden
+INTRO_DURATION = 2
+OUTRO_DURATION = 3
+
+# Überblendung zwischen Intro, Charts und Outro in Sekunden (0 = harter Schnitt);
+# sie geht von der Anzeigedauer des folgenden Abschnitts ab, die Videolänge bleibt gleich
+CROSSFADE_DURATION = 0.3
+
+# Vertikale Position (Mitte) der Overlays Ticker und Veränderung, als Anteil der Videohöhe
+OVERLAY_TICKER_Y = 0.1
+OVERLAY_CHANGE_Y = 0.25
+
 # Schriftart und -größe für OpenCV-Text
 FONT = cv2.FONT_HERSHEY_SIMPLEX
 FONT_SCALE_TITLE = 3.0
@@ -25,38 +52,233 @@ BLACK = (0, 0, 0)
 GREEN = (0, 255, 0) # BGR
 RED = (0, 0, 255)   # BGR
 
+# Auftrag für create_videos_parallel: Zieldatei, gespeicherte Chart-Dateien (siehe chart_cache.load_chart_file;
+# None bei chart_stream.create_videos_streaming, dort kommen die Charts aus dem Prozess-Pool),
+# Auflösung (Breite, Höhe), Anzeigedauer pro Chart, Datum im Intro, Indexname, Musik (oder None)
+# und die Overlays (Ticker, Veränderung in %) pro Chart-Datei (oder None für Charts ohne Overlay)
+VideoJob = namedtuple("VideoJob", ["output_filepath", "chart_files", "frame_size", "chart_display_duration",
+                                   "video_date", "index_name", "background_music_path", "chart_overlays"],
+                      defaults=(None,))
+
+# Ergebnis eines Video-Auftrags: Zieldatei, Fehlermeldung (oder None) und Messwerte aus dem Worker-Prozess
+VideoResult = namedtuple("VideoResult", ["output_filepath", "error", "metrics"])
+
+# Chart, der erst während der Kodierung vorliegt (siehe chart_stream.ChartStream): `resolve()` wartet auf
+# den BGR-Frame bzw. die LineDrawAnimation (`animated`) und liefert None, wenn der Chart fehlgeschlagen ist
+DeferredChart = namedtuple("DeferredChart", ["resolve", "animated"])
+
+def _load_chart_frame(chart_source, width: int = VIDEO_WIDTH, height: int = VIDEO_HEIGHT):
+    """
+    Liefert einen Chart als BGR-Frame in Videoauflösung.
+    Frames aus dem Speicher werden direkt verwendet, Bilddateien geladen und skaliert.
+    """
+    if isinstance(chart_source, np.ndarray):
+        if chart_source.shape[:2] == (height, width):
+            return chart_source
+        logging.warning(f"Chart-Frame hat {chart_source.shape[1]}x{chart_source.shape[0]} statt {width}x{height}, wird skaliert.")
+        return cv2.resize(chart_source, (width, height))
+
+    logging.info(f"Verarbeite Chart: {chart_source}")
+    # Bild laden
+    chart_image = cv2.imread(chart_source)
+    if chart_image is None:
+        logging.error(f"Fehler: Bild konnte nicht geladen werden von {chart_source}. Überspringe.")
+        return None
+
+    # Bild auf Video-Dimensionen anpassen (resizen)
+    return cv2.resize(chart_image, (width, height))
+
 def create_tiktok_video(
-    chart_image_paths: list,
+    chart_image_paths: list, # PNG-Dateien der Charts (optional, wenn chart_frames übergeben wird)
     output_filepath: str,
     background_music_path: str,
     chart_display_duration: int,
-    movers_info: dict # Dictionary: {ticker: {'change': float, 'type': 'gainer'/'loser'}}
+    movers_info: dict, # Dictionary: {ticker: {'change': float, 'type': 'gainer'/'loser'}}
+    video_date: datetime = None, # Datum im Intro (Standard: heute)
+    index_name: str = "DAX", # Indexname für Intro und Outro
+    chart_frames: list = None, # BGR-Frames (numpy) oder LineDrawAnimation in Videoauflösung, ersetzt chart_image_paths
+    frame_size: tuple = None, # Videoauflösung (Breite, Höhe), Standard: VIDEO_WIDTH x VIDEO_HEIGHT
+    chart_overlays: list = None, # (Ticker, Veränderung in %) pro Chart für die Text-Overlays, ersetzt movers_info
+    audio_cache = None # audio_cache.AudioCache: Musik aufbereitet aus dem Cache kopieren statt neu kodieren
 ):
     """
     Erstellt ein TikTok-kompatibles Video aus einer Liste von Chart-Bildern,
     fügt Text-Overlays hinzu und integriert Hintergrundmusik.
-    Verwendet OpenCV für die Videogenerierung und subprocess für FFmpeg-Audio-Merging.
+    Die Charts können als fertige BGR-Frames im Speicher (chart_frames) oder
+    als Bilddateien (chart_image_paths) übergeben werden. Für eine LineDrawAnimation
+    zeichnet sich die Kurslinie während LINE_DRAW_FRACTION der Anzeigedauer.
+    Ticker und Veränderung werden über jeden Chart gelegt, wenn `chart_overlays`
+    oder (für Bilddateien "<Ticker>_...png") `movers_info` angegeben ist;
+    zwischen den Abschnitten wird CROSSFADE_DURATION lang übergeblendet.
+    Die Frames werden direkt in einen FFmpeg-Prozess gestreamt, der H.264 kodiert
+    und die Musik im selben Durchlauf einmischt (mit `audio_cache` als fertige,
+    auf die Videolänge gekürzte und ausgeblendete AAC-Spur, die nur kopiert wird).
     """
-    logging.info(f"Starte Videogenerierung mit OpenCV. Anzahl Charts: {len(chart_image_paths)}")
+    if chart_frames is not None:
+        chart_sources = list(chart_frames)
+    else:
+        chart_sources = list(chart_image_paths or [])
+        if chart_overlays is None and movers_info:
+            # Ticker aus Dateipfad extrahieren (z.B. "BAS_30_day_chart.png" -> "BAS")
+            tickers = [os.path.basename(path).split('_')[0] for path in chart_sources]
+            chart_overlays = [(ticker, movers_info.get(ticker, {}).get('change', 0.0)) for ticker in tickers]
+    if video_date is None:
+        video_date = datetime.now()
+    width, height = frame_size or (VIDEO_WIDTH, VIDEO_HEIGHT)
+
+    logging.info(f"Starte Videogenerierung mit FFmpeg. Anzahl Charts: {len(chart_sources)}")
+
+    # Hintergrundmusik wird im selben FFmpeg-Durchlauf eingemischt
+    audio_path = background_music_path
+    if background_music_path is None:
+        logging.info("Video wird ohne Musik kodiert.")
+    elif not os.path.exists(background_music_path):
+        logging.error(f"Hintergrundmusikdatei nicht gefunden: {background_music_path}")
+        logging.warning("Video wird ohne Musik erstellt.")
+        audio_path = None
+    else:
+        logging.info(f"Füge Hintergrundmusik '{os.path.basename(background_music_path)}' hinzu...")
 
-    # Temporäre Datei für Video ohne Audio
-    temp_video_filepath = output_filepath.replace(".mp4", "_no_audio.mp4")
+    with stage("timeline"):
+        segments = build_timeline(chart_sources, chart_display_duration, video_date, index_name, width, height,
+                                  chart_overlays)
 
-    # VideoWriter initialisieren
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v') # Codec für .mp4
-    out = cv2.VideoWriter(temp_video_filepath, fourcc, FPS, (VIDEO_WIDTH, VIDEO_HEIGHT))
+    if audio_path and audio_cache is not None:
+        with stage("audio"):
+            audio_path = audio_cache.variant(audio_path, total_frames(segments) / FPS)
+
+    with stage("encode"):
+        out = TimelineEncoder(output_filepath, width, height, FPS, segments, audio_path=audio_path,
+                              preset=ENCODER_PRESET, crf=ENCODER_CRF, audio_copy=audio_cache is not None).open()
+        try:
+            out.encode()
+        except Exception:
+            out.abort()
+            raise
+
+        try:
+            out.close() # Encoder schließen, FFmpeg schreibt die fertige Datei
+        except subprocess.CalledProcessError as e:
+            logging.error(f"FFmpeg-Fehler bei der Videokodierung: {e}")
+            logging.error(f"FFmpeg stderr: {e.stderr}")
+            raise
+
+    if audio_path:
+        logging.info(f"Hintergrundmusik '{os.path.basename(background_music_path)}' erfolgreich hinzugefügt.")
+    logging.info(f"Video-Export abgeschlossen: {output_filepath}")
+
+def video_duration(num_charts: int, chart_display_duration) -> float:
+    """Länge des Videos in Sekunden (Intro, Charts, Outro; Überblendungen verlängern nicht)."""
+    num_frames = (seconds_to_frames(INTRO_DURATION, FPS) + num_charts * seconds_to_frames(chart_display_duration, FPS)
+                  + seconds_to_frames(OUTRO_DURATION, FPS))
+    return num_frames / FPS
+
+def _overlay_layers(ticker: str, percentage_change: float, width: int, height: int) -> list:
+    """
+    Overlay-Ebenen eines Charts: Ticker (oben zentriert) und prozentuale Veränderung darunter.
+    Die Texte werden über den LayerCache nur einmal pro Prozess gerastert.
+    """
+    cache = get_layer_cache()
+    scale = width / VIDEO_WIDTH
+    ticker_name = ticker.split('.')[0]
+    text_color = GREEN if percentage_change >= 0 else RED
+    ticker_tile = cache.text(ticker_name, FONT, WHITE, FONT_SCALE_TITLE * scale, THICKNESS)
+    change_tile = cache.text(f"{percentage_change:.2f}%", FONT, text_color, FONT_SCALE_CHANGE * scale, THICKNESS)
+    return [centered(ticker_tile, width, int(height * OVERLAY_TICKER_Y)),
+            centered(change_tile, width, int(height * OVERLAY_CHANGE_Y))]
+
+class _ChartClip:
+    """
+    Bilder eines Chart-Abschnitts (Startbild der Überblendung, Animations-Frames, Endbild),
+    erzeugt beim ersten Zugriff während der Kodierung. Fehlt der Chart (ein DeferredChart
+    liefert None), steht an seiner Stelle ein schwarzes Bild mit den Overlays;
+    die Timeline behält ihre Länge.
+    """
 
-    if not out.isOpened():
-        logging.error(f"Fehler: VideoWriter konnte nicht geöffnet werden für {temp_video_filepath}")
-        return
+    def __init__(self, chart_source, layers: list, compositor: Compositor, label: str):
+        self.source = chart_source
+        self.animated = (chart_source.animated if isinstance(chart_source, DeferredChart)
+                         else isinstance(chart_source, LineDrawAnimation))
+        self.layers = layers
+        self.compositor = compositor
+        self.label = label
+        self._images = None # (LineDrawAnimation oder None, Startbild, Endbild)
+
+    def _load(self):
+        if self._images is None:
+            compositor, layers = self.compositor, self.layers
+            source = self.source.resolve() if isinstance(self.source, DeferredChart) else self.source
+            self.source = None
+            if source is not None and not self.animated:
+                source = _load_chart_frame(source, compositor.width, compositor.height)
+            if source is None:
+                logging.warning(f"{self.label}: Chart fehlt, Platzhalter wird eingefügt.")
+                placeholder = np.zeros((compositor.height, compositor.width, 3), dtype=np.uint8)
+                placeholder = compositor.blend(placeholder, layers)
+                self._images = (None, placeholder, placeholder)
+            elif self.animated:
+                start_image = compositor.render(source.background, layers) if layers else source.background
+                self._images = (source, start_image, compositor.blend(source.final_frame(), layers))
+            else:
+                # Text-Overlays einmal in eine Kopie des Chart-Frames mischen
+                final_image = compositor.render(source, layers) if layers else source
+                self._images = (None, final_image, final_image)
+        return self._images
+
+    def start_image(self) -> np.ndarray:
+        return self._load()[1]
+
+    def final_image(self) -> np.ndarray:
+        return self._load()[2]
+
+    def draw_frames(self, num_frames: int):
+        """Generator über die Frames, in denen sich die Linie zeichnet, mit Overlays im Compositor-Puffer."""
+        animation, _, final_image = self._load()
+        if animation is None:
+            for _ in range(num_frames):
+                yield final_image
+            return
+        for frame in animation.frames(num_frames):
+            yield self.compositor.compose(frame, self.layers) if self.layers else frame
+
+
+def _crossfade(compositor: Compositor, start, end, num_frames: int):
+    """Wie Compositor.crossfade_frames, Start- und Zielbild (Funktionen) werden erst beim ersten Frame abgefragt."""
+    yield from compositor.crossfade_frames(start(), end(), num_frames)
+
+def build_timeline(chart_sources, chart_display_duration, video_date, index_name,
+                   width: int = VIDEO_WIDTH, height: int = VIDEO_HEIGHT, chart_overlays: list = None):
+    """
+    Baut die Timeline des Videos: Intro, ein Abschnitt pro Chart und Outro, jeweils mit
+    Überblendung vom vorherigen Abschnitt. `chart_overlays` enthält (Ticker, Veränderung)
+    pro Chart für die Text-Overlays (oder None).
+    Overlays werden pro Chart einmal in das Standbild gemischt; nur Überblendungen und
+    Animations-Frames werden pro Frame im Puffer des Compositors zusammengesetzt.
+    Die Chart-Bilder entstehen erst, wenn der Encoder ihre Segmente schreibt; mit
+    DeferredChart als Quelle kann die Kodierung daher beginnen, bevor alle Charts gerendert sind.
+    Gibt eine Liste von timeline.Segment zurück.
+    """
+    segments = []
+    compositor = Compositor(width, height)
+    fade_frames = seconds_to_frames(CROSSFADE_DURATION, FPS)
+    previous = None # Liefert das letzte Bild des vorherigen Abschnitts, Ausgangspunkt der Überblendung
+
+    def crossfade_into(image, num_frames, label):
+        """Fügt die Überblendung zu `image()` ein und gibt die Anzahl der dafür verwendeten Frames zurück."""
+        frames = min(fade_frames, num_frames - 1) if previous is not None else 0
+        if frames <= 0:
+            return 0
+        segments.append(Segment.generated(_crossfade(compositor, previous, image, frames), frames,
+                                          f"{label} (Überblendung)"))
+        return frames
 
     # --- Intro-Clip erstellen ---
-    line1 = "Die 10 DAX Highlights des Tages!"
-    line2 = f"{datetime.now().strftime('%d.%m.%Y')}"
-    intro_duration_frames = int(2 * FPS)  # 2 Sekunden Intro
+    line1 = f"Die {len(chart_sources)} {index_name} Highlights des Tages!"
+    line2 = f"{video_date.strftime('%d.%m.%Y')}"
+    intro_duration_frames = seconds_to_frames(INTRO_DURATION, FPS)
 
     # Schwarzer Hintergrund für das Intro
-    intro_frame = np.zeros((VIDEO_HEIGHT, VIDEO_WIDTH, 3), dtype=np.uint8)
+    intro_frame = np.zeros((height, width, 3), dtype=np.uint8)
 
     # Einheitlicher Skalierungsfaktor für Intro-Text
     FONT_SCALE_INTRO = FONT_SCALE_TITLE * 0.5
@@ -70,76 +292,54 @@ def create_tiktok_video(
     total_text_height = text_h1 + line_spacing
 
     # Start-Y für vertikale Zentrierung
-    start_y = (VIDEO_HEIGHT - total_text_height) // 2
+    start_y = (height - total_text_height) // 2
 
     # Positionen berechnen (horizontal zentriert)
-    x1 = (VIDEO_WIDTH - text_w1) // 2
+    x1 = (width - text_w1) // 2
     y1 = start_y + text_h1  # y-Koordinate ist bei Baseline
 
-    x2 = (VIDEO_WIDTH - text_w2) // 2
+    x2 = (width - text_w2) // 2
     y2 = y1 + line_spacing
 
     # Zeilen zeichnen mit identischem Skalierungsfaktor
     cv2.putText(intro_frame, line1, (x1, y1), FONT, FONT_SCALE_INTRO, WHITE, THICKNESS, cv2.LINE_AA)
     cv2.putText(intro_frame, line2, (x2, y2), FONT, FONT_SCALE_INTRO, WHITE, THICKNESS, cv2.LINE_AA)
 
-    for _ in range(intro_duration_frames):
-        out.write(intro_frame)
-
+    segments.append(Segment.still(intro_frame, intro_duration_frames, "Intro"))
+    previous = lambda: intro_frame
     logging.info("Intro-Clip hinzugefügt.")
 
     # --- Chart-Clips ---
-    frames_per_chart = int(chart_display_duration * FPS)
-
-    for i, chart_path in enumerate(chart_image_paths):
-        logging.info(f"Verarbeite Chart: {chart_path}")
-        # Bild laden
-        chart_image = cv2.imread(chart_path)
-        if chart_image is None:
-            logging.error(f"Fehler: Bild konnte nicht geladen werden von {chart_path}. Überspringe.")
-            continue
-
-        # Bild auf Video-Dimensionen anpassen (resizen)
-        chart_image_resized = cv2.resize(chart_image, (VIDEO_WIDTH, VIDEO_HEIGHT))
-
-        # # Ticker aus Dateipfad extrahieren (z.B. "BAS_30_day_chart.png" -> "BAS")
-        # base_name = os.path.basename(chart_path)
-        # ticker_name = base_name.split('_')[0]
-
-        # # Informationen für den Text-Overlay abrufen
-        # percentage_change = movers_info.get(ticker_name, {}).get('change', 0.0)
-        # display_text_change = f"{percentage_change:.2f}%"
-        # text_color = GREEN if percentage_change >= 0 else RED
-
-        # Füge Text-Overlays zu jedem Frame hinzu
-        for frame_num in range(frames_per_chart):
-            frame_to_write = chart_image_resized.copy() # Kopie, um Text hinzuzufügen
-
-            # Ticker-Text (oben zentriert)
-            # (text_w_ticker, text_h_ticker), _ = cv2.getTextSize(ticker_name, FONT, FONT_SCALE_TITLE, THICKNESS)
-            # text_x_ticker = (VIDEO_WIDTH - text_w_ticker) // 2
-            # text_y_ticker = int(VIDEO_HEIGHT * 0.1) + text_h_ticker // 2 # Position anpassen
-
-            # cv2.putText(frame_to_write, ticker_name, (text_x_ticker, text_y_ticker),
-            #             FONT, FONT_SCALE_TITLE, WHITE, THICKNESS, cv2.LINE_AA)
-
-            # Prozentuale Veränderung (etwas darunter zentriert)
-            # (text_w_change, text_h_change), _ = cv2.getTextSize(display_text_change, FONT, FONT_SCALE_CHANGE, THICKNESS)
-            # text_x_change = (VIDEO_WIDTH - text_w_change) // 2
-            # text_y_change = int(VIDEO_HEIGHT * 0.25) + text_h_change // 2 # Position anpassen
-
-            # cv2.putText(frame_to_write, display_text_change, (text_x_change, text_y_change),
-            #             FONT, FONT_SCALE_CHANGE, text_color, THICKNESS, cv2.LINE_AA)
-
-            out.write(frame_to_write)
+    frames_per_chart = seconds_to_frames(chart_display_duration, FPS)
+
+    for i, chart_source in enumerate(chart_sources):
+        label = f"Chart {i + 1}"
+        if not isinstance(chart_source, (DeferredChart, LineDrawAnimation)):
+            chart_source = _load_chart_frame(chart_source, width, height)
+            if chart_source is None:
+                continue
+        layers = _overlay_layers(*chart_overlays[i], width, height) if chart_overlays and chart_overlays[i] else []
+        clip = _ChartClip(chart_source, layers, compositor, label)
+
+        fade = crossfade_into(clip.start_image, frames_per_chart, label)
+        if clip.animated:
+            # Überblendung auf den Hintergrund ohne Linie, dann zeichnet sich die Linie inkrementell
+            draw_frames = max(0, int(frames_per_chart * LINE_DRAW_FRACTION) - fade)
+            if draw_frames:
+                segments.append(Segment.generated(clip.draw_frames(draw_frames), draw_frames, f"{label} (Animation)"))
+            segments.append(Segment.deferred(clip.final_image, frames_per_chart - fade - draw_frames, label))
+        else:
+            # Ein Standbild-Segment pro Chart statt frames_per_chart kopierter Frames
+            segments.append(Segment.deferred(clip.final_image, frames_per_chart - fade, label))
+        previous = clip.final_image
     logging.info("Chart-Clips hinzugefügt.")
 
     # --- Outro-Clip erstellen ---
-    line1 = "Daily DAX-Updates!"
+    line1 = f"Daily {index_name}-Updates!"
     line2 = "Follow us!"
-    outro_duration_frames = int(3 * FPS)  # 3 Sekunden Outro
+    outro_duration_frames = seconds_to_frames(OUTRO_DURATION, FPS)
 
-    outro_frame = np.zeros((VIDEO_HEIGHT, VIDEO_WIDTH, 3), dtype=np.uint8)
+    outro_frame = np.zeros((height, width, 3), dtype=np.uint8)
 
     # Textgrößen berechnen
     (text_w1, text_h1), _ = cv2.getTextSize(line1, FONT, FONT_SCALE_TITLE * 0.8, THICKNESS)
@@ -148,78 +348,66 @@ def create_tiktok_video(
     # Y-Startpunkt mittig mit etwas Abstand
     line_spacing = int(text_h1 * 1.5)
     total_text_height = line_spacing + text_h2
-    start_y = (VIDEO_HEIGHT - total_text_height) // 2
+    start_y = (height - total_text_height) // 2
 
     # Zeile 1 zentrieren
-    x1 = (VIDEO_WIDTH - text_w1) // 2
+    x1 = (width - text_w1) // 2
     y1 = start_y
 
     # Zeile 2 zentrieren
-    x2 = (VIDEO_WIDTH - text_w2) // 2
+    x2 = (width - text_w2) // 2
     y2 = y1 + line_spacing
 
     # Texte zeichnen
     cv2.putText(outro_frame, line1, (x1, y1), FONT, FONT_SCALE_TITLE * 0.8, WHITE, THICKNESS, cv2.LINE_AA)
     cv2.putText(outro_frame, line2, (x2, y2), FONT, FONT_SCALE_TITLE * 0.8, WHITE, THICKNESS, cv2.LINE_AA)
 
-    for _ in range(outro_duration_frames):
-        out.write(outro_frame)
+    fade = crossfade_into(lambda: outro_frame, outro_duration_frames, "Outro")
+    segments.append(Segment.still(outro_frame, outro_duration_frames - fade, "Outro"))
     logging.info("Outro-Clip hinzugefügt.")
 
-    out.release() # VideoWriter schließen
-    logging.info(f"Temporäres Video ohne Audio erstellt: {temp_video_filepath}")
-
-    # --- Hintergrundmusik hinzufügen mit FFmpeg ---
-    try:
-        if not os.path.exists(background_music_path):
-            raise FileNotFoundError(f"Hintergrundmusikdatei nicht gefunden: {background_music_path}")
-
-        logging.info(f"Füge Hintergrundmusik '{os.path.basename(background_music_path)}' hinzu...")
-
-        # FFmpeg-Befehl zum Kombinieren von Video und Audio
-        # -i für Eingabedateien, -map um Spuren auszuwählen, -c:v Videocodec, -c:a Audiocodec, -shortest kürzere Dauer
-        # -y überschreibt Ausgabedatei, falls vorhanden
-        ffmpeg_command = [
-            'ffmpeg',
-            '-i', temp_video_filepath,
-            '-i', background_music_path,
-            '-map', '0:v:0', # Video-Stream von erster Eingabe
-            '-map', '1:a:0', # Audio-Stream von zweiter Eingabe
-            '-c:v', 'copy',  # Video nicht rekodieren (schneller, keine Qualitätsverlust)
-            '-c:a', 'aac',   # Audio zu AAC kodieren
-            '-b:a', '192k',  # Audio-Bitrate
-            '-shortest',     # Beendet das Video, wenn die kürzere Spur endet
-            '-y',            # Überschreibt Ausgabedatei ohne Nachfrage
-            output_filepath
-        ]
-        
-        # subprocess.run wird den Befehl ausführen und auf dessen Beendigung warten
-        # capture_output=True, text=True hilft beim Debugging
-        result = subprocess.run(ffmpeg_command, capture_output=True, text=True, check=True)
-        
-        logging.info(f"FFmpeg stdout: {result.stdout}")
-        if result.stderr:
-            logging.info(f"FFmpeg stderr: {result.stderr}") # FFmpeg gibt viel Info nach stderr aus
+    return segments
 
-        logging.info(f"Hintergrundmusik '{os.path.basename(background_music_path)}' erfolgreich hinzugefügt.")
 
-    except FileNotFoundError:
-        logging.error("Fehler: FFmpeg wurde nicht gefunden. Stellen Sie sicher, dass FFmpeg installiert und im System PATH ist.")
-        logging.warning("Video wurde ohne Musik erstellt.")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"FFmpeg-Fehler beim Hinzufügen der Musik: {e}")
-        logging.error(f"FFmpeg stdout: {e.stdout}")
-        logging.error(f"FFmpeg stderr: {e.stderr}")
-        logging.warning("Video wurde ohne Musik erstellt.")
+def _encode_video_job(job: VideoJob) -> VideoResult:
+    """Lädt die Charts eines Auftrags und kodiert das Video im Worker-Prozess."""
+    measurement = Measurement()
+    try:
+        chart_frames = [load_chart_file(path) for path in job.chart_files]
+        if any(frame is None for frame in chart_frames):
+            raise RuntimeError(f"Chart-Dateien für {job.output_filepath} sind unvollständig.")
+        create_tiktok_video(None, job.output_filepath, job.background_music_path, job.chart_display_duration, {},
+                            job.video_date, job.index_name, chart_frames=chart_frames, frame_size=job.frame_size,
+                            chart_overlays=job.chart_overlays)
+        error = None
     except Exception as e:
-        logging.warning(f"Konnte Hintergrundmusik nicht hinzufügen (anderer Fehler): {e}. Video wird ohne Musik erstellt.")
-
-    #Temporäre Videodatei ohne Audio löschen
-    if os.path.exists(temp_video_filepath):
-        try:
-            os.remove(temp_video_filepath)
-            logging.info(f"Temporäre Datei gelöscht: {temp_video_filepath}")
-        except Exception as e:
-            logging.warning(f"Konnte temporäre Videodatei nicht löschen {temp_video_filepath}: {e}")
+        logging.error(f"Fehler bei der Videokodierung für {job.output_filepath}: {e}", exc_info=True)
+        error = f"{type(e).__name__}: {e}"
+    return VideoResult(job.output_filepath, error, measurement.finish())
 
-    logging.info(f"Video-Export abgeschlossen: {output_filepath}")
\ No newline at end of file
+def create_videos_parallel(video_jobs: list, max_workers: int = None) -> list:
+    """
+    Kodiert mehrere Videos (z.B. ein Video pro Ausgabeformat) gleichzeitig, ein Prozess
+    und ein FFmpeg-Encoder pro Video. Die Charts werden in den Worker-Prozessen aus
+    den Chart-Dateien geladen, statt sie zwischen Prozessen zu kopieren.
+    Gibt eine Liste von VideoResult in der Reihenfolge der Aufträge zurück;
+    ein fehlgeschlagenes Video bricht die übrigen nicht ab.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(video_jobs))
+
+    if max_workers <= 1:
+        results = [_encode_video_job(job) for job in video_jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_encode_video_job, video_jobs))
+
+    recorder = active_recorder()
+    if recorder is not None:
+        stage_name = recorder.child_name("video")
+        for job, result in zip(video_jobs, results):
+            recorder.add_record(stage_name, result.metrics, status="ok" if result.error is None else "error",
+                                error=result.error, **recorder.current_labels(),
+                                size=f"{job.frame_size[0]}x{job.frame_size[1]}")
+    return results
@@ -0,0 +1,27 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Die Module liegen flach in src/ und werden als Skripte von dort gestartet
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Kleine Frames (Breite, Höhe), damit die Tests schnell bleiben
+SMALL_FRAME_SIZE = (108, 192)
+
+
+@pytest.fixture
+def small_size() -> tuple:
+    return SMALL_FRAME_SIZE
+
+
+@pytest.fixture
+def make_history():
+    """Synthetische Kursreihe über 30 Handelstage ab dem 01.08.2025: `start + step * Tag`."""
+    def make(start: float = 100.0, step: float = 1.0) -> pd.Series:
+        return pd.Series(start + step * np.arange(30, dtype=float), index=pd.bdate_range("2025-08-01", periods=30))
+    return make
@@ -0,0 +1,41 @@
+# tests/test_chart_animation.py
+
+import pickle
+
+import numpy as np
+
+from chart_animation import ChartLine, LineDrawAnimation
+
+
+def _animation() -> LineDrawAnimation:
+    background = np.full((120, 200, 3), 30, dtype=np.uint8)
+    points = np.array([[10, 100], [40, 20], [70, 90], [110, 15], [150, 80], [190, 40]], dtype=np.float32)
+    return LineDrawAnimation(background, ChartLine(points, (0, 255, 0), 2))
+
+
+def test_frames_draw_line_from_left_to_right():
+    animation = _animation()
+    frames = [frame.copy() for frame in animation.frames(12)]
+
+    assert len(frames) == 12
+    drawn = [np.count_nonzero(np.any(frame != animation.background, axis=2)) for frame in frames]
+    assert drawn == sorted(drawn) and drawn[0] < drawn[-1]
+
+
+def test_last_animated_frame_matches_final_still():
+    animation = _animation()
+    *_, last = animation.frames(12)
+
+    assert np.array_equal(last, animation.final_frame())
+
+
+def test_pickle_leaves_out_the_frame_buffer():
+    animation = _animation()
+    size = len(pickle.dumps(animation))
+    *_, last = animation.frames(4)
+
+    # Auch nach dem Abspielen nur Hintergrund und Linie, der Puffer entsteht beim Empfänger neu
+    assert len(pickle.dumps(animation)) == size < 2 * animation.background.nbytes
+    restored = pickle.loads(pickle.dumps(animation))
+    assert restored.buffer is None
+    assert np.array_equal(list(restored.frames(4))[-1], last)
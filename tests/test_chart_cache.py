@@ -0,0 +1,44 @@
+# tests/test_chart_cache.py
+
+import os
+import time
+
+import numpy as np
+
+from chart_cache import ChartCache
+from chart_generator import create_charts_parallel
+
+
+def test_key_depends_on_every_input(make_history):
+    base = ChartCache.make_key("SAP.DE", make_history(), 1.0, "v1")
+    assert base == ChartCache.make_key("SAP.DE", make_history(), 1.0, "v1")
+    assert len({base, ChartCache.make_key("BAS.DE", make_history(), 1.0, "v1"),
+                ChartCache.make_key("SAP.DE", make_history(100.5), 1.0, "v1"),
+                ChartCache.make_key("SAP.DE", make_history(), 1.5, "v1"),
+                ChartCache.make_key("SAP.DE", make_history(), 1.0, "v2")}) == 5
+
+
+def test_second_render_is_a_cache_hit(tmp_path, make_history, small_size):
+    jobs = [("SAP.DE", make_history(), 3.0), ("BAS.DE", make_history(105), -2.0)]
+    render = lambda: create_charts_parallel(jobs, str(tmp_path), max_workers=1, as_frames=True,
+                                            cache_dir=str(tmp_path / "cache"), frame_sizes=[small_size])
+
+    first, second = render(), render()
+    assert [result.cached for result in first] == [False, False]
+    assert [result.cached for result in second] == [True, True]
+    for miss, hit in zip(first, second):
+        assert np.array_equal(miss.frame, hit.frame)
+
+
+def test_evict_removes_old_then_least_recently_used(tmp_path):
+    cache = ChartCache(str(tmp_path), max_bytes=2 * 1024, max_age_days=1)
+    frame = np.zeros((16, 16, 3), dtype=np.uint8) # ca. 900 Byte pro Eintrag
+    for key in ("old", "a", "b", "c"):
+        cache.put(key, frame)
+    now = time.time()
+    os.utime(cache.path("old"), (now - 3 * 24 * 3600, now - 3 * 24 * 3600))
+    os.utime(cache.path("a"), (now - 30, now - 30))
+
+    assert cache.evict() == 2
+    assert cache.get("old") is None and cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
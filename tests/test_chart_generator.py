@@ -0,0 +1,33 @@
+# tests/test_chart_generator.py
+
+import os
+
+import pytest
+
+from chart_generator import create_charts_parallel
+
+
+def test_parallel_results_keep_order_and_report_failures(tmp_path, make_history, small_size):
+    jobs = [("SAP.DE", make_history(), 3.0), ("BAD.DE", None, 1.0), ("BAS.DE", make_history(50, -0.5), -2.0)]
+
+    results = create_charts_parallel(jobs, str(tmp_path), max_workers=2, as_frames=True, frame_sizes=[small_size])
+
+    assert [result.ticker for result in results] == ["SAP.DE", "BAD.DE", "BAS.DE"]
+    assert results[1].error is not None and results[1].frame is None
+    for result in (results[0], results[2]):
+        assert result.error is None
+        assert result.frame.shape == (small_size[1], small_size[0], 3)
+        assert result.size == small_size
+
+
+def test_png_charts_are_recorded_and_reject_frame_sizes(tmp_path, make_history, small_size):
+    from instrumentation import RunRecorder
+
+    jobs = [("SAP.DE", make_history(), 3.0)]
+    with RunRecorder() as run:
+        results = create_charts_parallel(jobs, str(tmp_path), max_workers=1)
+    assert results[0].error is None and os.path.exists(results[0].path)
+    assert [record["labels"]["size"] for record in run.records if record["stage"] == "chart"] == ["1080x1920"]
+
+    with pytest.raises(ValueError):
+        create_charts_parallel(jobs, str(tmp_path), max_workers=1, frame_sizes=[small_size])
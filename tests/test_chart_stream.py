@@ -0,0 +1,83 @@
+# tests/test_chart_stream.py
+
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from chart_stream import ChartStream
+from timeline import total_frames
+from video_maker import DeferredChart, build_timeline, video_duration
+
+
+@pytest.fixture
+def sizes(small_size):
+    """Zwei Ausgabeformate im selben Stream."""
+    return [small_size, (small_size[1], small_size[1])]
+
+
+@pytest.fixture
+def make_jobs(make_history):
+    def make(count: int, failing=()):
+        return [(f"T{i}.DE", None if i in failing else make_history(), 1.0 + i) for i in range(count)]
+    return make
+
+
+def test_stream_delivers_in_order_and_tolerates_failed_charts(make_jobs, sizes):
+    charts = {}
+
+    def encode(stream, size): # Wie _stream_video: ein Thread pro Ausgabeformat
+        charts[size] = [chart.resolve() for chart in stream.deferred(size)]
+        stream.finish(size)
+
+    with ChartStream(make_jobs(3, failing=(1,)), sizes, max_workers=2, max_ahead=2) as stream:
+        threads = [threading.Thread(target=encode, args=(stream, size)) for size in sizes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+    for width, height in sizes:
+        frames = charts[(width, height)]
+        assert frames[1] is None
+        assert [frame.shape for frame in (frames[0], frames[2])] == [(height, width, 3)] * 2
+
+    results = stream.chart_results()
+    assert [(result.ticker, result.size) for result in results] == [
+        (f"T{i}.DE", size) for i in range(3) for size in sizes]
+    assert [result.error is not None for result in results] == [False, False, True, True, False, False]
+    assert all(result.frame is None for result in results) # Frames werden nicht aufbewahrt
+
+
+def test_backpressure_follows_the_slowest_video(make_jobs, sizes):
+    with ChartStream(make_jobs(6), sizes, max_workers=1, max_ahead=2) as stream:
+        assert stream._submitted == 2
+        stream.get(0, sizes[0])
+        stream.get(1, sizes[0])
+        # Das zweite Video hat noch nichts abgeholt: Position 2 wird erst danach eingereicht
+        waiting = threading.Thread(target=stream.get, args=(2, sizes[0]))
+        waiting.start()
+        waiting.join(timeout=1)
+        assert waiting.is_alive() and stream._submitted == 2
+        stream.get(0, sizes[1])
+        stream.get(1, sizes[1])
+        waiting.join(timeout=30)
+        assert not waiting.is_alive()
+        assert stream._submitted == 3
+        stream.finish(sizes[0])
+        stream.finish(sizes[1])
+        assert stream._submitted == 6
+
+
+def test_failed_deferred_chart_becomes_placeholder_of_same_length(small_size):
+    width, height = small_size
+    chart = np.full((height, width, 3), 90, dtype=np.uint8)
+    sources = [DeferredChart(lambda: chart, False), DeferredChart(lambda: None, False)]
+    segments = build_timeline(sources, 2, datetime(2025, 9, 15), "DAX", width, height,
+                              [("SAP.DE", 3.0), ("BAS.DE", -2.0)])
+
+    assert total_frames(segments) == round(video_duration(2, 2) * 24)
+    placeholder = next(segment for segment in segments if segment.label == "Chart 2").image
+    assert placeholder.shape == (height, width, 3)
+    assert (placeholder == 0).mean() > 0.9 # Schwarz bis auf die Overlays
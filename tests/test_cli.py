@@ -0,0 +1,13 @@
+# tests/test_cli.py
+
+import cli
+import settings
+
+
+def test_indices_default_to_settings(monkeypatch):
+    monkeypatch.setattr(settings, "MOVER_INDICES", ("DAX", "MDAX"))
+    parser = cli.build_parser()
+
+    for command in ("movers", "charts", "video", "run"):
+        assert cli._indices(parser.parse_args([command])) == ("DAX", "MDAX")
+    assert cli._indices(parser.parse_args(["run", "--indices", "SDAX"])) == ("SDAX",)
@@ -0,0 +1,27 @@
+# tests/test_daemon.py
+
+import threading
+from datetime import datetime
+
+from daemon import TopMoverService
+
+
+def test_queued_trigger_is_answered_on_shutdown():
+    service = TopMoverService(indices=("DAX",))
+    service.warm_up = lambda: None
+    service.start_server = lambda: None
+    results = []
+    waiting = threading.Thread(target=lambda: results.append(service.trigger(datetime(2025, 9, 15))))
+    waiting.start()
+    while service.requests.empty():
+        waiting.join(timeout=0.01)
+
+    # stop() vor dem ersten Durchlauf: Der eingereihte Lauf wird nicht mehr ausgeführt
+    service.stop()
+    service.serve_forever()
+    waiting.join(timeout=5)
+
+    assert not waiting.is_alive()
+    assert results == [{"as_of": "2025-09-15", "ok": False, "error": "Dienst beendet, Lauf nicht ausgeführt."}]
+    # Auch nach dem Ende wartet ein neuer Trigger nicht
+    assert service.trigger()["ok"] is False
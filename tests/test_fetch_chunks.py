@@ -0,0 +1,149 @@
+# tests/test_fetch_chunks.py
+
+import io
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import urlopen
+
+import pandas as pd
+import pytest
+
+from data_provider import MarketDataProvider
+from dax_movers import _call_with_timeout, download_close_in_chunks
+
+DATES = pd.bdate_range("2025-09-01", "2025-09-12")
+
+# Verhalten des Stand-in-Servers pro Block (erstes Symbol): Antworten der ersten Anfragen, danach "ok"
+SCRIPTS = {
+    "SAP.DE": ["slow"],         # Erste Anfrage überschreitet den Timeout, dann Antwort
+    "ALV.DE": ["error"],        # Erste Anfrage HTTP 500, dann Antwort
+    "BAYN.DE": ["error"] * 10,  # Erholt sich nie
+}
+UNLISTED = {"GONE.DE"}           # Antworten enthalten nie Kurse für diese Symbole
+SLOW_RESPONSE_S = 1.0
+TIMEOUT_S = 0.2
+
+
+class _QuoteHandler(BaseHTTPRequestHandler):
+    """GET /download?tickers=A,B&start=YYYY-MM-DD&end=YYYY-MM-DD liefert Date,Ticker,Close als CSV."""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        tickers = query["tickers"][0].split(",")
+        with self.server.lock:
+            attempt = self.server.requests.setdefault(tickers[0], 0)
+            self.server.requests[tickers[0]] += 1
+        script = SCRIPTS.get(tickers[0], [])
+        behaviour = script[attempt] if attempt < len(script) else "ok"
+        if behaviour == "error":
+            self.send_error(500)
+            return
+        if behaviour == "slow":
+            time.sleep(SLOW_RESPONSE_S)
+
+        rows = [f"{date:%Y-%m-%d},{ticker},{100 + i + n}" for n, ticker in enumerate(tickers)
+                if ticker not in UNLISTED for i, date in enumerate(DATES) if query["start"][0] <= f"{date:%Y-%m-%d}" < query["end"][0]]
+        body = "\n".join(["Date,Ticker,Close"] + rows).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpProvider(MarketDataProvider):
+    """Lädt Schlusskurse vom Stand-in-Server, im Format von yf.download."""
+
+    name = "http"
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def download(self, tickers, start_date, end_date):
+        query = urlencode({"tickers": ",".join(tickers), "start": f"{start_date:%Y-%m-%d}",
+                           "end": f"{end_date:%Y-%m-%d}"})
+        with urlopen(f"{self.base_url}/download?{query}", timeout=10) as response:
+            frame = pd.read_csv(io.BytesIO(response.read()), parse_dates=["Date"])
+        close = frame.pivot(index="Date", columns="Ticker", values="Close")
+        close.columns = pd.MultiIndex.from_product([["Close"], close.columns], names=["Price", "Ticker"])
+        return close
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _QuoteHandler)
+    server.lock = threading.Lock()
+    server.requests = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_chunks_retry_and_report_only_unrecovered_tickers(server):
+    provider = HttpProvider(f"http://127.0.0.1:{server.server_address[1]}")
+    tickers = ["SAP.DE", "SIE.DE", "ALV.DE", "BAS.DE", "BAYN.DE", "DTE.DE"]
+
+    close_data, failed, empty = download_close_in_chunks(provider, tickers, datetime(2025, 9, 1), datetime(2025, 9, 13),
+                                                  chunk_size=2, max_concurrency=3, timeout=TIMEOUT_S, retries=2,
+                                                  backoff=0.01)
+
+    assert failed == ["BAYN.DE", "DTE.DE"]
+    assert empty == []
+    assert list(close_data.columns) == ["SAP.DE", "SIE.DE", "ALV.DE", "BAS.DE"]
+    assert len(close_data) == len(DATES) and not close_data.isna().any().any()
+    assert server.requests == {"SAP.DE": 2, "ALV.DE": 2, "BAYN.DE": 3}
+
+
+def test_symbols_missing_from_a_response_are_empty_without_backoff(server):
+    provider = HttpProvider(f"http://127.0.0.1:{server.server_address[1]}")
+
+    started = time.perf_counter()
+    close_data, failed, empty = download_close_in_chunks(provider, ["SIE.DE", "GONE.DE"], datetime(2025, 9, 1),
+                                                         datetime(2025, 9, 13), timeout=5, backoff=10)
+
+    assert time.perf_counter() - started < 5 # Kein Backoff für fehlende Symbole
+    assert (failed, empty) == ([], ["GONE.DE"])
+    assert list(close_data.columns) == ["SIE.DE"]
+    # Ein zweiter Versuch nur für das fehlende Symbol, ohne Wartezeit
+    assert server.requests == {"SIE.DE": 1, "GONE.DE": 1}
+
+
+def test_call_with_timeout_abandons_slow_calls_and_reraises_errors(server):
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        _call_with_timeout(time.sleep, TIMEOUT_S, SLOW_RESPONSE_S)
+    assert time.perf_counter() - started < SLOW_RESPONSE_S
+
+    # BAYN.DE antwortet immer mit HTTP 500
+    provider = HttpProvider(f"http://127.0.0.1:{server.server_address[1]}")
+    with pytest.raises(HTTPError):
+        _call_with_timeout(provider.download, 5, ["BAYN.DE"], datetime(2025, 9, 1), datetime(2025, 9, 13))
+
+
+def test_tickers_without_data_keep_the_fetch_checkpoint(tmp_path, monkeypatch):
+    import main
+    from data_provider import ReplayProvider
+
+    # Die Fixtures enthalten nur 8 der DAX-Werte
+    fixture_dir = os.path.join(os.path.dirname(__file__), "fixtures", "replay")
+    provider = ReplayProvider(fixture_dir)
+    unlisted = set(main.default_universe().tickers(["DAX"])) - {name[:-4] for name in os.listdir(fixture_dir)}
+    monkeypatch.setattr(main, "RUNS_DIR", str(tmp_path))
+    run_date = datetime(2025, 9, 13)
+
+    checkpoint = main.build_daily_pipeline(run_date, ("DAX",), provider, targets=["fetch"]).run()["fetch"]
+    assert checkpoint["failed_tickers"] == [] and set(checkpoint["empty_tickers"]) == unlisted
+
+    pipeline = main.build_daily_pipeline(run_date, ("DAX",), provider, targets=["fetch"])
+    monkeypatch.setattr(provider, "download", lambda *args: pytest.fail("fetch erneut ausgeführt"))
+    assert pipeline.run()["fetch"]["created"] == checkpoint["created"]
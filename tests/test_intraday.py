@@ -0,0 +1,63 @@
+# tests/test_intraday.py
+
+from datetime import datetime
+
+import pytest
+
+from intraday import ReplayTickFeed, StreamingMovers, Tick, stream_movers
+
+REFERENCE = {ticker: 100.0 for ticker in ["SAP.DE", "SIE.DE", "ALV.DE", "BAS.DE", "BAYN.DE"]}
+
+
+def _ticks(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("timestamp,ticker,price\n")
+        for minute, (ticker, price) in enumerate(rows):
+            f.write(f"2025-09-15T09:{minute:02d}:00,{ticker},{price}\n")
+    return ReplayTickFeed(str(path))
+
+
+def _summary(events):
+    return [(event.timestamp.minute, event.kind, [ticker for ticker, _ in event.movers]) for event in events]
+
+
+def test_events_only_when_membership_or_rank_changes(tmp_path):
+    feed = _ticks(tmp_path / "ticks.csv", [
+        ("SAP.DE", 103),    # 0: erster Gewinner
+        ("BAS.DE", 98),     # 1: erster Verlierer
+        ("SIE.DE", 102),    # 2: zweiter Gewinner
+        ("BAYN.DE", 99),    # 3: zweiter Verlierer
+        ("ALV.DE", 101),    # 4: außerhalb der Top 2, kein Ereignis
+        ("ALV.DE", 101.5),  # 5: weiterhin außerhalb, kein Ereignis
+        ("SIE.DE", 104),    # 6: SIE überholt SAP
+        ("SAP.DE", 103.5),  # 7: nur der Wert ändert sich, nicht die Reihenfolge
+        ("SAP.DE", 103.5),  # 8: unveränderter Kurs
+        ("XYZ.DE", 150),    # 9: nicht im Index
+    ])
+    tracker = StreamingMovers("DAX", REFERENCE, num_movers=2)
+
+    events = list(stream_movers(feed, [tracker]))
+
+    assert _summary(events) == [
+        (0, "gainers", ["SAP.DE"]),
+        (1, "losers", ["BAS.DE"]),
+        (2, "gainers", ["SAP.DE", "SIE.DE"]),
+        (3, "losers", ["BAS.DE", "BAYN.DE"]),
+        (6, "gainers", ["SIE.DE", "SAP.DE"]),
+    ]
+    assert events[-1].index == "DAX"
+    assert [change for _, change in events[-1].movers] == pytest.approx([4.0, 3.0])
+    assert [change for _, change in tracker.gainers] == pytest.approx([4.0, 3.5])
+
+
+def test_crossing_zero_moves_ticker_between_gainers_and_nothing():
+    tracker = StreamingMovers("DAX", REFERENCE, num_movers=1)
+    at = lambda minute: datetime(2025, 9, 15, 9, minute)
+
+    assert _summary(tracker.update(Tick(at(0), "BAS.DE", 98))) == [(0, "losers", ["BAS.DE"])]
+    assert _summary(tracker.update(Tick(at(1), "SAP.DE", 101))) == [(1, "gainers", ["SAP.DE"])]
+    # SAP fällt unter den Vortagesschluss, ist aber nicht der größte Verlierer: weder Gewinner noch Verlierer
+    assert _summary(tracker.update(Tick(at(2), "SAP.DE", 99.5))) == [(2, "gainers", [])]
+    assert tracker.losers == (("BAS.DE", pytest.approx(-2.0)),)
+    assert _summary(tracker.update(Tick(at(3), "SAP.DE", 100))) == []
+    assert _summary(tracker.update(Tick(at(4), "SAP.DE", 100.5))) == [(4, "gainers", ["SAP.DE"])]
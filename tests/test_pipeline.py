@@ -0,0 +1,73 @@
+# tests/test_pipeline.py
+
+import os
+
+import pytest
+
+from pipeline import Pipeline, Step
+
+
+class Graph:
+    """fetch -> charts -> encode, zählt die Ausführungen; encode schlägt fehl, solange `fail_encode` gesetzt ist."""
+
+    def __init__(self, run_dir):
+        self.run_dir = run_dir
+        self.calls = []
+        self.fail_encode = False
+        self.params = {"fetch": {"day": "2025-09-12"}, "charts": {}, "encode": {}}
+
+    def _step(self, name, deps=(), kind=None):
+        def run(inputs):
+            self.calls.append(name)
+            if name == "encode" and self.fail_encode:
+                raise RuntimeError("ffmpeg fehlgeschlagen")
+            path = os.path.join(self.run_dir, f"{name}.out")
+            with open(path, "w") as f:
+                f.write(name)
+            return {"files": [path]}
+        return Step(name, run, deps=deps, params=self.params[name], kind=kind)
+
+    def pipeline(self, force=(), targets=None):
+        steps = [self._step("fetch"), self._step("charts", ["fetch"]), self._step("encode", ["charts"])]
+        return Pipeline(self.run_dir, steps, force, targets)
+
+
+@pytest.fixture
+def graph(tmp_path):
+    return Graph(str(tmp_path))
+
+
+def test_rerun_resumes_at_failed_step(graph):
+    graph.fail_encode = True
+    first = graph.pipeline()
+    first.run()
+    assert list(first.failed) == ["encode"]
+
+    graph.fail_encode = False
+    graph.calls.clear()
+    second = graph.pipeline()
+    second.run()
+    assert graph.calls == ["encode"]
+    assert not second.failed
+
+
+def test_force_and_stale_inputs_rerun_downstream(graph):
+    graph.pipeline().run()
+
+    graph.calls.clear()
+    graph.pipeline(force=("charts",)).run()
+    assert graph.calls == ["charts"] # Gleiche Ausgabe, encode bleibt gültig
+
+    graph.calls.clear()
+    graph.params["fetch"]["day"] = "2025-09-15"
+    graph.pipeline().run()
+    assert graph.calls == ["fetch", "charts", "encode"]
+
+
+def test_missing_output_file_and_targets(graph):
+    graph.pipeline().run()
+    os.remove(os.path.join(graph.run_dir, "charts.out"))
+
+    graph.calls.clear()
+    graph.pipeline(targets=("charts",)).run()
+    assert graph.calls == ["charts"]
@@ -0,0 +1,58 @@
+# tests/test_price_matrix.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_matrix import HORIZONS, TRADING_DAYS_PER_YEAR, VOLATILITY_WINDOW, PriceMatrix
+
+DATES = pd.bdate_range("2024-11-01", "2025-03-14")
+
+
+@pytest.fixture
+def close_data() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    walks = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(DATES), 4)), axis=0))
+    close = pd.DataFrame(walks, index=DATES, columns=["SAP.DE", "HALT.DE", "GAP.DE", "NEW.DE"])
+    close.iloc[-7:, 1] = np.nan    # Handel ausgesetzt: Daten enden eine Woche früher
+    close.iloc[-20:-15, 2] = np.nan # Feiertage einer anderen Börse mitten im Fenster
+    close.iloc[:60, 3] = np.nan     # Erst im neuen Jahr gelistet, kein Vorjahresschluss
+    return close.astype(np.float32)
+
+
+def _reference(close: pd.DataFrame, ticker: str) -> dict:
+    """Kennzahlen eines Tickers direkt mit pandas: Horizonte und Volatilitätsfenster ab seinem letzten Kurs."""
+    series = close[ticker].astype(np.float64)
+    last = series.last_valid_index()
+    upto = series.loc[:last]
+    filled = upto.ffill()
+    expected = {}
+    for horizon, days in HORIZONS.items():
+        if days is not None:
+            reference = filled.iloc[-1 - days] if len(filled) > days else np.nan
+        else:
+            before_year = filled[filled.index.year < last.year].dropna()
+            in_year = upto[upto.index.year == last.year].dropna()
+            reference = before_year.iloc[-1] if not before_year.empty else in_year.iloc[0]
+        expected[f"change_{horizon}"] = (upto.iloc[-1] - reference) / reference * 100
+    log_returns = np.log(upto.iloc[-(VOLATILITY_WINDOW + 1):]).diff()
+    expected["volatility"] = log_returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100
+    return expected
+
+
+def test_metrics_match_pandas_reference(close_data):
+    metrics = PriceMatrix.from_frame(close_data).metrics()
+
+    for ticker in close_data.columns:
+        expected = _reference(close_data, ticker)
+        actual = metrics.loc[ticker]
+        for column, value in expected.items():
+            assert actual[column] == pytest.approx(value, rel=1e-6, nan_ok=True), (ticker, column)
+
+
+def test_volatility_window_ends_at_each_tickers_last_price(close_data):
+    metrics = PriceMatrix.from_frame(close_data).metrics()
+    # Der früher endende Ticker hat dieselbe Volatilität wie seine eigenen Kurse ohne die leeren Zeilen
+    truncated = PriceMatrix.from_frame(close_data[["HALT.DE"]].iloc[:-7]).metrics()
+    assert metrics.loc["HALT.DE", "volatility"] == pytest.approx(truncated.loc["HALT.DE", "volatility"])
+    assert metrics["volatility"].notna().all()
@@ -0,0 +1,51 @@
+# tests/test_price_store.py
+
+from datetime import datetime
+
+import pandas as pd
+
+from dax_movers import fetch_close_prices
+from data_provider import MarketDataProvider, synthetic_ohlc
+from price_store import PriceStore
+
+
+class CountingProvider(MarketDataProvider):
+    """Synthetische Kurse; merkt sich jede Anfrage (Ticker und Startdatum)."""
+
+    name = "counting"
+
+    def __init__(self, tickers):
+        self.data = synthetic_ohlc(tickers, datetime(2025, 8, 1), datetime(2025, 10, 1))
+        self.requests = []
+
+    def download(self, tickers, start_date, end_date):
+        self.requests.append((sorted(tickers), start_date))
+        window = self.data[(self.data.index >= pd.Timestamp(start_date)) & (self.data.index < pd.Timestamp(end_date))]
+        return window.loc[:, window.columns.get_level_values(1).isin(tickers)]
+
+
+def test_missing_starts_per_ticker(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.sqlite"))
+    dates = pd.bdate_range("2025-09-01", "2025-09-10")
+    store.upsert(pd.DataFrame({"SAP.DE": range(len(dates))}, index=dates, dtype=float))
+
+    starts = store.missing_starts(["SAP.DE", "NEW.DE"], datetime(2025, 9, 1))
+    assert starts == {"SAP.DE": datetime(2025, 9, 11), "NEW.DE": datetime(2025, 9, 1)}
+
+
+def test_new_ticker_does_not_refetch_whole_universe(tmp_path):
+    tickers = ["SAP.DE", "BAS.DE", "ALV.DE"]
+    provider = CountingProvider(tickers + ["NEW.DE"])
+    store = PriceStore(str(tmp_path / "prices.sqlite"))
+    start, end = datetime(2025, 8, 4), datetime(2025, 9, 15)
+
+    fetch_close_prices(tickers, start, end, store, provider)
+    provider.requests.clear()
+    close_data, failed, _ = fetch_close_prices(tickers + ["NEW.DE"], start, datetime(2025, 9, 17), store, provider)
+
+    # Nur der neue Ticker braucht den ganzen Zeitraum, die übrigen nur die neuen Tage
+    assert sorted(provider.requests) == [(["ALV.DE", "BAS.DE", "SAP.DE"], datetime(2025, 9, 13)),
+                                         (["NEW.DE"], start)]
+    assert failed == []
+    assert list(close_data.columns) == tickers + ["NEW.DE"]
+    assert close_data.index[-1] == pd.Timestamp("2025-09-16")
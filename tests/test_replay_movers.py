@@ -0,0 +1,45 @@
+# tests/test_replay_movers.py
+
+import os
+from datetime import datetime
+
+import pytest
+
+from dax_movers import get_index_movers
+from data_provider import ReplayProvider
+from universe import Universe
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "replay")
+
+# Veränderung am letzten Fixture-Tag (12.09.2025) in %, siehe fixtures/replay/*.csv
+EXPECTED_GAINERS = {"SAP.DE": 3.0, "VOW3.DE": 2.0, "SIE.DE": 1.5}
+EXPECTED_LOSERS = {"BAYN.DE": -4.0, "BAS.DE": -2.0, "MBG.DE": -1.0}
+
+
+@pytest.fixture
+def universe():
+    universe = Universe()
+    tickers = sorted(name[:-len(".csv")] for name in os.listdir(FIXTURE_DIR) if name.endswith(".csv"))
+    universe.register_index("DAX", [(ticker, ticker) for ticker in tickers])
+    return universe
+
+
+def test_replay_movers_match_fixtures(universe):
+    results = get_index_movers(("DAX",), num_movers=3, chart_days=30, provider=ReplayProvider(FIXTURE_DIR),
+                               as_of=datetime(2025, 9, 15), universe=universe)
+
+    top_gainers, top_losers, historical_chart_data = results["DAX"]
+    assert list(top_gainers.index) == list(EXPECTED_GAINERS)
+    assert list(top_losers.index) == list(EXPECTED_LOSERS)
+    assert top_gainers.to_dict() == pytest.approx(EXPECTED_GAINERS, abs=1e-3)
+    assert top_losers.to_dict() == pytest.approx(EXPECTED_LOSERS, abs=1e-3)
+    # DTE.DE ist unverändert und damit weder Gewinner noch Verlierer
+    assert set(historical_chart_data) == set(EXPECTED_GAINERS) | set(EXPECTED_LOSERS)
+    assert all(len(series) == 30 for series in historical_chart_data.values())
+
+
+def test_replay_is_reproducible(universe):
+    run = lambda: get_index_movers(("DAX",), num_movers=3, provider=ReplayProvider(FIXTURE_DIR),
+                                   as_of=datetime(2025, 9, 15), universe=universe)["DAX"]
+    first, second = run(), run()
+    assert first[0].equals(second[0]) and first[1].equals(second[1])
@@ -0,0 +1,62 @@
+# tests/test_trading_calendar.py
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from trading_calendar import (XETRA_TIMEZONE, data_available_at, easter_sunday, is_trading_day,
+                              last_available_session, next_session_available, next_trading_day,
+                              previous_trading_day, xetra_holidays)
+
+
+@pytest.mark.parametrize("year, easter", [(2024, date(2024, 3, 31)), (2025, date(2025, 4, 20)),
+                                          (2026, date(2026, 4, 5)), (2038, date(2038, 4, 25))])
+def test_easter_based_holidays(year, easter):
+    assert easter_sunday(year) == easter
+    good_friday, easter_monday = easter - timedelta(days=2), easter + timedelta(days=1)
+    assert {good_friday, easter_monday} <= xetra_holidays(year)
+    assert not is_trading_day(good_friday) and not is_trading_day(easter_monday)
+    assert is_trading_day(easter - timedelta(days=3)) # Gründonnerstag wird gehandelt
+
+
+def test_christmas_eve_and_new_years_eve_are_closed():
+    # 2025: Heiligabend und Silvester fallen auf einen Mittwoch
+    assert not is_trading_day(date(2025, 12, 24))
+    assert not is_trading_day(date(2025, 12, 31))
+    assert is_trading_day(date(2025, 12, 23)) and is_trading_day(date(2025, 12, 30))
+
+
+@pytest.mark.parametrize("as_of, expected", [
+    (datetime(2025, 9, 15, 8, 0), datetime(2025, 9, 12)),  # Montag -> Freitag (Wochenende)
+    (datetime(2025, 9, 13), datetime(2025, 9, 12)),        # Samstag
+    (datetime(2025, 4, 22), datetime(2025, 4, 17)),        # Dienstag nach Ostern -> Gründonnerstag
+    (datetime(2026, 1, 2), datetime(2025, 12, 30)),        # Neujahr und Silvester übersprungen
+])
+def test_previous_trading_day_skips_weekends_and_holidays(as_of, expected):
+    assert previous_trading_day(as_of) == expected
+    assert previous_trading_day(as_of.date()) == expected
+
+
+def test_next_trading_day_skips_christmas():
+    assert next_trading_day(date(2025, 12, 23)) == datetime(2025, 12, 29)
+
+
+def test_data_available_at_follows_local_close_across_dst():
+    summer = data_available_at(date(2025, 9, 12))
+    winter = data_available_at(datetime(2025, 12, 30))
+    assert summer == datetime(2025, 9, 12, 18, 0, tzinfo=XETRA_TIMEZONE)
+    assert summer.utcoffset().total_seconds() == 2 * 3600
+    assert winter == datetime(2025, 12, 30, 18, 0, tzinfo=XETRA_TIMEZONE)
+    assert winter.utcoffset().total_seconds() == 3600
+
+
+def test_last_and_next_available_session():
+    friday = datetime(2025, 9, 12)
+    before = datetime(2025, 9, 12, 17, 59, tzinfo=XETRA_TIMEZONE)
+    after = datetime(2025, 9, 12, 18, 0, tzinfo=XETRA_TIMEZONE)
+
+    assert last_available_session(before) == datetime(2025, 9, 11)
+    assert last_available_session(after) == friday
+    assert next_session_available(before) == data_available_at(friday)
+    # Nach Freitagabend ist der nächste Termin der Montag
+    assert next_session_available(after) == data_available_at(date(2025, 9, 15))
@@ -0,0 +1,46 @@
+# tests/test_video_timeline.py
+
+from datetime import datetime
+
+import numpy as np
+
+from overlay import Compositor, Layer, tile_from_bgra
+from timeline import total_frames
+from video_maker import CROSSFADE_DURATION, FPS, build_timeline, video_duration
+
+
+def _chart(value: int, size) -> np.ndarray:
+    width, height = size
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_crossfades_keep_video_length(small_size):
+    charts = [_chart(80, small_size), _chart(160, small_size)]
+    segments = build_timeline(charts, 2, datetime(2025, 9, 15), "DAX", *small_size, [("SAP.DE", 3.0), ("BAS.DE", -2.0)])
+
+    fade_frames = int(CROSSFADE_DURATION * FPS)
+    fades = [segment for segment in segments if segment.label.endswith("(Überblendung)")]
+    assert [segment.label for segment in fades] == ["Chart 1 (Überblendung)", "Chart 2 (Überblendung)",
+                                                    "Outro (Überblendung)"]
+    assert all(segment.num_frames == fade_frames and len(list(segment.frames)) == fade_frames for segment in fades)
+    assert total_frames(segments) == round(video_duration(2, 2) * FPS)
+
+
+def test_crossfade_frames_blend_between_endpoints(small_size):
+    compositor = Compositor(*small_size)
+    values = [int(frame[0, 0, 0])
+              for frame in compositor.crossfade_frames(_chart(0, small_size), _chart(255, small_size), 3)]
+
+    assert len(values) == 3
+    assert 0 < values[0] < values[1] < values[2] < 255
+
+
+def test_opaque_layer_replaces_pixels_exactly(small_size):
+    bgra = np.zeros((4, 4, 4), dtype=np.uint8)
+    bgra[:, :, :3] = (10, 20, 30)
+    bgra[:2, :, 3] = 255 # Obere Hälfte deckend, untere transparent
+    frame = Compositor(*small_size).render(_chart(200, small_size), [Layer(tile_from_bgra(bgra), 5, 5)])
+
+    assert (frame[5:7, 5:9] == (10, 20, 30)).all()
+    assert (frame[7:9, 5:9] == 200).all()
+    assert (frame[:5] == 200).all()